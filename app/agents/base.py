@@ -1,27 +1,241 @@
 # Agent 공통 베이스
+import functools
 import logging
 from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+
+from app.agents.llm import stream_chat_completion
+from app.agents.schemas import completion_options, validate_response
+from app.api.websocket import notify_workflow_update
+from app.db.database import connect_db
+from app.db.utils import decompress_response, save_agent_response
+from app.monitoring.loop_watchdog import bind_workflow_context, reset_workflow_context
+
+
+@functools.cache
+def _upstream_sql(dependencies: tuple[str, ...]) -> str:
+    """
+    이전 단계 agent들의 상태와 응답(압축 본문 포함)을 한 번에 조회하는 SELECT 문.
+    파라미터: $1 workflow_id, $2 created_at (workflow와 같은 월 파티션만 조회)
+    결과 행: agent, status, response, codec, body
+    """
+    rows = " UNION ALL ".join(
+        f"SELECT '{dep}'::text AS agent, status, response, response_ref FROM {dep}"
+        " WHERE workflow_id = $1 AND created_at = $2"
+        for dep in dependencies
+    )
+    return f"""
+        SELECT d.agent, d.status::text AS status, d.response, c.codec, c.body
+        FROM ({rows}) d
+        LEFT JOIN agent_response_content c ON c.content_hash = d.response_ref
+    """
+
+
+@functools.cache
+def _start_sql(agent_name: str, dependencies: tuple[str, ...]) -> str:
+    """
+    agent를 running으로 바꾸면서 이전 단계 결과까지 함께 조회하는 단일 문장.
+    취소되지 않아 실제로 시작한 경우에만 agent_name 행이 포함됨.
+    파라미터: $1 workflow_id, $2 created_at, $3 started_at
+    """
+    started = f"""
+        WITH started AS (
+            UPDATE {agent_name} SET status = 'running', started_at = $3
+            WHERE workflow_id = $1 AND created_at = $2 AND status <> 'cancelled'
+            RETURNING status
+        )
+        SELECT '{agent_name}'::text AS agent, status::text AS status,
+               NULL::jsonb AS response, NULL::varchar AS codec, NULL::bytea AS body
+        FROM started
+    """
+    if not dependencies:
+        return started
+    return f"{started} UNION ALL {_upstream_sql(dependencies)}"
 
 
 class BaseAgent(ABC):
     """
     에이전트들의 공통 베이스 클래스.
+    시작 상태 기록, 이전 단계 결과 확인, LLM 호출, 결과 저장 및 상태 알림으로 이어지는
+    실행 흐름(run)을 공통으로 제공하며, 각 에이전트는 프롬프트 구성만 구현.
 
     Attributes:
+        agent_name (str): 에이전트 테이블 이름 (예: "data_collector").
+        dependencies (tuple[str, ...]): 실행 전에 완료되어야 하는 에이전트 테이블 이름.
+        completes_workflow (bool): True이면 이 에이전트가 완료될 때 워크플로우도 completed로 기록.
         workflow_id (str): 실행 중인 워크플로우의 고유 ID.
+        created_at (datetime): 워크플로우 생성 일시 (파티션 키 - agent 행 조회/갱신 시 해당 월 파티션만 사용).
+        scenario (dict | None): 시나리오 워크플로우의 파라미터 (예산 배분, 경로 등). 일반 워크플로우는 None.
         logger (logging.Logger): 에이전트 별 로그 기록을 위한 로거 인스턴스.
 
     Methods:
-        run(): 각 에이전트가 반드시 구현해야 하는 비동기 실행 메서드.
+        build_messages(upstream): 이전 단계 결과로 LLM에 보낼 메시지를 구성.
+        format_response(text): LLM 응답을 DB에 저장할 형태로 변환.
+        load_upstream(conn): 이전 단계 에이전트의 응답을 조회 (오프라인 배치 실행용).
+        run(): 에이전트 실행.
     """
 
-    def __init__(self, workflow_id: str):
+    agent_name: str = ""
+    dependencies: tuple[str, ...] = ()
+    completes_workflow: bool = False
+
+    def __init__(self, workflow_id: str, created_at: datetime, scenario: dict | None = None):
         self.workflow_id = workflow_id
+        self.created_at = created_at
+        self.scenario = scenario
         self.logger = logging.getLogger(self.__class__.__name__)
 
     @abstractmethod
-    async def run(self):
+    def build_messages(self, upstream: dict[str, str]) -> list[dict]:
         """
-        각 Agent가 구현해야 할 핵심 실행 메서드.
+        이전 단계 에이전트의 결과로 LLM 요청 메시지를 구성.
+
+        Args:
+            upstream (dict[str, str]): 이전 단계 agent 테이블명 -> 응답 JSON 텍스트
+
+        Returns:
+            list[dict]: chat completion 요청 메시지 목록
         """
         pass
+
+    def format_response(self, text: str) -> str:
+        """
+        LLM 응답 텍스트를 DB에 저장할 응답으로 변환. 기본은 그대로 저장.
+        """
+        return text
+
+    def _upstream_responses(self, rows) -> dict[str, str]:
+        """
+        이전 단계 조회 결과에서 응답 본문을 꺼냄. 완료되지 않은 단계가 있으면 예외 발생.
+
+        Raises:
+            RuntimeError: 이전 단계 기록이 없거나 completed가 아닌 경우
+        """
+        records = {row["agent"]: row for row in rows}
+        upstream = {}
+        for dep in self.dependencies:
+            record = records.get(dep)
+            if record is None:
+                raise RuntimeError(f"{dep} record not found in DB")
+            if record["status"] != "completed":
+                raise RuntimeError(f"{dep} status is {record['status']}, not completed")
+            if record["body"] is not None:
+                upstream[dep] = decompress_response(record["codec"], record["body"])
+            else:
+                upstream[dep] = record["response"]
+        return upstream
+
+    async def load_upstream(self, conn) -> dict[str, str]:
+        """
+        이전 단계 에이전트들의 응답을 한 번의 쿼리로 조회.
+
+        Args:
+            conn: DB 커넥션
+
+        Returns:
+            dict[str, str]: 이전 단계 agent 테이블명 -> 응답 JSON 텍스트
+        """
+        if not self.dependencies:
+            return {}
+        rows = await conn.fetch(
+            _upstream_sql(self.dependencies), self.workflow_id, self.created_at
+        )
+        return self._upstream_responses(rows)
+
+    async def _start(self) -> dict[str, str] | None:
+        """
+        상태를 running으로 기록하고 이전 단계 결과를 조회 (단일 문장).
+
+        Returns:
+            dict[str, str] | None: 이전 단계 응답, 취소되어 시작하지 않았으면 None
+        """
+        pool = await connect_db()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                _start_sql(self.agent_name, self.dependencies),
+                self.workflow_id,
+                self.created_at,
+                datetime.now(timezone.utc),
+            )
+        if not any(row["agent"] == self.agent_name for row in rows):
+            return None
+        return self._upstream_responses(rows)
+
+    async def _finish(self, status: str, response, completion=None):
+        """
+        결과, 토큰 사용량, 워크플로우 상태를 한 번의 쿼리로 저장.
+        실패하면 워크플로우를 failed로, 마지막 단계가 완료되면 completed로 기록.
+        LLM 응답을 받은 뒤 실패한 경우(스키마 불일치 등)에도 사용한 토큰은 기록.
+        """
+        if status == "failed":
+            workflow_status = "failed"
+        elif self.completes_workflow:
+            workflow_status = "completed"
+        else:
+            workflow_status = None
+        pool = await connect_db()
+        async with pool.acquire() as conn:
+            await save_agent_response(
+                conn,
+                self.agent_name,
+                self.workflow_id,
+                self.created_at,
+                status,
+                response,
+                model=completion.model if completion else None,
+                workflow_status=workflow_status,
+                usage=completion.usage if completion else None,
+            )
+
+    async def run(self):
+        """
+        에이전트의 공통 실행 메서드.
+
+        - 상태를 'running'으로 기록하면서 이전 단계의 상태와 응답을 함께 조회 (취소된 경우 실행하지 않음).
+        - 이전 단계가 모두 완료되지 않았으면 실패 처리.
+        - 이전 단계 결과로 프롬프트를 구성하여 LLM 응답을 생성하고 스키마로 검증.
+        - 결과(및 필요 시 워크플로우 상태)를 저장하고 상태 변경을 WebSocket으로 알림.
+        - 오류 발생 시 에러 메시지를 저장하고 워크플로우를 실패로 기록한 뒤 알림 전송.
+
+        DB 커넥션은 쿼리마다 잠깐씩만 사용하며, LLM 응답을 기다리는 동안에는 잡지 않음
+        (동시 실행 워크플로우 수가 커넥션 풀 크기를 넘어도 풀이 고갈되지 않음).
+
+        Returns:
+            str | None: LLM 응답 텍스트 (취소되어 실행하지 않았으면 None)
+
+        Raises:
+            Exception: 내부 예외는 로깅 후 재발생하여 호출자에게 전달.
+        """
+        name = self.__class__.__name__
+        completion = None
+        # 실행 중 이벤트 루프가 멈추면 정지 기록에 워크플로우/agent 정보가 함께 남도록 함
+        context_token = bind_workflow_context(self.workflow_id, self.agent_name)
+        try:
+            upstream = await self._start()
+            if upstream is None:
+                self.logger.info(f"{name}: workflow {self.workflow_id} was cancelled")
+                return None
+
+            # 상태 변경 알림 웹소켓 푸시
+            await notify_workflow_update(self.workflow_id)
+
+            completion = await stream_chat_completion(
+                self.build_messages(upstream),
+                agent=self.agent_name,
+                **completion_options(self.agent_name),
+            )
+            # 스키마에 맞지 않는 응답은 다음 단계로 넘기지 않고 실패 처리
+            response_text = validate_response(self.agent_name, completion.text)
+
+            await self._finish("completed", self.format_response(response_text), completion)
+            await notify_workflow_update(self.workflow_id)
+            self.logger.info(f"{name}: saved output to DB for workflow {self.workflow_id}")
+            return response_text
+
+        except Exception as e:
+            self.logger.error(f"{name} run error: {e}")
+            await self._finish("failed", {"error": str(e)}, completion)
+            await notify_workflow_update(self.workflow_id)
+            raise
+        finally:
+            reset_workflow_context(context_token)
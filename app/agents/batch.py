@@ -0,0 +1,402 @@
+# 오프라인(offline) 워크플로우를 OpenAI 호환 Batch API로 일괄 실행
+"""
+execution_mode = 'offline'으로 생성된 워크플로우를 DAG 단계별로 모아 Batch API로 실행.
+
+- 단계마다 이전 단계가 완료된 agent 행을 모아(claim) 하나의 JSONL 배치 파일로 제출하고,
+  완료될 때까지 폴링한 뒤 결과를 save_agent_response로 저장.
+- 요청 하나씩 스트리밍하지 않으므로 지연 시간은 길지만, 같은 rate limit 안에서 처리량이 훨씬 높음.
+
+사용 예:
+    python -m app.agents.batch             # 대기 중인 워크플로우를 한 번 처리
+    python -m app.agents.batch --loop      # BATCH_RUN_INTERVAL_SECONDS 간격으로 반복 실행
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from app.agents.budget_manager import BudgetManagerAgent
+from app.agents.data_collector import DataCollectorAgent
+from app.agents.itinerary_builder import ItineraryBuilderAgent
+from app.agents.llm import agent_models, close_llm_client, get_llm_client
+from app.agents.report_generator import ReportGeneratorAgent
+from app.agents.schemas import InvalidAgentResponse, completion_options, validate_response
+from app.agents.usage import TokenUsage, record_usage_metrics
+from app.api.websocket import notify_workflow_update
+from app.db.database import close_db, connect_db
+from app.db.utils import save_agent_response
+from app.monitoring.metrics import registry
+
+# DAG 단계 (같은 단계의 agent는 하나의 배치로 함께 제출)
+STAGES = (
+    (DataCollectorAgent,),
+    (BudgetManagerAgent, ItineraryBuilderAgent),
+    (ReportGeneratorAgent,),
+)
+
+# 한 단계에서 agent별로 한 번에 가져오는 최대 워크플로우 수
+BATCH_MAX_WORKFLOWS = int(os.getenv("BATCH_MAX_WORKFLOWS", "1000"))
+# 배치 상태 조회 간격(초)
+BATCH_POLL_INTERVAL_SECONDS = float(os.getenv("BATCH_POLL_INTERVAL_SECONDS", "10"))
+# Batch API completion_window
+BATCH_COMPLETION_WINDOW = os.getenv("BATCH_COMPLETION_WINDOW", "24h")
+# 이 시간(초)이 지나도 끝나지 않은 배치는 취소하고 남은 요청을 실패 처리
+BATCH_MAX_WAIT_SECONDS = float(os.getenv("BATCH_MAX_WAIT_SECONDS", "86400"))
+# --loop 실행 시 반복 간격(초)
+BATCH_RUN_INTERVAL_SECONDS = float(os.getenv("BATCH_RUN_INTERVAL_SECONDS", "60"))
+# 배치 요청 비용 = MODEL_PRICES 기준 비용 x 이 비율 (Batch API 할인율)
+BATCH_PRICE_RATIO = float(os.getenv("BATCH_PRICE_RATIO", "0.5"))
+
+_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+logger = logging.getLogger(__name__)
+
+_batch_requests_total = registry.counter(
+    "llm_batch_requests_total",
+    "Agent requests processed through the offline batch API",
+    ("agent", "outcome"),
+)
+
+
+def _claim_sql(agent_cls) -> str:
+    table = agent_cls.agent_name
+    joins = "".join(
+        f"""
+            JOIN {dep} d{i}
+              ON d{i}.workflow_id = w.workflow_id AND d{i}.created_at = w.created_at
+             AND d{i}.status = 'completed'"""
+        for i, dep in enumerate(agent_cls.dependencies)
+    )
+    return f"""
+        UPDATE {table} a SET status = 'running', started_at = $1
+        FROM (
+            SELECT t.workflow_id, t.created_at
+            FROM workflow w
+            JOIN {table} t ON t.workflow_id = w.workflow_id AND t.created_at = w.created_at{joins}
+            WHERE w.execution_mode = 'offline'
+              AND w.status IN ('pending', 'running')
+              AND t.status = 'pending'
+            ORDER BY w.created_at
+            LIMIT $2
+            FOR UPDATE OF t SKIP LOCKED
+        ) c
+        WHERE a.workflow_id = c.workflow_id AND a.created_at = c.created_at
+        RETURNING a.workflow_id, a.created_at
+    """
+
+
+async def claim_pending(conn, agent_cls, limit: int) -> list[tuple[str, datetime]]:
+    """
+    이전 단계가 모두 완료된 offline 워크플로우의 agent 행을 running으로 바꾸고 (workflow_id, created_at) 목록을 반환.
+    SKIP LOCKED로 여러 실행기가 같은 행을 중복으로 가져가지 않음.
+
+    Args:
+        conn: DB 커넥션
+        agent_cls: 처리할 에이전트 클래스
+        limit (int): 최대 개수
+
+    Returns:
+        list[tuple[str, datetime]]: 가져온 (workflow_id, created_at) 목록
+    """
+    now = datetime.now(timezone.utc)
+    rows = await conn.fetch(_claim_sql(agent_cls), now, limit)
+    workflow_ids = [str(row["workflow_id"]) for row in rows]
+    if workflow_ids and not agent_cls.dependencies:
+        # 첫 단계에 들어가는 워크플로우는 pending -> running
+        await conn.execute(
+            """
+            UPDATE workflow SET status = 'running', started_at = $1
+            WHERE workflow_id = ANY($2::uuid[]) AND status = 'pending'
+            """,
+            now,
+            workflow_ids,
+        )
+    return [(str(row["workflow_id"]), row["created_at"]) for row in rows]
+
+
+async def release_stale_claims(conn) -> str:
+    """
+    실행기가 비정상 종료되어 running으로 남은 offline agent 행을 pending으로 되돌림.
+    (BATCH_MAX_WAIT_SECONDS + 1시간이 지나도록 끝나지 않은 행만 대상)
+
+    Args:
+        conn: DB 커넥션
+
+    Returns:
+        str: 마지막 UPDATE 실행 결과 상태 문자열
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=BATCH_MAX_WAIT_SECONDS + 3600)
+    result = ""
+    for stage in STAGES:
+        for agent_cls in stage:
+            result = await conn.execute(
+                f"""
+                UPDATE {agent_cls.agent_name} a SET status = 'pending', started_at = NULL
+                FROM workflow w
+                WHERE a.workflow_id = w.workflow_id AND a.created_at = w.created_at
+                  AND w.execution_mode = 'offline' AND a.status = 'running' AND a.started_at < $1
+                """,
+                cutoff,
+            )
+    return result
+
+
+async def _submit_batch(client, lines: list[dict]) -> str:
+    """
+    요청 목록을 JSONL 파일로 업로드하고 배치를 생성하여 batch id를 반환.
+    """
+    data = "\n".join(json.dumps(line, ensure_ascii=False) for line in lines).encode("utf-8")
+    input_file = await client.files.create(file=("batch.jsonl", data), purpose="batch")
+    batch = await client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window=BATCH_COMPLETION_WINDOW,
+    )
+    return batch.id
+
+
+async def _wait_for_batch(client, batch_id: str):
+    """
+    배치가 끝날 때까지 BATCH_POLL_INTERVAL_SECONDS 간격으로 상태를 조회.
+    BATCH_MAX_WAIT_SECONDS를 넘기면 배치를 취소하고 마지막 상태를 반환.
+    """
+    deadline = time.monotonic() + BATCH_MAX_WAIT_SECONDS
+    while True:
+        batch = await client.batches.retrieve(batch_id)
+        if batch.status in _TERMINAL_STATUSES:
+            return batch
+        if time.monotonic() >= deadline:
+            logger.warning(f"배치 대기 시간 초과, 취소: {batch_id}")
+            return await client.batches.cancel(batch_id)
+        counts = batch.request_counts
+        if counts:
+            logger.info(
+                f"배치 진행 중 {batch_id}: {batch.status} ({counts.completed + counts.failed}/{counts.total})"
+            )
+        await asyncio.sleep(BATCH_POLL_INTERVAL_SECONDS)
+
+
+async def _read_results(
+    client, batch, model: str
+) -> dict[str, tuple[str | None, str | None, TokenUsage | None]]:
+    """
+    배치 결과/에러 파일을 읽어 custom_id -> (응답 텍스트, 에러 메시지, 토큰 사용량) 딕셔너리로 변환.
+    배치 요청의 비용은 BATCH_PRICE_RATIO를 곱해 계산.
+    """
+    results = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        content = await client.files.content(file_id)
+        for raw in content.text.splitlines():
+            if not raw.strip():
+                continue
+            line = json.loads(raw)
+            response = line.get("response") or {}
+            body = response.get("body") or {}
+            if line.get("error"):
+                results[line["custom_id"]] = (
+                    None,
+                    line["error"].get("message", str(line["error"])),
+                    None,
+                )
+            elif response.get("status_code") != 200:
+                error = body.get("error") or {}
+                results[line["custom_id"]] = (
+                    None,
+                    error.get("message") or f"status code {response.get('status_code')}",
+                    None,
+                )
+            else:
+                usage = TokenUsage.from_response(body.get("usage"), body.get("model") or model)
+                if usage is not None:
+                    usage.cost_usd *= BATCH_PRICE_RATIO
+                results[line["custom_id"]] = (
+                    body["choices"][0]["message"]["content"],
+                    None,
+                    usage,
+                )
+    return results
+
+
+async def _save_result(
+    agent, model: str, text: str | None, error: str | None, usage: TokenUsage | None = None
+):
+    """
+    배치 결과 하나를 스키마로 검증한 뒤 agent 테이블에 저장하고 워크플로우 상태를 갱신.
+    마지막 단계가 완료되면 워크플로우를 completed로, 실패하면 failed로 기록.
+    응답을 받은 요청은 스키마 검증에 실패해도 토큰 사용량을 기록.
+    """
+    if text is not None:
+        try:
+            text = validate_response(agent.agent_name, text)
+        except InvalidAgentResponse as e:
+            text, error = None, str(e)
+
+    pool = await connect_db()
+    async with pool.acquire() as conn:
+        if text is not None:
+            await save_agent_response(
+                conn,
+                agent.agent_name,
+                agent.workflow_id,
+                agent.created_at,
+                "completed",
+                agent.format_response(text),
+                model=model,
+                workflow_status="completed" if agent.completes_workflow else None,
+                usage=usage,
+            )
+        else:
+            agent.logger.error(f"batch request failed for workflow {agent.workflow_id}: {error}")
+            await save_agent_response(
+                conn,
+                agent.agent_name,
+                agent.workflow_id,
+                agent.created_at,
+                "failed",
+                {"error": error},
+                model=model if usage is not None else None,
+                workflow_status="failed",
+                usage=usage,
+            )
+    _batch_requests_total.inc(
+        agent=agent.agent_name, outcome="success" if text is not None else "error"
+    )
+    record_usage_metrics(agent.agent_name, model, usage)
+    await notify_workflow_update(agent.workflow_id)
+
+
+async def _run_model_batch(client, model: str, agents: dict[str, object], lines: list[dict]):
+    """
+    같은 모델을 쓰는 요청들을 하나의 배치로 실행하고 결과를 저장.
+    """
+    try:
+        batch_id = await _submit_batch(client, lines)
+        logger.info(f"배치 제출: {batch_id} (model={model}, 요청 {len(lines)}개)")
+        batch = await _wait_for_batch(client, batch_id)
+        results = await _read_results(client, batch, model)
+        logger.info(f"배치 종료: {batch_id} ({batch.status}, 결과 {len(results)}개)")
+        missing_error = f"batch {batch_id} {batch.status} without a result"
+    except Exception as e:
+        logger.error(f"배치 실행 실패 (model={model}): {e}")
+        results, missing_error = {}, f"batch submission failed: {e}"
+
+    for custom_id, agent in agents.items():
+        text, error, usage = results.get(custom_id, (None, missing_error, None))
+        try:
+            await _save_result(agent, model, text, error, usage)
+        except Exception as e:
+            logger.error(f"배치 결과 저장 실패 ({custom_id}): {e}")
+
+
+async def run_stage(stage: tuple, limit: int = BATCH_MAX_WORKFLOWS) -> int:
+    """
+    DAG 한 단계의 대기 중인 agent 요청을 모아 모델별 배치로 실행.
+
+    Args:
+        stage (tuple): 같은 단계의 에이전트 클래스 목록
+        limit (int): agent별 최대 워크플로우 수
+
+    Returns:
+        int: 배치로 제출한 요청 수
+    """
+    client = get_llm_client()
+    pool = await connect_db()
+    # model -> (custom_id -> agent, 요청 목록)
+    groups: dict[str, tuple[dict, list]] = defaultdict(lambda: ({}, []))
+    failed = []
+
+    async with pool.acquire() as conn:
+        for agent_cls in stage:
+            for workflow_id, created_at in await claim_pending(conn, agent_cls, limit):
+                agent = agent_cls(workflow_id, created_at)
+                try:
+                    messages = agent.build_messages(await agent.load_upstream(conn))
+                except Exception as e:
+                    failed.append((agent, str(e)))
+                    continue
+                model = agent_models(agent.agent_name)[0]
+                custom_id = f"{workflow_id}:{agent.agent_name}"
+                agents, lines = groups[model]
+                agents[custom_id] = agent
+                lines.append(
+                    {
+                        "custom_id": custom_id,
+                        "method": "POST",
+                        "url": "/v1/chat/completions",
+                        "body": {
+                            "model": model,
+                            "messages": messages,
+                            **completion_options(agent.agent_name),
+                        },
+                    }
+                )
+
+    # 커넥션을 반납한 뒤 알림 전송 및 배치 대기 (배치 대기 중에는 커넥션을 잡지 않음)
+    for agents, _ in groups.values():
+        for agent in agents.values():
+            await notify_workflow_update(agent.workflow_id)
+    for agent, error in failed:
+        await _save_result(agent, "", None, error)
+
+    await asyncio.gather(
+        *(
+            _run_model_batch(client, model, agents, lines)
+            for model, (agents, lines) in groups.items()
+        )
+    )
+    return sum(len(lines) for _, lines in groups.values())
+
+
+async def run_offline_batches(limit: int = BATCH_MAX_WORKFLOWS) -> int:
+    """
+    대기 중인 offline 워크플로우를 DAG 단계 순서대로 배치 실행.
+    앞 단계에서 완료된 워크플로우는 같은 실행 안에서 바로 다음 단계로 이어짐.
+
+    Args:
+        limit (int): 단계의 agent별 최대 워크플로우 수
+
+    Returns:
+        int: 전체 단계에서 제출한 요청 수
+    """
+    pool = await connect_db()
+    async with pool.acquire() as conn:
+        await release_stale_claims(conn)
+
+    total = 0
+    for stage in STAGES:
+        submitted = await run_stage(stage, limit)
+        names = ", ".join(agent_cls.agent_name for agent_cls in stage)
+        logger.info(f"단계 처리 완료 [{names}]: 요청 {submitted}개")
+        total += submitted
+    return total
+
+
+async def main(loop: bool, limit: int):
+    try:
+        while True:
+            await run_offline_batches(limit)
+            if not loop:
+                break
+            await asyncio.sleep(BATCH_RUN_INTERVAL_SECONDS)
+    finally:
+        await close_llm_client()
+        await close_db()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="offline 워크플로우 배치 실행기")
+    parser.add_argument("--loop", action="store_true", help="BATCH_RUN_INTERVAL_SECONDS 간격으로 반복 실행")
+    parser.add_argument("--limit", type=int, default=BATCH_MAX_WORKFLOWS, help="단계의 agent별 최대 워크플로우 수")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
+    )
+    asyncio.run(main(args.loop, args.limit))
@@ -1,83 +1,43 @@
 import json
-import os
-from datetime import datetime, timezone
-
-from openai import OpenAI
 
 from app.agents.base import BaseAgent
-from app.agents.utils import check_agent_status  # 상태 체크 함수 import
-from app.api.websocket import notify_workflow_update
-from app.db.database import connect_db
-from app.db.utils import save_agent_response  # DB 저장 함수
+from app.agents.scenario import (
+    allocation_lines,
+    scenario_prompt_section,
+    scenario_total_budget,
+)
 
 
 class BudgetManagerAgent(BaseAgent):
-    async def run(self):
+    agent_name = "budget_manager"
+    dependencies = ("data_collector",)
+
+    def build_messages(self, upstream: dict[str, str]) -> list[dict]:
         """
-        예산 관리 에이전트의 주요 실행 메서드.
+        LLM에 보낼 메시지를 구성. (스트리밍 실행과 오프라인 배치 실행에서 공통으로 사용)
 
-        - 에이전트 상태를 'running'으로 업데이트하고 시작 시간 기록.
-        - DataCollectorAgent의 완료 상태 및 결과를 확인하여 유효하지 않으면 실패 처리.
-        - DataCollectorAgent의 응답(JSON) 데이터를 읽어 예산 배분, 지출, 잔액 계산 등의 작업을 OpenAI API를 통해 수행.
-        - 결과 JSON을 DB에 저장하고 상태 변경을 WebSocket으로 알림.
-        - 오류 발생 시 에러 상태 및 메시지를 DB에 기록하고 워크플로우 상태를 실패로 업데이트하며 알림 전송.
+        Args:
+            upstream (dict[str, str]): 이전 단계 agent 테이블명 -> 응답 JSON 텍스트
 
         Returns:
-            str: OpenAI로부터 생성된 JSON 응답 텍스트.
-
-        Raises:
-            Exception: 내부 예외는 로깅 후 재발생하여 호출자에게 전달.
+            list[dict]: chat completion 요청 메시지 목록
         """
-        pool = await connect_db()
-        async with pool.acquire() as conn:
-            try:
-                # 시작 상태 업데이트
-                await conn.execute(
-                    "UPDATE budget_manager SET status = 'running', started_at = $1 WHERE workflow_id = $2",
-                    datetime.now(timezone.utc),
-                    self.workflow_id,
-                )
-
-                # 상태 변경 알림 웹소켓 푸시
-                await notify_workflow_update(self.workflow_id)
-
-                # data_collector agent 상태 체크
-                error_msg = await check_agent_status(
-                    conn, "data_collector", self.workflow_id
-                )
-                if error_msg:
-                    self.logger.error(error_msg)
-                    await save_agent_response(
-                        conn,
-                        "budget_manager",
-                        self.workflow_id,
-                        "failed",
-                        {"error": error_msg},
-                    )
-                    return
-
-                # DB에서 data_collector agent 결과 읽기
-                record = await conn.fetchrow(
-                    "SELECT response FROM data_collector WHERE workflow_id = $1",
-                    self.workflow_id,
-                )
-
-                trip_plan_json = record["response"]
-                if isinstance(trip_plan_json, str):
-                    trip_plan_data = json.loads(trip_plan_json)
-                else:
-                    trip_plan_data = trip_plan_json
-
-                pretty_trip_plan = json.dumps(trip_plan_data, indent=2)
-
-                client = OpenAI(
-                    base_url="https://api.deepauto.ai/openai/v1",
-                    api_key=os.getenv("API_KEY"),
-                )
-
-                system_prompt = "You are the Budget Manager agent."
-
-                user_prompt = f"""
+        # data_collector agent 결과 (실행 시작 시 함께 조회됨)
+        trip_plan_json = upstream["data_collector"]
+        if isinstance(trip_plan_json, str):
+            trip_plan_data = json.loads(trip_plan_json)
+        else:
+            trip_plan_data = trip_plan_json
+
+        pretty_trip_plan = json.dumps(trip_plan_data, indent=2)
+        # 시나리오 워크플로우는 예산과 배분을 시나리오 값으로 대체
+        total_budget = f"{scenario_total_budget(self.scenario):g}"
+        allocation = allocation_lines(self.scenario)
+        scenario = scenario_prompt_section(self.scenario)
+
+        system_prompt = "You are the Budget Manager agent."
+
+        user_prompt = f"""
 You are the Budget Manager agent.
 
 Input:
@@ -86,12 +46,8 @@ Input:
 
 Task:
 
-1. Allocate 3000 USD budget as:
-    - Flights: 800 USD
-    - Accommodation: 1000 USD
-    - Transport (non-JR): 200 USD
-    - Meals: 600 USD
-    - Entrance fees: 400 USD
+1. Allocate {total_budget} USD budget as:
+{allocation}
 
 2. Calculate spent vs. remaining using provided prices.
 
@@ -109,53 +65,9 @@ IMPORTANT:
 - **Your response MUST be ONLY a valid JSON object.**
 - **Do NOT include any explanations, markdown, or code blocks.**
 - **Just output a single, valid JSON object, and nothing else.**
+{scenario}"""
 
-5. Show all steps and reasoning.
-
-6. Save this JSON to a file named budget.json.
-"""
-
-                messages = [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ]
-
-                response_text = ""
-
-                chat_completion = client.chat.completions.create(
-                    model="openai/gpt-4o-mini-2024-07-18",
-                    messages=messages,
-                    stream=True,
-                )
-
-                for chunk in chat_completion:
-                    delta = chunk.choices[0].delta
-                    if delta.content:
-                        response_text += delta.content
-
-                # DB에 결과 저장
-                await save_agent_response(
-                    conn, "budget_manager", self.workflow_id, "completed", response_text
-                )
-                await notify_workflow_update(self.workflow_id)
-                self.logger.info(
-                    f"BudgetManagerAgent: saved output to DB for workflow {self.workflow_id}"
-                )
-
-                return response_text
-
-            except Exception as e:
-                self.logger.error(f"BudgetManagerAgent run error: {e}")
-                error_response = {"error": str(e)}
-                await save_agent_response(
-                    conn, "budget_manager", self.workflow_id, "failed", error_response
-                )
-                # 워크플로우 상태도 failed로 업데이트
-                await conn.execute(
-                    "UPDATE workflow SET status = 'failed' WHERE workflow_id = $1",
-                    self.workflow_id,
-                )
-
-                await notify_workflow_update(self.workflow_id)
-
-                raise e
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
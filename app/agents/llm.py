@@ -0,0 +1,351 @@
+# LLM 클라이언트 공통 설정
+import asyncio
+import logging
+import os
+import random
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncOpenAI
+
+from app.agents.usage import TokenUsage, record_usage_metrics
+from app.monitoring.metrics import registry
+
+load_dotenv()  # .env 파일 읽기
+
+# 로컬 목(mock) LLM 서버 등으로 교체할 수 있도록 환경변수로 설정
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.deepauto.ai/openai/v1")
+# 프로세스 전체에서 공유하는 HTTP 커넥션 풀 크기
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+# 시작 시 미리 열어 둘 LLM 커넥션 수 (TLS 핸드셰이크를 첫 요청 전에 완료)
+LLM_WARMUP_CONNECTIONS = int(os.getenv("LLM_WARMUP_CONNECTIONS", "2"))
+LLM_WARMUP_TIMEOUT_SECONDS = float(os.getenv("LLM_WARMUP_TIMEOUT_SECONDS", "5"))
+
+# agent별 후보 모델 목록 (쉼표 구분, 앞쪽일수록 선호)
+# LLM_MODELS_<AGENT> (예: LLM_MODELS_REPORT_GENERATOR)가 없으면 LLM_DEFAULT_MODELS 사용
+LLM_DEFAULT_MODELS = os.getenv("LLM_DEFAULT_MODELS", "openai/gpt-4o-mini-2024-07-18")
+# 모델별 통계를 계산할 최근 호출 수
+LLM_ROUTER_WINDOW = int(os.getenv("LLM_ROUTER_WINDOW", "50"))
+# 최근 오류율이 이 값을 넘으면 성능 저하 모델로 보고 후순위로 미룸
+LLM_ROUTER_MAX_ERROR_RATE = float(os.getenv("LLM_ROUTER_MAX_ERROR_RATE", "0.3"))
+LLM_ROUTER_MIN_SAMPLES = int(os.getenv("LLM_ROUTER_MIN_SAMPLES", "5"))
+# 연속 실패 시 해당 모델을 건너뛰는 시간(초)
+LLM_ROUTER_COOLDOWN_SECONDS = float(os.getenv("LLM_ROUTER_COOLDOWN_SECONDS", "30"))
+LLM_ROUTER_COOLDOWN_AFTER_ERRORS = int(os.getenv("LLM_ROUTER_COOLDOWN_AFTER_ERRORS", "3"))
+# 빠른 모델만 계속 선택되어 다른 모델 통계가 오래되지 않도록 가끔 다른 후보를 먼저 시도하는 확률
+LLM_ROUTER_EXPLORE_RATE = float(os.getenv("LLM_ROUTER_EXPLORE_RATE", "0.05"))
+# 예상 소요 시간 = TTFT + 예상 출력 토큰 수 / 초당 토큰 수
+LLM_ROUTER_EXPECTED_TOKENS = int(os.getenv("LLM_ROUTER_EXPECTED_TOKENS", "500"))
+# 첫 토큰을 이 시간 안에 받지 못하면 다음 후보 모델로 넘어감
+LLM_FIRST_TOKEN_TIMEOUT_SECONDS = float(os.getenv("LLM_FIRST_TOKEN_TIMEOUT_SECONDS", "30"))
+# 스트리밍 응답 마지막 청크로 토큰 사용량을 받음 (stream_options 미지원 서버는 false)
+LLM_STREAM_USAGE = os.getenv("LLM_STREAM_USAGE", "true").lower() == "true"
+
+logger = logging.getLogger(__name__)
+
+_client: AsyncOpenAI | None = None
+
+_llm_requests = registry.counter(
+    "llm_requests_total", "LLM chat completion attempts", ("model", "outcome")
+)
+_llm_ttft = registry.histogram(
+    "llm_time_to_first_token_seconds", "Time to first streamed token", ("model",)
+)
+_llm_tokens_per_sec = registry.gauge(
+    "llm_tokens_per_second", "Rolling median streaming speed per model", ("model",)
+)
+_llm_error_rate = registry.gauge(
+    "llm_error_rate", "Rolling error rate per model", ("model",)
+)
+
+
+def agent_models(agent: str) -> list[str]:
+    """
+    agent가 사용할 후보 모델 목록을 반환.
+
+    Args:
+        agent (str): agent 테이블명 (예: "data_collector")
+
+    Returns:
+        list[str]: 후보 모델 이름 목록 (설정 순서)
+    """
+    raw = os.getenv(f"LLM_MODELS_{agent.upper()}") or LLM_DEFAULT_MODELS
+    return [model.strip() for model in raw.split(",") if model.strip()]
+
+
+class ModelStats:
+    """
+    모델 하나의 최근 호출 결과(TTFT, 초당 토큰 수, 실패 여부)를 보관.
+    """
+
+    def __init__(self, window: int = LLM_ROUTER_WINDOW):
+        # (성공 여부, ttft, tokens/sec)
+        self.samples: deque[tuple[bool, float, float]] = deque(maxlen=window)
+        self.consecutive_errors = 0
+        self.cooldown_until = 0.0
+
+    def record_success(self, ttft: float, tokens_per_sec: float):
+        self.samples.append((True, ttft, tokens_per_sec))
+        self.consecutive_errors = 0
+
+    def record_error(self):
+        self.samples.append((False, 0.0, 0.0))
+        self.consecutive_errors += 1
+        if self.consecutive_errors >= LLM_ROUTER_COOLDOWN_AFTER_ERRORS:
+            self.cooldown_until = time.monotonic() + LLM_ROUTER_COOLDOWN_SECONDS
+
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for ok, _, _ in self.samples if not ok) / len(self.samples)
+
+    def median_ttft(self) -> float | None:
+        values = [ttft for ok, ttft, _ in self.samples if ok]
+        return statistics.median(values) if values else None
+
+    def median_tokens_per_sec(self) -> float | None:
+        values = [tps for ok, _, tps in self.samples if ok and tps > 0]
+        return statistics.median(values) if values else None
+
+    def expected_seconds(self) -> float | None:
+        """
+        최근 통계로 추정한 호출 1회의 예상 소요 시간. 성공 기록이 없으면 None.
+        """
+        ttft = self.median_ttft()
+        if ttft is None:
+            return None
+        tps = self.median_tokens_per_sec()
+        return ttft + (LLM_ROUTER_EXPECTED_TOKENS / tps if tps else 0.0)
+
+    def is_degraded(self) -> bool:
+        if time.monotonic() < self.cooldown_until:
+            return True
+        return (
+            len(self.samples) >= LLM_ROUTER_MIN_SAMPLES
+            and self.error_rate() > LLM_ROUTER_MAX_ERROR_RATE
+        )
+
+
+class ModelRouter:
+    """
+    후보 모델 중 가장 빠른 정상 모델부터 시도하도록 순서를 정하는 라우터.
+
+    - 정상 모델은 예상 소요 시간(TTFT + 토큰 생성 시간)이 짧은 순,
+      아직 성공 기록이 없는 모델은 설정 순서대로 맨 앞에서 시도하여 통계를 수집
+    - 오류율이 높거나 연속 실패로 쿨다운 중인 모델은 맨 뒤로 (모든 후보가 저하되었을 때만 사용)
+    """
+
+    def __init__(self):
+        self._stats: dict[str, ModelStats] = {}
+
+    def stats(self, model: str) -> ModelStats:
+        if model not in self._stats:
+            self._stats[model] = ModelStats()
+        return self._stats[model]
+
+    def rank(self, candidates: list[str]) -> list[str]:
+        """
+        호출을 시도할 모델 순서를 반환.
+
+        Args:
+            candidates (list[str]): 설정된 후보 모델 목록
+
+        Returns:
+            list[str]: 시도 순서대로 정렬된 모델 목록
+        """
+        healthy, degraded = [], []
+        for index, model in enumerate(candidates):
+            stats = self.stats(model)
+            if stats.is_degraded():
+                degraded.append((stats.error_rate(), index, model))
+            else:
+                expected = stats.expected_seconds()
+                # 성공 기록이 없는 모델은 우선 시도하여 통계를 수집
+                healthy.append((expected is not None, expected or 0.0, index, model))
+
+        ordered = [model for *_, model in sorted(healthy)]
+        if len(ordered) > 1 and random.random() < LLM_ROUTER_EXPLORE_RATE:
+            ordered.insert(0, ordered.pop(random.randrange(1, len(ordered))))
+        return ordered + [model for *_, model in sorted(degraded)]
+
+    def record_success(self, model: str, ttft: float, tokens_per_sec: float):
+        stats = self.stats(model)
+        stats.record_success(ttft, tokens_per_sec)
+        _llm_requests.inc(model=model, outcome="success")
+        _llm_ttft.observe(ttft, model=model)
+        _llm_tokens_per_sec.set(stats.median_tokens_per_sec() or 0, model=model)
+        _llm_error_rate.set(stats.error_rate(), model=model)
+
+    def record_error(self, model: str):
+        stats = self.stats(model)
+        stats.record_error()
+        _llm_requests.inc(model=model, outcome="error")
+        _llm_error_rate.set(stats.error_rate(), model=model)
+
+
+model_router = ModelRouter()
+
+
+@dataclass
+class ChatCompletionResult:
+    """
+    stream_chat_completion 결과.
+
+    Attributes:
+        text (str): 전체 응답 텍스트
+        model (str): 실제로 응답한 모델
+        usage (TokenUsage | None): 토큰 사용량 (서버가 알려주지 않으면 None)
+    """
+
+    text: str
+    model: str
+    usage: TokenUsage | None = None
+
+
+def get_llm_client() -> AsyncOpenAI:
+    """
+    에이전트에서 공유하는 OpenAI 호환 비동기 클라이언트를 반환. 없으면 새로 생성.
+    base_url은 LLM_BASE_URL 환경변수, API 키는 API_KEY 환경변수를 사용.
+    요청마다 클라이언트를 만들지 않으므로 커넥션(TLS 세션)이 재사용됨.
+
+    Returns:
+        AsyncOpenAI: OpenAI 호환 비동기 API 클라이언트 객체
+    """
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(
+            base_url=LLM_BASE_URL,
+            api_key=os.getenv("API_KEY"),
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_CONNECTIONS,
+                ),
+                timeout=httpx.Timeout(600.0, connect=10.0),
+            ),
+        )
+    return _client
+
+
+async def _stream_once(
+    messages: list[dict], model: str, options: dict
+) -> tuple[str, float, float, object]:
+    """
+    모델 하나로 스트리밍 요청을 1회 수행. 첫 토큰이 LLM_FIRST_TOKEN_TIMEOUT_SECONDS 안에
+    오지 않으면 TimeoutError.
+
+    Returns:
+        tuple[str, float, float, object]: (응답 텍스트, TTFT(초), 초당 토큰 수, usage 또는 None)
+    """
+    client = get_llm_client()
+    started = time.monotonic()
+    first_token_at = None
+    parts = []
+    usage = None
+    if LLM_STREAM_USAGE:
+        options = {**options, "stream_options": {"include_usage": True}}
+
+    async with asyncio.timeout(LLM_FIRST_TOKEN_TIMEOUT_SECONDS) as first_token_deadline:
+        chat_completion = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            **options,
+        )
+        try:
+            async for chunk in chat_completion:
+                if chunk.usage is not None:
+                    # include_usage 사용 시 choices가 빈 마지막 청크에 사용량이 담겨 옴
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    if first_token_at is None:
+                        first_token_at = time.monotonic()
+                        # 첫 토큰 이후에는 시간 제한 없이 끝까지 수신
+                        first_token_deadline.reschedule(None)
+                    parts.append(delta.content)
+        finally:
+            await chat_completion.close()
+
+    ended = time.monotonic()
+    ttft = (first_token_at or ended) - started
+    generation = ended - (first_token_at or ended)
+    # 사용량을 받으면 실제 출력 토큰 수, 아니면 청크 수로 속도 계산
+    tokens = usage.completion_tokens if usage is not None else len(parts)
+    tokens_per_sec = tokens / generation if generation > 0 else 0.0
+    return "".join(parts), ttft, tokens_per_sec, usage
+
+
+async def stream_chat_completion(
+    messages: list[dict], agent: str, **options
+) -> ChatCompletionResult:
+    """
+    agent의 후보 모델 중 라우터가 정한 순서대로 스트리밍 chat completion을 요청.
+    호출이 실패하거나 첫 토큰이 너무 늦으면 다음 후보 모델로 넘어가며,
+    결과(TTFT, 초당 토큰 수, 실패 여부)는 모델별 통계에 기록.
+
+    Args:
+        messages (list[dict]): chat 메시지 목록
+        agent (str): 요청하는 agent 테이블명 (후보 모델 목록 선택에 사용)
+        **options: 요청에 추가할 옵션 (예: max_tokens, response_format)
+
+    Returns:
+        ChatCompletionResult: 응답 텍스트, 실제로 사용한 모델, 토큰 사용량
+
+    Raises:
+        Exception: 모든 후보 모델이 실패하면 마지막 오류를 그대로 전달
+    """
+    last_error = None
+    for model in model_router.rank(agent_models(agent)):
+        try:
+            text, ttft, tokens_per_sec, usage = await _stream_once(messages, model, options)
+        except Exception as e:
+            model_router.record_error(model)
+            logger.warning(f"LLM 호출 실패 ({agent}, {model}): {e!r} - 다음 후보 모델 시도")
+            last_error = e
+            continue
+
+        model_router.record_success(model, ttft, tokens_per_sec)
+        token_usage = TokenUsage.from_response(usage, model)
+        record_usage_metrics(agent, model, token_usage)
+        return ChatCompletionResult(text=text, model=model, usage=token_usage)
+
+    raise last_error or RuntimeError(f"No LLM model configured for '{agent}'")
+
+
+async def warmup_llm_client() -> bool:
+    """
+    LLM_WARMUP_CONNECTIONS개의 가벼운 요청(모델 목록 조회)을 동시에 보내 커넥션 풀을 미리 채움.
+    실패해도 서버 시작을 막지 않으며, 첫 요청에서 다시 연결함.
+
+    Returns:
+        bool: 모든 예열 요청이 성공하면 True
+    """
+    client = get_llm_client()
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(
+                *(client.models.list() for _ in range(LLM_WARMUP_CONNECTIONS))
+            ),
+            timeout=LLM_WARMUP_TIMEOUT_SECONDS,
+        )
+        return True
+    except Exception as e:
+        logger.warning(f"LLM 커넥션 예열 실패: {e}")
+        return False
+
+
+async def close_llm_client():
+    """
+    공유 LLM 클라이언트와 커넥션 풀을 종료.
+    """
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
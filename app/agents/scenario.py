@@ -0,0 +1,91 @@
+# 시나리오 워크플로우의 파라미터 (예산 배분, 경로 등) 및 프롬프트 구성 헬퍼
+
+# data_collector가 수집하는 고정 여행 조건 (시나리오는 이 범위 안에서 예산/경로만 바꿈)
+COLLECTED_ROUTE = ("Tokyo", "Kyoto", "Osaka")
+DEFAULT_TOTAL_BUDGET = 3000
+DEFAULT_ALLOCATION = {
+    "Flights": 800,
+    "Accommodation": 1000,
+    "Transport (non-JR)": 200,
+    "Meals": 600,
+    "Entrance fees": 400,
+}
+
+
+def _format_usd(amount: float) -> str:
+    return f"{amount:g} USD"
+
+
+def scenario_total_budget(scenario: dict | None) -> float:
+    """
+    시나리오의 총예산. 지정하지 않았으면 배분 합계, 배분도 없으면 기본 예산.
+    """
+    scenario = scenario or {}
+    if scenario.get("total_budget") is not None:
+        return scenario["total_budget"]
+    if scenario.get("allocation"):
+        return sum(scenario["allocation"].values())
+    return DEFAULT_TOTAL_BUDGET
+
+
+def scenario_allocation(scenario: dict | None) -> dict[str, float]:
+    """
+    시나리오의 항목별 예산 배분. 지정하지 않았으면 기본 배분을 총예산 비율에 맞춰 조정.
+    """
+    scenario = scenario or {}
+    if scenario.get("allocation"):
+        return dict(scenario["allocation"])
+    ratio = scenario_total_budget(scenario) / DEFAULT_TOTAL_BUDGET
+    return {category: round(amount * ratio) for category, amount in DEFAULT_ALLOCATION.items()}
+
+
+def scenario_route(scenario: dict | None) -> list[str]:
+    """
+    시나리오의 방문 경로 (지정하지 않았으면 수집한 경로 그대로).
+    """
+    route = (scenario or {}).get("route")
+    return list(route) if route else list(COLLECTED_ROUTE)
+
+
+def validate_scenario(scenario: dict):
+    """
+    시나리오 파라미터가 수집한 데이터로 계획할 수 있는 범위인지 확인.
+
+    Raises:
+        ValueError: 예산이 0 이하이거나, 수집하지 않은 도시가 경로에 있는 경우
+    """
+    if scenario.get("total_budget") is not None and scenario["total_budget"] <= 0:
+        raise ValueError("total_budget must be positive")
+    if any(amount < 0 for amount in (scenario.get("allocation") or {}).values()):
+        raise ValueError("allocation amounts must not be negative")
+    unknown = [city for city in scenario.get("route") or () if city not in COLLECTED_ROUTE]
+    if unknown:
+        raise ValueError(
+            f"route may only contain collected cities {list(COLLECTED_ROUTE)}: {unknown}"
+        )
+
+
+def scenario_prompt_section(scenario: dict | None) -> str:
+    """
+    프롬프트 끝에 붙일 시나리오 조건 문단. 시나리오가 없으면 빈 문자열.
+    시나리오마다 다른 내용은 프롬프트 뒤쪽에 두어, 수집 데이터가 들어간 앞부분은
+    시나리오끼리 같게 유지 (LLM 프롬프트 캐시 재사용).
+    """
+    if not scenario:
+        return ""
+    lines = [f"Scenario: {scenario.get('name', 'unnamed')}"]
+    lines.append(f"- Total budget: {_format_usd(scenario_total_budget(scenario))}")
+    lines.append(f"- Route: {' → '.join(scenario_route(scenario))}")
+    if scenario.get("notes"):
+        lines.append(f"- Additional requirements: {scenario['notes']}")
+    return "\n" + "\n".join(lines) + "\n"
+
+
+def allocation_lines(scenario: dict | None) -> str:
+    """
+    budget_manager 프롬프트의 항목별 배분 목록.
+    """
+    return "\n".join(
+        f"    - {category}: {_format_usd(amount)}"
+        for category, amount in scenario_allocation(scenario).items()
+    )
@@ -0,0 +1,248 @@
+# 사용자별 가중 공정 큐(WFQ) 기반 워크플로우 실행 스케줄러
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable
+
+from app.monitoring.metrics import registry
+
+# 우선순위 클래스 (WorkflowRequest.priority)
+PRIORITY_CLASSES = ("interactive", "standard", "batch")
+
+# 프로세스(워커)당 동시에 실행하는 최대 워크플로우 수
+SCHEDULER_MAX_CONCURRENT = int(os.getenv("SCHEDULER_MAX_CONCURRENT", "32"))
+# 사용자 한 명이 동시에 실행할 수 있는 최대 워크플로우 수
+SCHEDULER_USER_MAX_CONCURRENT = int(os.getenv("SCHEDULER_USER_MAX_CONCURRENT", "4"))
+# 다른 사용자가 기다리지 않을 때 사용자별 제한을 넘어 빈 슬롯을 쓰되,
+# 새로 들어오는 요청을 위해 비워 둘 슬롯 수
+SCHEDULER_BURST_HEADROOM = int(os.getenv("SCHEDULER_BURST_HEADROOM", "2"))
+# 우선순위 클래스별 가중치 (예: "interactive=4,standard=2,batch=1")
+SCHEDULER_PRIORITY_WEIGHTS = os.getenv(
+    "SCHEDULER_PRIORITY_WEIGHTS", "interactive=4,standard=2,batch=1"
+)
+
+logger = logging.getLogger(__name__)
+
+_queue_wait = registry.histogram(
+    "workflow_queue_wait_seconds",
+    "Time a workflow waited in the scheduler queue before its agents started",
+    ("priority",),
+)
+_queue_depth = registry.gauge(
+    "workflow_queue_depth", "Workflows waiting in the scheduler queue", ("priority",)
+)
+_running_gauge = registry.gauge(
+    "workflow_running", "Workflows currently executing agents in this process"
+)
+_admitted_total = registry.counter(
+    "workflow_admitted_total",
+    "Workflows admitted by the scheduler (burst=true if admitted beyond the per-user cap)",
+    ("priority", "burst"),
+)
+
+
+def parse_priority_weights(raw: str) -> dict[str, float]:
+    """
+    "interactive=4,standard=2,batch=1" 형태의 문자열을 가중치 딕셔너리로 변환.
+    지정하지 않은 클래스는 가중치 1.
+
+    Args:
+        raw (str): 우선순위 클래스별 가중치 문자열
+
+    Returns:
+        dict[str, float]: 우선순위 클래스 -> 가중치
+    """
+    weights = {priority: 1.0 for priority in PRIORITY_CLASSES}
+    for item in raw.split(","):
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if name in weights and value.strip():
+            weights[name] = max(float(value), 0.001)
+    return weights
+
+
+class _Job:
+    __slots__ = ("user_id", "priority", "enqueued_at", "admitted")
+
+    def __init__(self, user_id: int, priority: str):
+        self.user_id = user_id
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.admitted = asyncio.Event()
+
+
+class WorkflowScheduler:
+    """
+    사용자(user_id)별 가중 공정 큐 스케줄러.
+
+    - 대기열은 (사용자, 우선순위 클래스)별로 두고, 사용자의 다음 요청은 가장 높은 클래스
+      (PRIORITY_CLASSES 순서) 대기열의 맨 앞 요청. 같은 사용자의 batch 요청 뒤에 들어온
+      interactive 요청이 먼저 실행됨.
+    - 사용자의 다음 요청에 가상 시간 기반 태그(finish = 사용자의 직전 finish + 1/가중치, 대기 요청이 없던
+      사용자는 max(V, 직전 finish)부터 시작)를 매기고, 실행 가능한 사용자 중 태그가 가장 작은 요청부터 실행.
+      태그는 실행을 배정할 때 사용자 기록에 반영.
+      워크플로우를 많이 실행한 사용자는 태그가 뒤로 밀리므로 다른 사용자를 굶기지 않음.
+    - 우선순위 클래스 가중치가 클수록 태그 간격이 좁아져 더 자주 선택됨 (interactive > batch).
+    - 전체 동시 실행 수와 사용자별 동시 실행 수를 제한. 단, 제한에 걸리지 않은 대기 사용자가 없으면
+      여유 슬롯(SCHEDULER_BURST_HEADROOM 제외)을 제한을 넘은 사용자에게도 배정 (batch 사용자의 여유 용량 활용).
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = SCHEDULER_MAX_CONCURRENT,
+        user_max_concurrent: int = SCHEDULER_USER_MAX_CONCURRENT,
+        burst_headroom: int = SCHEDULER_BURST_HEADROOM,
+        weights: dict[str, float] | None = None,
+    ):
+        self.max_concurrent = max_concurrent
+        self.user_max_concurrent = user_max_concurrent
+        self.burst_headroom = burst_headroom
+        self.weights = weights or parse_priority_weights(SCHEDULER_PRIORITY_WEIGHTS)
+
+        self._queues: dict[int, dict[str, deque[_Job]]] = {}
+        self._running: dict[int, int] = {}
+        self._active = 0
+        self._virtual_time = 0.0
+        self._last_finish: dict[int, float] = {}
+
+    def queued(self) -> int:
+        """
+        대기 중인 워크플로우 수를 반환.
+        """
+        return sum(
+            len(queue) for queues in self._queues.values() for queue in queues.values()
+        )
+
+    def running(self) -> int:
+        """
+        실행 중인 워크플로우 수를 반환.
+        """
+        return self._active
+
+    async def run(
+        self, user_id: int, priority: str, job_factory: Callable[[], Awaitable]
+    ):
+        """
+        워크플로우를 대기열에 넣고, 차례가 되면 job_factory()를 실행하여 결과를 반환.
+        대기 중 취소되면 대기열에서 제거.
+
+        Args:
+            user_id (int): 워크플로우를 요청한 사용자 ID
+            priority (str): 우선순위 클래스 (PRIORITY_CLASSES 중 하나)
+            job_factory: 실행할 코루틴을 만드는 함수
+
+        Returns:
+            job_factory()가 반환한 코루틴의 결과
+        """
+        job = self._enqueue(user_id, priority)
+        try:
+            await job.admitted.wait()
+        except asyncio.CancelledError:
+            if job.admitted.is_set():
+                self._release(user_id)
+            else:
+                self._remove(job)
+            raise
+
+        _queue_wait.observe(time.monotonic() - job.enqueued_at, priority=priority)
+        try:
+            return await job_factory()
+        finally:
+            self._release(user_id)
+
+    def _enqueue(self, user_id: int, priority: str) -> _Job:
+        if priority not in self.weights:
+            raise ValueError(f"Unknown priority '{priority}'")
+
+        if user_id not in self._queues:
+            # 대기 요청이 없던 사용자는 현재 가상 시간부터 태그를 매김 (대기 중에는 고정)
+            self._last_finish[user_id] = max(
+                self._virtual_time, self._last_finish.get(user_id, 0.0)
+            )
+
+        job = _Job(user_id, priority)
+        self._queues.setdefault(user_id, {}).setdefault(priority, deque()).append(job)
+        _queue_depth.inc(priority=priority)
+        self._dispatch()
+        return job
+
+    def _remove(self, job: _Job):
+        queues = self._queues.get(job.user_id, {})
+        queue = queues.get(job.priority)
+        if queue and job in queue:
+            queue.remove(job)
+            _queue_depth.dec(priority=job.priority)
+            if not queue:
+                del queues[job.priority]
+            if not queues:
+                del self._queues[job.user_id]
+        self._forget_idle_user(job.user_id)
+
+    def _head(self, user_id: int) -> tuple[_Job, float]:
+        # 사용자의 가장 높은 우선순위 클래스 대기열 맨 앞 요청과 그 요청이 받을 finish 태그
+        queues = self._queues[user_id]
+        priority = next(p for p in PRIORITY_CLASSES if p in queues)
+        return queues[priority][0], self._last_finish[user_id] + 1.0 / self.weights[priority]
+
+    def _select(self) -> tuple[_Job | None, bool]:
+        best, best_capped = None, None
+        for user_id in self._queues:
+            head = self._head(user_id)
+            if self._running.get(user_id, 0) < self.user_max_concurrent:
+                if best is None or head[1] < best[1]:
+                    best = head
+            elif best_capped is None or head[1] < best_capped[1]:
+                best_capped = head
+
+        if best is not None:
+            return best[0], False
+        # 제한에 걸리지 않은 대기 사용자가 없을 때만 여유 슬롯을 빌려줌
+        if best_capped is not None and self._active < self.max_concurrent - self.burst_headroom:
+            return best_capped[0], True
+        return None, False
+
+    def _dispatch(self):
+        while self._active < self.max_concurrent:
+            job, burst = self._select()
+            if job is None:
+                return
+
+            start_tag = self._last_finish[job.user_id]
+            self._last_finish[job.user_id] = start_tag + 1.0 / self.weights[job.priority]
+            self._virtual_time = max(self._virtual_time, start_tag)
+
+            queues = self._queues[job.user_id]
+            queues[job.priority].popleft()
+            if not queues[job.priority]:
+                del queues[job.priority]
+            if not queues:
+                del self._queues[job.user_id]
+            _queue_depth.dec(priority=job.priority)
+
+            self._active += 1
+            self._running[job.user_id] = self._running.get(job.user_id, 0) + 1
+            _running_gauge.set(self._active)
+            _admitted_total.inc(priority=job.priority, burst=str(burst).lower())
+            job.admitted.set()
+
+    def _release(self, user_id: int):
+        self._active -= 1
+        remaining = self._running.get(user_id, 1) - 1
+        if remaining > 0:
+            self._running[user_id] = remaining
+        else:
+            self._running.pop(user_id, None)
+        _running_gauge.set(self._active)
+        self._forget_idle_user(user_id)
+        self._dispatch()
+
+    def _forget_idle_user(self, user_id: int):
+        # 대기/실행 중인 요청이 없는 사용자는 태그 기록을 정리
+        # (다음 요청은 현재 가상 시간부터 시작하므로 이미 끝난 작업으로 불이익을 받지 않음)
+        if user_id not in self._queues and user_id not in self._running:
+            self._last_finish.pop(user_id, None)
+
+
+workflow_scheduler = WorkflowScheduler()
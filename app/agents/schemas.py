@@ -0,0 +1,128 @@
+# 에이전트별 구조화 출력(JSON Schema) 및 출력 토큰 예산
+import json
+import os
+
+from jsonschema import Draft202012Validator
+
+_OBJECT = {"type": "object"}
+_ARRAY_OF_OBJECTS = {"type": "array", "items": {"type": "object"}}
+_AMOUNTS = {"type": "object", "additionalProperties": {"type": "number"}}
+
+# JSON 응답을 생성하는 에이전트의 응답 스키마 (report_generator는 마크다운이므로 없음)
+AGENT_SCHEMAS = {
+    "data_collector": {
+        "type": "object",
+        "properties": {
+            "preferences": _OBJECT,
+            "flights": _ARRAY_OF_OBJECTS,
+            "hotels": _ARRAY_OF_OBJECTS,
+            "transport": _OBJECT,
+            "attractions": _ARRAY_OF_OBJECTS,
+            "weather": _ARRAY_OF_OBJECTS,
+        },
+        "required": ["preferences", "flights", "hotels", "transport", "attractions", "weather"],
+    },
+    "budget_manager": {
+        "type": "object",
+        "properties": {
+            "allocated": _AMOUNTS,
+            "spent": _AMOUNTS,
+            "remaining": _AMOUNTS,
+            "alternatives": {"type": "array"},
+        },
+        "required": ["allocated", "spent", "remaining", "alternatives"],
+    },
+    "itinerary_builder": {
+        "type": "object",
+        "properties": {f"day{day}": _OBJECT for day in range(1, 6)},
+        "required": [f"day{day}" for day in range(1, 6)],
+    },
+}
+
+# 에이전트별 기본 최대 출력 토큰 수 (LLM_MAX_TOKENS_<AGENT> 환경변수로 변경 가능)
+DEFAULT_MAX_TOKENS = {
+    "data_collector": 2000,
+    "budget_manager": 800,
+    "itinerary_builder": 1200,
+    "report_generator": 2500,
+}
+
+_validators = {
+    agent: Draft202012Validator(schema) for agent, schema in AGENT_SCHEMAS.items()
+}
+
+
+class InvalidAgentResponse(ValueError):
+    """
+    LLM 응답이 JSON이 아니거나 에이전트 스키마와 맞지 않을 때 발생.
+    """
+
+
+def max_tokens(agent: str) -> int | None:
+    """
+    agent의 최대 출력 토큰 수를 반환.
+
+    Args:
+        agent (str): agent 테이블명 (예: "data_collector")
+
+    Returns:
+        int | None: 최대 출력 토큰 수 (0 이하로 지정하면 None - 제한 없음)
+    """
+    value = int(os.getenv(f"LLM_MAX_TOKENS_{agent.upper()}", DEFAULT_MAX_TOKENS.get(agent, 0)))
+    return value if value > 0 else None
+
+
+def completion_options(agent: str) -> dict:
+    """
+    chat completion 요청에 추가할 옵션(max_tokens, response_format)을 반환.
+    스키마가 있는 agent는 json_schema 구조화 출력을 요청.
+
+    Args:
+        agent (str): agent 테이블명
+
+    Returns:
+        dict: chat.completions.create / 배치 요청 body에 그대로 넣을 옵션
+    """
+    options = {}
+    limit = max_tokens(agent)
+    if limit:
+        options["max_tokens"] = limit
+    schema = AGENT_SCHEMAS.get(agent)
+    if schema:
+        options["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {"name": agent, "schema": schema, "strict": False},
+        }
+    return options
+
+
+def validate_response(agent: str, text: str) -> str:
+    """
+    LLM 응답을 agent 스키마로 검증. 스키마가 없는 agent는 그대로 반환.
+    검증에 실패하면 다음 단계 에이전트를 호출하지 않도록 예외 발생.
+
+    Args:
+        agent (str): agent 테이블명
+        text (str): LLM 응답 텍스트
+
+    Returns:
+        str: 검증된 응답 텍스트
+
+    Raises:
+        InvalidAgentResponse: JSON 파싱 실패 또는 스키마 불일치
+    """
+    validator = _validators.get(agent)
+    if validator is None:
+        return text
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise InvalidAgentResponse(f"{agent} response is not valid JSON: {e}") from None
+
+    error = next(iter(validator.iter_errors(data)), None)
+    if error is not None:
+        path = ".".join(str(p) for p in error.absolute_path) or "<root>"
+        raise InvalidAgentResponse(
+            f"{agent} response does not match schema at {path}: {error.message}"
+        )
+    return text
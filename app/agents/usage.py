@@ -0,0 +1,126 @@
+# LLM 토큰 사용량 및 비용 계산
+import os
+from dataclasses import dataclass
+
+from app.monitoring.metrics import registry
+
+# 모델별 100만 토큰당 가격(USD) - "모델=입력/출력[/캐시된 입력],..." (캐시 가격을 생략하면 입력 가격 사용)
+MODEL_PRICES = os.getenv(
+    "MODEL_PRICES", "openai/gpt-4o-mini-2024-07-18=0.15/0.6/0.075"
+)
+
+_llm_tokens = registry.counter(
+    "llm_tokens_total",
+    "LLM tokens consumed by agent runs (kind=prompt|completion|cached)",
+    ("agent", "model", "kind"),
+)
+_llm_cost = registry.counter(
+    "llm_cost_usd_total", "Estimated LLM cost in USD based on MODEL_PRICES", ("agent", "model")
+)
+
+
+def parse_model_prices(raw: str) -> dict[str, tuple[float, float, float]]:
+    """
+    MODEL_PRICES 문자열을 모델별 (입력, 출력, 캐시된 입력) 100만 토큰당 가격으로 변환.
+
+    Args:
+        raw (str): "모델=입력/출력[/캐시된 입력],..." 형태의 문자열
+
+    Returns:
+        dict[str, tuple[float, float, float]]: 모델 -> (입력, 출력, 캐시된 입력) 가격
+    """
+    prices = {}
+    for item in raw.split(","):
+        model, _, values = item.strip().rpartition("=")
+        if not model or not values:
+            continue
+        parts = [float(value) for value in values.split("/")]
+        prompt, completion = parts[0], parts[1] if len(parts) > 1 else parts[0]
+        cached = parts[2] if len(parts) > 2 else prompt
+        prices[model.strip()] = (prompt, completion, cached)
+    return prices
+
+
+_prices = parse_model_prices(MODEL_PRICES)
+
+
+def _field(obj, name: str):
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+@dataclass
+class TokenUsage:
+    """
+    agent 실행 1회의 토큰 사용량과 추정 비용.
+
+    Attributes:
+        prompt_tokens (int): 입력 토큰 수 (캐시된 토큰 포함)
+        completion_tokens (int): 출력 토큰 수
+        cached_tokens (int): 입력 토큰 중 프롬프트 캐시에서 처리된 토큰 수
+        cost_usd (float): MODEL_PRICES 기준 추정 비용 (가격이 없는 모델은 0)
+    """
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    cost_usd: float = 0.0
+
+    @classmethod
+    def from_response(cls, usage, model: str) -> "TokenUsage | None":
+        """
+        API 응답의 usage(스트리밍 마지막 청크 또는 배치 결과 body의 usage)로 생성.
+
+        Args:
+            usage: openai CompletionUsage 객체 또는 dict (없으면 None)
+            model (str): 응답한 모델 (비용 계산에 사용)
+
+        Returns:
+            TokenUsage | None: usage가 없으면 None
+        """
+        if usage is None:
+            return None
+        prompt_tokens = _field(usage, "prompt_tokens") or 0
+        completion_tokens = _field(usage, "completion_tokens") or 0
+        cached_tokens = _field(_field(usage, "prompt_tokens_details"), "cached_tokens") or 0
+        return cls(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cached_tokens=cached_tokens,
+            cost_usd=estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens),
+        )
+
+
+def estimate_cost(
+    model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0
+) -> float:
+    """
+    MODEL_PRICES 기준으로 비용(USD)을 계산. 가격이 없는 모델은 0.
+
+    Returns:
+        float: 추정 비용(USD)
+    """
+    price = _prices.get(model)
+    if price is None:
+        return 0.0
+    prompt, completion, cached = price
+    return (
+        (prompt_tokens - cached_tokens) * prompt
+        + cached_tokens * cached
+        + completion_tokens * completion
+    ) / 1_000_000
+
+
+def record_usage_metrics(agent: str, model: str, usage: TokenUsage | None):
+    """
+    토큰 사용량과 비용을 /metrics 카운터에 누적.
+    """
+    if usage is None:
+        return
+    _llm_tokens.inc(usage.prompt_tokens, agent=agent, model=model, kind="prompt")
+    _llm_tokens.inc(usage.completion_tokens, agent=agent, model=model, kind="completion")
+    _llm_tokens.inc(usage.cached_tokens, agent=agent, model=model, kind="cached")
+    _llm_cost.inc(usage.cost_usd, agent=agent, model=model)
@@ -0,0 +1,147 @@
+import os
+import zlib
+from datetime import datetime
+
+import brotli
+import msgpack
+import orjson
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+
+# 이 크기보다 작은 응답은 압축하지 않음 (압축 이득보다 CPU 비용이 큼)
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+# 이 크기 이상인 응답은 청크 단위로 압축하며 스트리밍
+STREAMING_THRESHOLD_BYTES = int(os.getenv("STREAMING_THRESHOLD_BYTES", str(256 * 1024)))
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# 같은 q 값이면 앞쪽 인코딩을 우선 선택
+SUPPORTED_ENCODINGS = ("br", "gzip")
+# WebSocket 메시지 인코딩 (/ws/{workflow_id}?encoding=) - json: 텍스트 프레임, msgpack: 바이너리 프레임
+WS_ENCODINGS = ("json", "msgpack")
+
+
+def choose_encoding(accept_encoding: str | None) -> str:
+    """
+    Accept-Encoding 헤더를 해석해 사용할 압축 방식을 결정.
+
+    Args:
+        accept_encoding (str | None): 클라이언트의 Accept-Encoding 헤더 값
+
+    Returns:
+        str: "br", "gzip" 또는 "identity"
+    """
+    if not accept_encoding:
+        return "identity"
+
+    weights = {}
+    for item in accept_encoding.split(","):
+        parts = item.strip().split(";")
+        name = parts[0].strip().lower()
+        q = 1.0
+        for param in parts[1:]:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+
+    best, best_q = "identity", 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def _compressor(encoding: str):
+    if encoding == "br":
+        return brotli.Compressor(quality=5)
+    # wbits=31: gzip 헤더/트레일러 포함
+    return zlib.compressobj(6, zlib.DEFLATED, 31)
+
+
+def _compress_chunks(body: bytes, encoding: str):
+    """
+    본문을 STREAM_CHUNK_BYTES 단위로 나누어 압축한 결과를 순서대로 반환.
+    동기 제너레이터이므로 StreamingResponse가 스레드풀에서 실행하여 이벤트 루프를 막지 않음.
+    """
+    compressor = _compressor(encoding)
+    for i in range(0, len(body), STREAM_CHUNK_BYTES):
+        piece = body[i : i + STREAM_CHUNK_BYTES]
+        if encoding == "br":
+            data = compressor.process(piece)
+        else:
+            data = compressor.compress(piece)
+        if data:
+            yield data
+    yield compressor.finish() if encoding == "br" else compressor.flush()
+
+
+def _plain_chunks(body: bytes):
+    for i in range(0, len(body), STREAM_CHUNK_BYTES):
+        yield body[i : i + STREAM_CHUNK_BYTES]
+
+
+def encoded_response(
+    body: bytes,
+    media_type: str,
+    accept_encoding: str | None,
+    headers: dict | None = None,
+) -> Response:
+    """
+    Accept-Encoding에 맞춰 본문을 gzip/brotli로 압축한 응답을 생성.
+    큰 본문은 전체를 메모리에서 압축하지 않고 청크 단위로 압축하며 스트리밍.
+
+    Args:
+        body (bytes): 응답 본문
+        media_type (str): Content-Type
+        accept_encoding (str | None): 클라이언트의 Accept-Encoding 헤더 값
+        headers (dict | None): 추가 응답 헤더
+
+    Returns:
+        Response: 압축 및 스트리밍 여부가 반영된 응답 객체
+    """
+    headers = dict(headers or {})
+    headers["Vary"] = "Accept-Encoding"
+    encoding = choose_encoding(accept_encoding)
+    if len(body) < COMPRESSION_MIN_BYTES:
+        encoding = "identity"
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+
+    if len(body) >= STREAMING_THRESHOLD_BYTES:
+        chunks = (
+            _plain_chunks(body)
+            if encoding == "identity"
+            else _compress_chunks(body, encoding)
+        )
+        return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+    if encoding != "identity":
+        body = b"".join(_compress_chunks(body, encoding))
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not msgpack serializable")
+
+
+def encode_ws_message(message: dict, encoding: str = "json") -> str | bytes:
+    """
+    WebSocket 메시지를 지정한 인코딩으로 직렬화. datetime은 ISO 형식 문자열로 변환.
+
+    Args:
+        message (dict): 전송할 메시지
+        encoding (str): "json" 또는 "msgpack"
+
+    Returns:
+        str | bytes: json이면 텍스트 프레임용 str, msgpack이면 바이너리 프레임용 bytes
+    """
+    if encoding == "msgpack":
+        return msgpack.packb(message, default=_msgpack_default)
+    return orjson.dumps(message).decode("utf-8")
@@ -0,0 +1,49 @@
+from fastapi.responses import JSONResponse
+
+from app.api.workflow import is_accepting_workflows
+
+# 시작 단계에서 준비가 끝난 구성 요소 (db는 필수, llm은 예열 성공 여부만 표시)
+_startup_state = {"db": False, "llm": False}
+
+
+def mark_ready(component: str, ready: bool = True):
+    """
+    시작 단계에서 구성 요소의 준비 상태를 기록.
+
+    Args:
+        component (str): "db" 또는 "llm"
+        ready (bool): 준비 완료 여부
+    """
+    _startup_state[component] = ready
+
+
+def get_liveness_response() -> JSONResponse:
+    """
+    프로세스가 요청을 처리할 수 있는지만 확인하는 liveness 응답.
+    외부 의존성(DB, LLM)을 확인하지 않으므로 의존성 장애로 재시작되지 않음.
+
+    Returns:
+        JSONResponse: 항상 200
+    """
+    return JSONResponse({"status": "ok"})
+
+
+def get_readiness_response() -> JSONResponse:
+    """
+    트래픽을 받을 준비가 되었는지 확인하는 readiness 응답.
+    DB 커넥션 풀 예열이 끝나지 않았거나 종료 절차가 시작되면 503을 반환하여
+    오케스트레이터가 이 인스턴스로 트래픽을 보내지 않도록 함.
+    probe마다 DB를 조회하지 않고 시작/종료 단계에서 기록한 상태만 사용.
+
+    Returns:
+        JSONResponse: 준비되었으면 200, 아니면 503
+    """
+    draining = not is_accepting_workflows()
+    ready = _startup_state["db"] and not draining
+    body = {
+        "status": "ready" if ready else "not_ready",
+        "db": _startup_state["db"],
+        "llm_warm": _startup_state["llm"],
+        "draining": draining,
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
@@ -0,0 +1,201 @@
+# 워크플로우 목록 조회 (키셋 페이지네이션)
+import base64
+import functools
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+
+from app.api.status import is_admin_token
+from app.db.database import AGENT_PREFIXES, run_read, verify_auth_token
+
+# 한 페이지 최대 워크플로우 수
+WORKFLOW_LIST_MAX_LIMIT = int(os.getenv("WORKFLOW_LIST_MAX_LIMIT", "100"))
+
+USER_ID_BY_NAME_SQL = "SELECT user_id FROM users WHERE name = $1"
+
+
+@functools.cache
+def _list_sql(by_user: bool, by_status: bool, has_since: bool, has_cursor: bool) -> str:
+    """
+    지정된 필터 조합에 맞는 목록 조회 쿼리를 생성.
+    조건을 "$n IS NULL OR ..." 형태로 두지 않고 필요한 조건만 넣어
+    (user_id, created_at) / (status, created_at) 인덱스를 그대로 사용하도록 함.
+
+    파라미터: $1 limit, 이후 (by_user) user_id, (by_status) status, (has_since) since,
+    (has_cursor) cursor created_at, cursor workflow_id 순서
+    """
+    params = iter(range(2, 8))
+    conditions = []
+    if by_user:
+        conditions.append(f"w.user_id = ${next(params)}")
+    if by_status:
+        conditions.append(f"w.status = ${next(params)}::status_enum")
+    if has_since:
+        conditions.append(f"w.created_at >= ${next(params)}")
+    if has_cursor:
+        created_at, workflow_id = next(params), next(params)
+        conditions.append(
+            f"(w.created_at, w.workflow_id) < (${created_at}, ${workflow_id}::uuid)"
+        )
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    # 응답 본문은 읽지 않고 agent별 상태만 조회 (workflow와 같은 created_at으로 파티션 한정)
+    agent_columns = "".join(
+        f", {prefix}.status AS {prefix}_status, {prefix}.model AS {prefix}_model"
+        for prefix in AGENT_PREFIXES
+    )
+    agent_joins = "".join(
+        f"""
+        LEFT JOIN {table} {prefix}
+          ON {prefix}.workflow_id = w.workflow_id AND {prefix}.created_at = w.created_at"""
+        for prefix, table in AGENT_PREFIXES.items()
+    )
+    return f"""
+        WITH page AS (
+            SELECT w.workflow_id, w.user_id, w.created_at, w.started_at, w.ended_at,
+                   w.status, w.execution_mode, w.prompt_tokens, w.completion_tokens,
+                   w.cached_tokens, w.cost_usd, w.parent_workflow_id
+            FROM workflow w
+            {where}
+            ORDER BY w.created_at DESC, w.workflow_id DESC
+            LIMIT $1
+        )
+        SELECT w.*{agent_columns}
+        FROM page w{agent_joins}
+        ORDER BY w.created_at DESC, w.workflow_id DESC
+    """
+
+
+def encode_cursor(created_at: datetime, workflow_id: str) -> str:
+    """
+    마지막으로 반환한 워크플로우의 정렬 키를 다음 페이지 커서 문자열로 변환.
+    """
+    raw = json.dumps([created_at.isoformat(), workflow_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    encode_cursor로 만든 커서를 (created_at, workflow_id)로 복원.
+
+    Raises:
+        HTTPException: 커서 형식이 올바르지 않으면 400
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, workflow_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(uuid.UUID(workflow_id))
+    except (ValueError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
+async def _resolve_user_filter(conn, auth_token: str, user: str | None) -> int | None:
+    """
+    조회 대상 user_id를 결정. 일반 토큰은 자신의 워크플로우만,
+    관리자 토큰(ADMIN_TOKEN)은 user로 지정한 사용자 또는 전체 사용자를 조회.
+
+    토큰을 먼저 확인한 뒤 user를 조회하여, 인증 없이 사용자 이름 존재 여부를 알 수 없도록 함.
+
+    Raises:
+        HTTPException: 토큰이 유효하지 않으면 401, 일반 토큰으로 다른(또는 없는) 사용자를 지정하면 403,
+                       관리자 토큰으로 없는 사용자를 지정하면 404
+    """
+    if is_admin_token(auth_token):
+        if user is None:
+            return None
+        target = await conn.fetchval(USER_ID_BY_NAME_SQL, user)
+        if target is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return target
+
+    user_id = await verify_auth_token(auth_token)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid auth token")
+    if user is not None and await conn.fetchval(USER_ID_BY_NAME_SQL, user) != user_id:
+        raise HTTPException(status_code=403, detail="Cannot list other users' workflows")
+    return user_id
+
+
+def _workflow_summary(row) -> dict:
+    return {
+        "workflow_id": str(row["workflow_id"]),
+        "user_id": row["user_id"],
+        "status": row["status"],
+        "execution_mode": row["execution_mode"],
+        "parent_workflow_id": (
+            str(row["parent_workflow_id"]) if row["parent_workflow_id"] else None
+        ),
+        "created_at": row["created_at"].isoformat(),
+        "started_at": row["started_at"].isoformat() if row["started_at"] else None,
+        "ended_at": row["ended_at"].isoformat() if row["ended_at"] else None,
+        "usage": {
+            "prompt_tokens": row["prompt_tokens"],
+            "completion_tokens": row["completion_tokens"],
+            "cached_tokens": row["cached_tokens"],
+            "cost_usd": row["cost_usd"],
+        },
+        "agents": {
+            table: {"status": row[f"{prefix}_status"], "model": row[f"{prefix}_model"]}
+            for prefix, table in AGENT_PREFIXES.items()
+        },
+    }
+
+
+async def list_workflows_response(
+    auth_token: str,
+    user: str | None = None,
+    status: str | None = None,
+    since: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = 20,
+) -> dict:
+    """
+    워크플로우 목록을 최신순으로 조회 (응답 본문 없이 agent별 상태 요약만 포함).
+    OFFSET 대신 마지막 항목의 (created_at, workflow_id)를 커서로 사용하므로
+    페이지가 뒤로 가도 조회 비용이 일정하고, 조회 중 새 워크플로우가 생겨도 항목이 밀리지 않음.
+
+    Args:
+        auth_token (str): 사용자 인증 토큰 또는 ADMIN_TOKEN
+        user (str | None): 조회할 사용자 이름 (일반 토큰은 자기 자신만 가능)
+        status (str | None): 워크플로우 상태 필터
+        since (datetime | None): 이 시각 이후에 생성된 워크플로우만 조회
+        cursor (str | None): 이전 응답의 next_cursor
+        limit (int): 페이지 크기 (최대 WORKFLOW_LIST_MAX_LIMIT)
+
+    Returns:
+        dict: {"workflows": [...], "next_cursor": 다음 페이지 커서 또는 None}
+    """
+    limit = min(limit, WORKFLOW_LIST_MAX_LIMIT)
+    if since is not None and since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    after = decode_cursor(cursor) if cursor else None
+
+    async def fetch_page(conn):
+        user_id = await _resolve_user_filter(conn, auth_token, user)
+        args = [limit + 1]
+        for value in (user_id, status, since):
+            if value is not None:
+                args.append(value)
+        if after is not None:
+            args += after
+        sql = _list_sql(
+            user_id is not None, status is not None, since is not None, after is not None
+        )
+        return await conn.fetch(sql, *args)
+
+    # 목록 조회는 복제본에서 수행 (막 생성된 워크플로우는 복제 지연만큼 늦게 나타날 수 있음)
+    rows = await run_read(fetch_page)
+
+    # limit + 1개를 조회해 다음 페이지가 있는지 판단
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last["created_at"], str(last["workflow_id"]))
+    return {
+        "workflows": [_workflow_summary(row) for row in rows],
+        "next_cursor": next_cursor,
+    }
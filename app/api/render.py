@@ -0,0 +1,279 @@
+# 리포트 마크다운을 HTML/PDF로 렌더링 (프로세스 풀에서 실행, 내용 해시로 디스크 캐시)
+import asyncio
+import hashlib
+import html
+import importlib.util
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from markdown_it import MarkdownIt
+
+from app.monitoring.metrics import registry
+
+# 렌더링 프로세스 수 (CPU를 많이 쓰는 PDF 렌더링이 이벤트 루프나 다른 요청을 막지 않도록 분리)
+RENDER_MAX_WORKERS = int(os.getenv("RENDER_MAX_WORKERS", str(min(2, os.cpu_count() or 1))))
+# 렌더링 결과 캐시 디렉터리
+RENDER_CACHE_DIR = os.getenv("RENDER_CACHE_DIR", "./render_cache")
+# 렌더링 결과 캐시 최대 크기(byte) - 넘으면 가장 오래 사용하지 않은 파일부터 삭제
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# 렌더링 1회 최대 대기 시간(초)
+RENDER_TIMEOUT_SECONDS = float(os.getenv("RENDER_TIMEOUT_SECONDS", "60"))
+
+# 렌더링 방식(스타일, 마크다운 옵션)이 바뀌면 올려서 기존 캐시를 무효화
+RENDER_VERSION = "1"
+
+RENDER_MEDIA_TYPES = {
+    "html": "text/html; charset=utf-8",
+    "pdf": "application/pdf",
+}
+
+# PDF 렌더링은 weasyprint가 설치된 경우에만 지원 (Docker 이미지에는 포함)
+PDF_AVAILABLE = importlib.util.find_spec("weasyprint") is not None
+
+_STYLE = """
+body { font-family: -apple-system, "Noto Sans KR", "Helvetica Neue", Arial, sans-serif;
+       max-width: 860px; margin: 2rem auto; padding: 0 1rem; line-height: 1.6; color: #222; }
+table { border-collapse: collapse; margin: 1rem 0; }
+th, td { border: 1px solid #ccc; padding: 0.35rem 0.6rem; text-align: left; }
+th { background: #f5f5f5; }
+code, pre { background: #f6f8fa; border-radius: 4px; }
+pre { padding: 0.75rem; overflow-x: auto; }
+"""
+
+logger = logging.getLogger(__name__)
+
+_render_seconds = registry.histogram(
+    "report_render_seconds", "Report rendering time in the process pool", ("format",)
+)
+_render_cache = registry.counter(
+    "report_render_cache_total", "Rendered report cache lookups (result=hit|miss)", ("format", "result")
+)
+_render_cache_evictions = registry.counter(
+    "report_render_cache_evictions_total", "Rendered report files evicted from the disk cache"
+)
+
+_executor: ProcessPoolExecutor | None = None
+# 같은 결과를 동시에 요청하면 렌더링은 한 번만 수행 (캐시 키 -> 진행 중인 렌더링)
+_inflight: dict[str, asyncio.Future] = {}
+
+
+class RenderUnavailable(RuntimeError):
+    """
+    요청한 형식을 렌더링할 수 없을 때 발생 (예: weasyprint 미설치로 PDF 불가).
+    """
+
+
+def _document_title(markdown: str) -> str:
+    for line in markdown.splitlines():
+        if line.startswith("#"):
+            return line.lstrip("#").strip() or "Travel Report"
+    return "Travel Report"
+
+
+def render_html(markdown: str) -> str:
+    """
+    마크다운을 스타일이 포함된 단일 HTML 문서로 변환 (제목은 첫 번째 헤딩).
+    LLM이 생성한 본문이므로 마크다운 안의 raw HTML은 이스케이프.
+    """
+    body = MarkdownIt("commonmark", {"html": False}).enable("table").render(markdown)
+    title = _document_title(markdown)
+    return (
+        "<!DOCTYPE html>\n"
+        '<html lang="ko"><head><meta charset="utf-8">'
+        f"<title>{html.escape(title)}</title><style>{_STYLE}</style></head>"
+        f"<body>{body}</body></html>"
+    )
+
+
+def pdf_url_fetcher():
+    """
+    PDF 렌더링에 사용할 weasyprint URL fetcher. 본문은 LLM이 작성하므로 이미지/링크 문법으로
+    내부망 URL(SSRF)이나 로컬 파일(file://)을 읽지 않도록 data: URL만 허용.
+    거부된 리소스는 weasyprint가 경고만 남기고 건너뜀.
+    """
+    from weasyprint.urls import URLFetcher
+
+    return URLFetcher(allowed_protocols=("data",))
+
+
+def _render_to_file(markdown: str, fmt: str, path: str) -> int:
+    """
+    렌더링 프로세스에서 실행. 결과를 임시 파일에 쓴 뒤 교체하여
+    다른 요청이 덜 쓰인 파일을 읽지 않도록 함.
+
+    Returns:
+        int: 결과 파일 크기(byte)
+    """
+    document = render_html(markdown)
+    if fmt == "pdf":
+        try:
+            from weasyprint import HTML
+        except OSError as e:
+            # 패키지는 있지만 시스템 Pango 라이브러리가 없는 경우
+            raise RenderUnavailable(f"PDF rendering is unavailable: {e}") from None
+
+        data = HTML(string=document, url_fetcher=pdf_url_fetcher()).write_pdf()
+    else:
+        data = document.encode("utf-8")
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def _forget(key: str, future: asyncio.Future):
+    _inflight.pop(key, None)
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"리포트 렌더링 실패: {future.exception()}")
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # 이벤트 루프/스레드를 가진 서버 프로세스를 fork하지 않도록 spawn 사용
+        _executor = ProcessPoolExecutor(
+            max_workers=RENDER_MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def render_cache_key(markdown: str, fmt: str) -> str:
+    """
+    렌더링 결과의 캐시 키(내용 해시). 같은 리포트 내용이면 워크플로우가 달라도 같은 키.
+    """
+    digest = hashlib.sha256(f"{RENDER_VERSION}:{fmt}:".encode("utf-8"))
+    digest.update(markdown.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def render_cache_path(key: str, fmt: str) -> str:
+    return os.path.join(RENDER_CACHE_DIR, f"{key}.{fmt}")
+
+
+def _touch_cached(path: str) -> bool:
+    """
+    캐시 파일이 있으면 수정 시각을 갱신(LRU 순서 유지)하고 True 반환.
+    """
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def prune_render_cache(max_bytes: int = RENDER_CACHE_MAX_BYTES) -> int:
+    """
+    캐시 디렉터리 전체 크기가 max_bytes를 넘으면 수정 시각이 오래된 파일부터 삭제.
+    캐시를 사용할 때마다 수정 시각을 갱신하므로 가장 오래 사용하지 않은 결과부터 삭제됨.
+    렌더링 도중 중단되어 남은 임시 파일은 렌더링 최대 대기 시간의 10배가 지나면 함께 정리.
+
+    Args:
+        max_bytes (int): 캐시 최대 크기(byte)
+
+    Returns:
+        int: 삭제한 파일 수
+    """
+    stale_tmp_before = time.time() - RENDER_TIMEOUT_SECONDS * 10
+    entries = []
+    try:
+        with os.scandir(RENDER_CACHE_DIR) as it:
+            for entry in it:
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.endswith(".tmp"):
+                    if stat.st_mtime < stale_tmp_before:
+                        # 임시 파일은 크기와 관계없이 정리 (0으로 두어 먼저 삭제)
+                        entries.append((0, stat.st_size, entry.path))
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    except FileNotFoundError:
+        return 0
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for mtime, size, path in sorted(entries):
+        if total <= max_bytes and mtime != 0:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # 다른 워커가 먼저 삭제한 경우
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+async def render_report(markdown: str, fmt: str) -> str:
+    """
+    리포트를 fmt 형식으로 렌더링한 파일 경로를 반환. 캐시에 있으면 바로 반환하고,
+    없으면 프로세스 풀에서 렌더링 (동일한 요청이 동시에 오면 한 번만 렌더링).
+
+    Args:
+        markdown (str): 리포트 마크다운
+        fmt (str): "html" 또는 "pdf"
+
+    Returns:
+        str: 렌더링 결과 파일 경로
+
+    Raises:
+        RenderUnavailable: PDF 렌더링 의존성이 없는 경우
+        asyncio.TimeoutError: RENDER_TIMEOUT_SECONDS 안에 끝나지 않은 경우
+    """
+    if fmt == "pdf" and not PDF_AVAILABLE:
+        raise RenderUnavailable("PDF rendering requires the optional 'weasyprint' package")
+
+    key = render_cache_key(markdown, fmt)
+    path = render_cache_path(key, fmt)
+    if _touch_cached(path):
+        _render_cache.inc(format=fmt, result="hit")
+        return path
+
+    pending = _inflight.get(key)
+    if pending is not None:
+        await asyncio.shield(pending)
+        return path
+
+    _render_cache.inc(format=fmt, result="miss")
+    os.makedirs(RENDER_CACHE_DIR, exist_ok=True)
+    pending = asyncio.wrap_future(
+        _get_executor().submit(_render_to_file, markdown, fmt, path)
+    )
+    _inflight[key] = pending
+    started = time.monotonic()
+    try:
+        size = await asyncio.wait_for(asyncio.shield(pending), RENDER_TIMEOUT_SECONDS)
+    finally:
+        if pending.done():
+            _inflight.pop(key, None)
+        else:
+            # 대기만 중단하고 렌더링은 계속 진행 - 끝나면 다음 요청부터 캐시 사용
+            pending.add_done_callback(lambda future: _forget(key, future))
+    elapsed = time.monotonic() - started
+    _render_seconds.observe(elapsed, format=fmt)
+    logger.info(f"리포트 렌더링 완료 ({fmt}, {size} bytes, {elapsed:.2f}s)")
+
+    # 새 결과가 추가될 때마다 캐시 크기 제한 적용 (디렉터리 순회는 스레드에서)
+    removed = await asyncio.to_thread(prune_render_cache)
+    if removed:
+        _render_cache_evictions.inc(removed)
+        logger.info(f"렌더링 캐시 크기 제한으로 파일 {removed}개 삭제")
+    return path
+
+
+def close_render_executor():
+    """
+    렌더링 프로세스 풀 종료 (서버 종료 시 호출).
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,260 @@
+import asyncio
+import json
+
+from fastapi import HTTPException, Response
+from fastapi.responses import FileResponse
+
+from app.api.encoding import encoded_response
+from app.api.render import (
+    RENDER_MEDIA_TYPES,
+    RenderUnavailable,
+    render_cache_key,
+    render_report,
+)
+from app.api.status import authorize_workflow_access, etag_matches
+from app.db.database import AGENT_TABLES, get_agent_response
+
+_MISSING = object()
+
+
+def parse_fields(fields: str | None) -> list[str]:
+    """
+    쉼표로 구분된 필드 경로 문자열을 리스트로 변환.
+
+    Args:
+        fields (str | None): 예) "remaining,alternatives" 또는 "remaining.flights"
+
+    Returns:
+        list[str]: 공백을 제거한 필드 경로 리스트
+    """
+    if not fields:
+        return []
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+
+def _lookup(data, path: list[str]):
+    for key in path:
+        if isinstance(data, dict) and key in data:
+            data = data[key]
+        elif isinstance(data, list) and key.isdigit() and int(key) < len(data):
+            data = data[int(key)]
+        else:
+            return _MISSING
+    return data
+
+
+def project_fields(data, fields: list[str]) -> dict:
+    """
+    점(.)으로 구분된 경로 목록에 해당하는 값만 남긴 딕셔너리를 생성.
+    원본의 중첩 구조를 유지하며, 존재하지 않는 경로는 결과에서 제외.
+
+    Args:
+        data: 파싱된 agent 응답 (dict/list)
+        fields (list[str]): 예) ["remaining", "spent.flights"]
+
+    Returns:
+        dict: 요청한 경로만 포함하는 딕셔너리
+    """
+    projected = {}
+    for field in fields:
+        path = field.split(".")
+        value = _lookup(data, path)
+        if value is _MISSING:
+            continue
+        target = projected
+        for key in path[:-1]:
+            target = target.setdefault(key, {})
+        target[path[-1]] = value
+    return projected
+
+
+def _normalize_agent(agent: str) -> str:
+    agent_table = agent.replace("-", "_")
+    if agent_table not in AGENT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown agent '{agent}'")
+    return agent_table
+
+
+def _isoformat(value) -> str | None:
+    return value.isoformat() if value else None
+
+
+async def _load_agent_record(workflow_id: str, agent_table: str) -> dict:
+    record = await get_agent_response(workflow_id, agent_table)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Agent result not found")
+    return record
+
+
+def _parse_response(raw):
+    if isinstance(raw, str):
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError:
+            return raw
+    return raw
+
+
+async def get_agent_result_response(
+    workflow_id: str,
+    agent: str,
+    auth_token: str,
+    fields: str | None,
+    accept_encoding: str | None,
+) -> Response:
+    """
+    agent 하나의 상태와 응답을 반환하는 처리 함수입니다.
+    - fields가 주어지면 응답 중 해당 경로만 남겨 반환 (예: fields=remaining)
+    - fields가 없으면 DB의 JSON 텍스트를 다시 파싱하지 않고 그대로 본문에 포함
+    - Accept-Encoding에 따라 gzip/brotli 압축 및 큰 본문 스트리밍
+
+    Args:
+        workflow_id (str): 워크플로우 ID
+        agent (str): agent 이름 (예: budget_manager)
+        auth_token (str): 인증 토큰
+        fields (str | None): 쉼표로 구분된 필드 경로
+        accept_encoding (str | None): Accept-Encoding 헤더 값
+
+    Returns:
+        Response: agent 결과 JSON 응답
+    """
+    agent_table = _normalize_agent(agent)
+    await authorize_workflow_access(workflow_id, auth_token)
+    record = await _load_agent_record(workflow_id, agent_table)
+
+    envelope = {
+        "agent": agent_table,
+        "status": record["status"],
+        "started_at": _isoformat(record["started_at"]),
+        "ended_at": _isoformat(record["ended_at"]),
+        "model": record["model"],
+    }
+    raw = record["response"]
+    field_list = parse_fields(fields)
+
+    if field_list:
+        envelope["response"] = project_fields(_parse_response(raw), field_list)
+        body = json.dumps(envelope, ensure_ascii=False, separators=(",", ":"))
+    else:
+        # jsonb 텍스트는 이미 유효한 JSON이므로 봉투(envelope)에 그대로 이어 붙임
+        head = json.dumps(envelope, ensure_ascii=False, separators=(",", ":"))
+        response_json = raw if isinstance(raw, str) else json.dumps(raw)
+        body = f'{head[:-1]},"response":{response_json}}}'
+
+    return encoded_response(
+        body.encode("utf-8"),
+        "application/json",
+        accept_encoding,
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+async def _load_completed_report(workflow_id: str, auth_token: str):
+    """
+    권한을 확인하고 완료된 리포트 응답(JSON 파싱 결과)을 조회.
+
+    Raises:
+        HTTPException: 리포트가 아직 완료되지 않았으면 409
+    """
+    await authorize_workflow_access(workflow_id, auth_token)
+    record = await _load_agent_record(workflow_id, "report_generator")
+    if record["status"] != "completed":
+        raise HTTPException(
+            status_code=409,
+            detail=f"Report is not ready (status: {record['status']})",
+        )
+    return _parse_response(record["response"])
+
+
+async def get_report_response(
+    workflow_id: str,
+    auth_token: str,
+    fields: str | None,
+    accept_encoding: str | None,
+) -> Response:
+    """
+    ReportGeneratorAgent가 생성한 리포트를 반환하는 처리 함수입니다.
+    - 기본적으로 마크다운 본문만 text/markdown으로 반환
+    - fields가 주어지면 리포트 응답 JSON 중 해당 경로만 JSON으로 반환
+
+    Args:
+        workflow_id (str): 워크플로우 ID
+        auth_token (str): 인증 토큰
+        fields (str | None): 쉼표로 구분된 필드 경로
+        accept_encoding (str | None): Accept-Encoding 헤더 값
+
+    Returns:
+        Response: 마크다운 또는 JSON 응답
+
+    Raises:
+        HTTPException: 리포트가 아직 완료되지 않았으면 409
+    """
+    report = await _load_completed_report(workflow_id, auth_token)
+    field_list = parse_fields(fields)
+    if field_list:
+        body = json.dumps(
+            project_fields(report, field_list),
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        media_type = "application/json"
+    else:
+        body = report.get("markdown", "") if isinstance(report, dict) else str(report)
+        media_type = "text/markdown; charset=utf-8"
+
+    return encoded_response(
+        body.encode("utf-8"),
+        media_type,
+        accept_encoding,
+        headers={"Cache-Control": "private, max-age=60"},
+    )
+
+
+async def get_rendered_report_response(
+    workflow_id: str,
+    fmt: str,
+    auth_token: str,
+    if_none_match: str | None,
+    download: bool = False,
+) -> Response:
+    """
+    리포트를 HTML 또는 PDF로 렌더링하여 반환하는 처리 함수입니다.
+    - 렌더링은 프로세스 풀에서 실행되며 결과는 내용 해시로 디스크에 캐시
+    - 내용 해시를 ETag로 사용하므로 If-None-Match가 같으면 렌더링 없이 304 반환
+
+    Args:
+        workflow_id (str): 워크플로우 ID
+        fmt (str): "html" 또는 "pdf"
+        auth_token (str): 인증 토큰
+        if_none_match (str | None): 클라이언트가 보낸 If-None-Match 헤더 값
+        download (bool): True이면 첨부파일(Content-Disposition: attachment)로 응답
+
+    Returns:
+        Response: 렌더링된 파일 응답 또는 304 응답
+
+    Raises:
+        HTTPException: 리포트 미완료 409, PDF 렌더링 미지원 501, 렌더링 시간 초과 503
+    """
+    report = await _load_completed_report(workflow_id, auth_token)
+    markdown = report.get("markdown", "") if isinstance(report, dict) else str(report)
+
+    etag = f'"{render_cache_key(markdown, fmt)}"'
+    # 완료된 리포트는 바뀌지 않으므로 오래 캐시해도 됨 (사용자별 데이터라 private)
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=86400"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        path = await render_report(markdown, fmt)
+    except RenderUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e)) from None
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=503,
+            detail="Report rendering is taking longer than expected",
+            headers={"Retry-After": "5"},
+        ) from None
+
+    disposition = "attachment" if download else "inline"
+    headers["Content-Disposition"] = f'{disposition}; filename="report-{workflow_id}.{fmt}"'
+    return FileResponse(path, media_type=RENDER_MEDIA_TYPES[fmt], headers=headers)
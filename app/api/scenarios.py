@@ -0,0 +1,446 @@
+# 시나리오 묶음 실행 - 데이터 수집은 한 번만 하고 예산/일정/리포트 단계를 시나리오별로 병렬 실행
+import asyncio
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+
+from app.agents.data_collector import DataCollectorAgent
+from app.agents.scenario import scenario_total_budget, validate_scenario
+from app.agents.scheduler import workflow_scheduler
+from app.api.status import authorize_workflow_access
+from app.api.usage import check_user_quota
+from app.api.websocket import notify_workflow_update
+from app.api.workflow import (
+    finish_workflow_family,
+    is_accepting_workflows,
+    run_agent_branch,
+    track_workflow_task,
+)
+from app.db.database import (
+    AGENT_TABLES,
+    agent_row_lateral,
+    connect_db,
+    note_workflow_write,
+    run_read,
+)
+from app.db.utils import decompress_response, save_agent_response
+from app.monitoring.metrics import registry
+
+# 한 번에 요청할 수 있는 최대 시나리오 수
+SCENARIO_MAX_COUNT = int(os.getenv("SCENARIO_MAX_COUNT", "8"))
+
+logger = logging.getLogger(__name__)
+
+_branches_total = registry.counter(
+    "scenario_branches_total",
+    "Scenario branches finished after a shared data collection (status=completed|failed|cancelled)",
+    ("status",),
+)
+
+# 부모 워크플로우의 수집 결과를 대기 중인 하위 시나리오의 data_collector 행으로 공유하고
+# 하위 시나리오를 running으로 전환 (단일 문장). 큰 응답은 response_ref(내용 해시)만 복사되므로
+# 본문은 한 번만 저장되며, 토큰 사용량은 부모 행에만 기록되어 비용이 중복 집계되지 않음
+# 하위 시나리오는 부모와 같은 created_at이므로 모든 테이블에서 해당 월 파티션만 조회
+SHARE_COLLECTED_DATA_SQL = """
+    WITH source AS (
+        SELECT response, response_ref, response_size, model, started_at, ended_at
+        FROM data_collector
+        WHERE workflow_id = $1 AND created_at = $3 AND status = 'completed'
+    ), shared AS (
+        UPDATE data_collector d
+        SET status = 'completed',
+            response = s.response,
+            response_ref = s.response_ref,
+            response_size = s.response_size,
+            model = s.model,
+            started_at = s.started_at,
+            ended_at = s.ended_at
+        FROM source s, workflow w
+        WHERE w.parent_workflow_id = $1 AND w.created_at = $3 AND w.status = 'pending'
+          AND d.workflow_id = w.workflow_id AND d.created_at = w.created_at
+        RETURNING d.workflow_id
+    )
+    UPDATE workflow w
+    SET status = 'running', started_at = $2
+    FROM shared
+    WHERE w.workflow_id = shared.workflow_id AND w.created_at = $3
+    RETURNING w.workflow_id::text
+"""
+
+# 하위 시나리오별 상태, 사용량, 예산 결과 (요청 순서대로)
+# $2 부모의 created_at으로 workflow와 budget_manager 모두 해당 월 파티션만 조회
+SCENARIO_ROWS_SQL = """
+    SELECT w.workflow_id::text AS workflow_id, w.scenario, w.status::text AS status,
+           w.started_at, w.ended_at, w.prompt_tokens, w.completion_tokens, w.cached_tokens,
+           w.cost_usd, bm.response AS budget, c.codec, c.body
+    FROM workflow w
+    LEFT JOIN budget_manager bm
+      ON bm.workflow_id = w.workflow_id AND bm.created_at = $2 AND bm.status = 'completed'
+    LEFT JOIN agent_response_content c ON c.content_hash = bm.response_ref
+    WHERE w.parent_workflow_id = $1 AND w.created_at = $2
+    ORDER BY (w.scenario->>'index')::int
+"""
+
+# 부모 워크플로우의 상태, 사용량과 공유 데이터 수집 상태 (created_at은 하위 시나리오 조회에 사용)
+PARENT_ROW_SQL = f"""
+    SELECT w.created_at, w.status::text AS status, w.prompt_tokens, w.completion_tokens,
+           w.cached_tokens, w.cost_usd, dc.status::text AS data_collector_status
+    FROM workflow w
+    LEFT JOIN {agent_row_lateral("data_collector")} dc ON true
+    WHERE w.workflow_id = $1
+"""
+
+
+def _amount_total(amounts) -> float | None:
+    """
+    예산 항목별 금액의 합계. LLM이 합계 항목(total)을 함께 넣은 경우 그 값을 사용.
+    """
+    if not isinstance(amounts, dict):
+        return None
+    for key, value in amounts.items():
+        if key.lower() == "total" and isinstance(value, (int, float)):
+            return value
+    return sum(value for value in amounts.values() if isinstance(value, (int, float)))
+
+
+def _scenario_summary(row) -> dict:
+    scenario = json.loads(row["scenario"]) if row["scenario"] else {}
+    budget = row["budget"]
+    if row["body"] is not None:
+        budget = decompress_response(row["codec"], row["body"])
+    budget = json.loads(budget) if budget else {}
+    remaining = budget.get("remaining")
+    return {
+        "workflow_id": row["workflow_id"],
+        "name": scenario.get("name"),
+        "scenario": {k: v for k, v in scenario.items() if k != "index"},
+        "status": row["status"],
+        "total_budget": scenario_total_budget(scenario),
+        "allocated": _amount_total(budget.get("allocated")),
+        "spent": _amount_total(budget.get("spent")),
+        "remaining": _amount_total(remaining),
+        "over_budget": sorted(
+            k for k, v in (remaining or {}).items() if isinstance(v, (int, float)) and v < 0
+        ),
+        "usage": {
+            "prompt_tokens": row["prompt_tokens"],
+            "completion_tokens": row["completion_tokens"],
+            "cached_tokens": row["cached_tokens"],
+            "cost_usd": row["cost_usd"],
+        },
+    }
+
+
+def build_comparison(summaries: list[dict]) -> dict:
+    """
+    완료된 시나리오 중 남는 예산이 가장 많은 시나리오와 지출이 가장 적은 시나리오를 선택.
+
+    Returns:
+        dict: {"most_remaining": 시나리오 이름 | None, "lowest_spent": 시나리오 이름 | None}
+    """
+    completed = [s for s in summaries if s["status"] == "completed" and s["spent"] is not None]
+    if not completed:
+        return {"most_remaining": None, "lowest_spent": None}
+    return {
+        "most_remaining": max(completed, key=lambda s: s["remaining"] or 0)["name"],
+        "lowest_spent": min(completed, key=lambda s: s["spent"])["name"],
+    }
+
+
+def _format_amount(value) -> str:
+    return "-" if value is None else f"{value:,.0f}"
+
+
+def comparison_markdown(summaries: list[dict], comparison: dict) -> str:
+    """
+    시나리오 비교 요약 마크다운 (부모 워크플로우의 리포트로 저장).
+    """
+    lines = [
+        "# Scenario Comparison",
+        "",
+        "| Scenario | Status | Budget (USD) | Spent | Remaining | Over budget | LLM cost (USD) |",
+        "| --- | --- | ---: | ---: | ---: | --- | ---: |",
+    ]
+    for s in summaries:
+        lines.append(
+            f"| {s['name']} | {s['status']} | {_format_amount(s['total_budget'])} "
+            f"| {_format_amount(s['spent'])} | {_format_amount(s['remaining'])} "
+            f"| {', '.join(s['over_budget']) or '-'} | {s['usage']['cost_usd']:.4f} |"
+        )
+    lines.append("")
+    if comparison["most_remaining"] is not None:
+        lines.append(f"- Most budget remaining: **{comparison['most_remaining']}**")
+        lines.append(f"- Lowest spending: **{comparison['lowest_spent']}**")
+    lines.append(
+        "- Each scenario's full report: `GET /workflow/{workflow_id}/report` "
+        "(see `GET /workflow/{id}/scenarios`)"
+    )
+    return "\n".join(lines) + "\n"
+
+
+async def _fail_scenario_set(parent_id: str, created_at: datetime, error: str):
+    """
+    부모 워크플로우와 대기 중인 하위 시나리오, 그 미완료 agent를 failed로 기록하고 알림.
+    """
+    for failed_id in await finish_workflow_family(parent_id, "failed", error, created_at):
+        await notify_workflow_update(failed_id)
+
+
+async def _collect_shared_data(parent_id: str, created_at: datetime) -> list[str]:
+    """
+    부모 워크플로우에서 DataCollectorAgent를 한 번 실행하고 결과를 하위 시나리오에 공유.
+    수집이나 공유에 실패하면 부모와 대기 중인 하위 시나리오를 failed로 기록
+    (그대로 두면 running/pending 상태로 계속 남음).
+
+    Returns:
+        list[str]: 공유 후 실행을 시작할 하위 시나리오 workflow_id 목록 (취소/실패 시 빈 목록)
+    """
+    try:
+        if await DataCollectorAgent(parent_id, created_at).run() is None:
+            return []
+    except Exception:
+        await _fail_scenario_set(parent_id, created_at, "Shared data collection failed")
+        return []
+
+    try:
+        pool = await connect_db()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(
+                SHARE_COLLECTED_DATA_SQL, parent_id, datetime.now(timezone.utc), created_at
+            )
+    except Exception as e:
+        logger.error(f"시나리오 수집 결과 공유 실패 ({parent_id}): {e}")
+        await _fail_scenario_set(parent_id, created_at, "Sharing collected data failed")
+        return []
+    started = [row[0] for row in rows]
+    for workflow_id in started:
+        await notify_workflow_update(workflow_id)
+    return started
+
+
+async def _save_comparison(parent_id: str, created_at: datetime):
+    """
+    하위 시나리오가 모두 끝난 뒤 비교 요약을 부모 워크플로우의 report_generator 결과로 저장하고
+    부모 워크플로우를 완료 처리 (완료된 시나리오가 하나도 없으면 failed).
+    """
+    pool = await connect_db()
+    async with pool.acquire() as conn:
+        summaries = [
+            _scenario_summary(row)
+            for row in await conn.fetch(SCENARIO_ROWS_SQL, parent_id, created_at)
+        ]
+        comparison = build_comparison(summaries)
+        for summary in summaries:
+            _branches_total.inc(status=summary["status"])
+        completed = any(s["status"] == "completed" for s in summaries)
+        await save_agent_response(
+            conn,
+            "report_generator",
+            parent_id,
+            created_at,
+            "completed" if completed else "failed",
+            json.dumps({"markdown": comparison_markdown(summaries, comparison)}),
+            workflow_status="completed" if completed else "failed",
+        )
+    await notify_workflow_update(parent_id)
+
+
+async def _run_scenario_set(
+    parent_id: str, created_at: datetime, user_id: int, priority: str, scenarios: dict[str, dict]
+):
+    """
+    시나리오 묶음 실행.
+    1) 부모 워크플로우에서 데이터 수집 (스케줄러 작업 1개)
+    2) 하위 시나리오마다 예산/일정/리포트 단계를 병렬 실행 (시나리오마다 스케줄러 작업 1개이므로
+       사용자별 동시 실행 제한과 공정 큐를 그대로 따름)
+    3) 비교 요약 저장
+
+    부모 태스크가 취소되면 실행 중인 하위 시나리오 태스크도 함께 취소됨.
+    """
+    started = await workflow_scheduler.run(
+        user_id, priority, lambda: _collect_shared_data(parent_id, created_at)
+    )
+    if not started:
+        return
+
+    tasks = []
+    for workflow_id in started:
+        task = asyncio.create_task(
+            workflow_scheduler.run(
+                user_id,
+                priority,
+                lambda workflow_id=workflow_id: run_agent_branch(
+                    workflow_id, created_at, scenarios[workflow_id]
+                ),
+            )
+        )
+        track_workflow_task(workflow_id, task)
+        tasks.append(task)
+    # 개별 시나리오가 취소되어도 나머지 시나리오와 비교 요약은 계속 진행
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await _save_comparison(parent_id, created_at)
+
+
+def _normalize_scenarios(scenarios: list[dict]) -> list[dict]:
+    """
+    시나리오 목록을 검증하고 이름이 없는 시나리오에 기본 이름을 붙임.
+
+    Raises:
+        HTTPException: 시나리오 수가 범위를 벗어나거나, 이름이 겹치거나, 파라미터가 잘못되면 400
+    """
+    if not 1 <= len(scenarios) <= SCENARIO_MAX_COUNT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"scenarios must contain 1 to {SCENARIO_MAX_COUNT} items",
+        )
+    normalized = []
+    for index, scenario in enumerate(scenarios):
+        scenario = {k: v for k, v in scenario.items() if v is not None}
+        scenario.setdefault("name", f"scenario-{index + 1}")
+        try:
+            validate_scenario(scenario)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"{scenario['name']}: {e}") from None
+        normalized.append({"index": index, **scenario})
+    if len({s["name"] for s in normalized}) != len(normalized):
+        raise HTTPException(status_code=400, detail="Scenario names must be unique")
+    return normalized
+
+
+async def run_scenarios(user_name: str, scenarios: list[dict], priority: str = "standard"):
+    """
+    시나리오 묶음 워크플로우를 생성하고 실행을 시작한 뒤 바로 반환.
+    부모 워크플로우는 data_collector와 비교 요약(report_generator)만 가지며,
+    시나리오마다 부모와 같은 created_at(같은 월 파티션)으로 하위 워크플로우를 생성.
+    하위 워크플로우는 수집 결과를 공유받기 전까지 pending 상태.
+
+    N개 시나리오의 비용은 데이터 수집 1회 + 예산/일정/리포트 단계 N회
+    (N개의 워크플로우를 따로 실행하면 데이터 수집도 N회).
+
+    Args:
+        user_name (str): 요청한 사용자 이름
+        scenarios (list[dict]): 시나리오 파라미터 목록 (name, total_budget, allocation, route, notes)
+        priority (str): 우선순위 클래스
+
+    Returns:
+        dict: {"workflow_id": 부모 워크플로우 ID, "scenarios": [{"name", "workflow_id"}, ...]}
+
+    Raises:
+        HTTPException: 시나리오가 잘못되면 400, 쿼터 초과 429, 종료 중이면 503
+    """
+    if not is_accepting_workflows():
+        raise HTTPException(
+            status_code=503,
+            detail="Server is shutting down",
+            headers={"Retry-After": "1"},
+        )
+    scenarios = _normalize_scenarios(scenarios)
+
+    parent_id = str(uuid.uuid4())
+    children = {str(uuid.uuid4()): scenario for scenario in scenarios}
+    child_ids = list(children)
+
+    pool = await connect_db()
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            user_id = await check_user_quota(conn, user_name)
+            created_at = await conn.fetchval(
+                """
+                INSERT INTO workflow (workflow_id, user_id, started_at, status, execution_mode)
+                VALUES ($1, $2, $3, 'running', 'online') RETURNING created_at
+                """,
+                parent_id,
+                user_id,
+                datetime.now(timezone.utc),
+            )
+            # 부모 워크플로우는 데이터 수집과 비교 요약 행만 가짐
+            for agent in ("data_collector", "report_generator"):
+                await conn.execute(
+                    f"INSERT INTO {agent} (workflow_id, created_at) VALUES ($1, $2)",
+                    parent_id,
+                    created_at,
+                )
+            await conn.execute(
+                """
+                INSERT INTO workflow
+                    (workflow_id, created_at, user_id, status, execution_mode, parent_workflow_id, scenario)
+                SELECT unnest($1::uuid[]), $2, $3, 'pending', 'online', $4, unnest($5::jsonb[])
+                """,
+                child_ids,
+                created_at,
+                user_id,
+                parent_id,
+                [json.dumps(children[child_id]) for child_id in child_ids],
+            )
+            for agent in AGENT_TABLES:
+                await conn.execute(
+                    f"INSERT INTO {agent} (workflow_id, created_at) SELECT unnest($1::uuid[]), $2",
+                    child_ids,
+                    created_at,
+                )
+
+    for workflow_id in (parent_id, *child_ids):
+        note_workflow_write(workflow_id)
+
+    task = asyncio.create_task(
+        _run_scenario_set(parent_id, created_at, user_id, priority, children)
+    )
+    track_workflow_task(parent_id, task)
+    logger.info(f"시나리오 {len(children)}개 실행 시작: {parent_id}")
+
+    return {
+        "workflow_id": parent_id,
+        "scenarios": [
+            {"name": children[child_id]["name"], "workflow_id": child_id}
+            for child_id in child_ids
+        ],
+    }
+
+
+async def get_scenarios_response(workflow_id: str, auth_token: str) -> dict:
+    """
+    시나리오 묶음의 진행 상태와 시나리오별 예산 결과/사용량 비교를 조회.
+
+    Args:
+        workflow_id (str): 부모 워크플로우 ID
+        auth_token (str): 인증 토큰
+
+    Returns:
+        dict: workflow_id, status, data_collector(공유 수집 상태), scenarios(시나리오별 요약),
+              comparison(남는 예산 최대/지출 최소 시나리오), totals(묶음 전체 사용량)
+
+    Raises:
+        HTTPException: 인증 실패 401, 소유 워크플로우가 아니거나 시나리오 묶음이 아니면 404
+    """
+    await authorize_workflow_access(workflow_id, auth_token)
+
+    async def fetch_scenarios(conn):
+        parent = await conn.fetchrow(PARENT_ROW_SQL, workflow_id)
+        if parent is None:
+            return None, []
+        return parent, await conn.fetch(SCENARIO_ROWS_SQL, workflow_id, parent["created_at"])
+
+    parent, rows = await run_read(fetch_scenarios, workflow_id=workflow_id)
+    if not rows:
+        raise HTTPException(status_code=404, detail="Not a scenario workflow")
+
+    summaries = [_scenario_summary(row) for row in rows]
+    totals = {
+        key: parent[key] + sum(s["usage"][key] for s in summaries)
+        for key in ("prompt_tokens", "completion_tokens", "cached_tokens", "cost_usd")
+    }
+    return {
+        "workflow_id": workflow_id,
+        "status": parent["status"],
+        "data_collector": {
+            "status": parent["data_collector_status"],
+            "cost_usd": parent["cost_usd"],
+        },
+        "scenarios": summaries,
+        "comparison": build_comparison(summaries),
+        "totals": totals,
+    }
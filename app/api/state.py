@@ -0,0 +1,107 @@
+import asyncio
+import os
+from collections import OrderedDict
+from typing import Dict
+
+# 메모리에 버전을 유지할 최대 워크플로우 수
+STATE_TRACKER_MAX_WORKFLOWS = int(os.getenv("STATE_TRACKER_MAX_WORKFLOWS", "10000"))
+
+
+class WorkflowStateTracker:
+    """
+    workflow_id 별 상태 변경 알림 버전을 메모리에서 관리하여 롱폴링 요청을 다음 상태 변경까지 대기시킴.
+    버전은 이 프로세스가 받은 알림 기준이므로 깨우는 신호로만 사용하고,
+    변경 여부(ETag)는 항상 DB의 상태 전이 이벤트 순번으로 판단
+    (워커마다 버전이 다르고, 놓친 알림이 있으면 버전이 갱신되지 않음).
+    """
+
+    def __init__(self, max_workflows: int = STATE_TRACKER_MAX_WORKFLOWS):
+        """
+        버전 카운터와 워크플로우별 버전/대기 이벤트 저장소를 초기화합니다.
+        """
+        self.max_workflows = max_workflows
+        self._counter = 0
+        # LRU에서 밀려난 워크플로우 버전 중 최대값 (모르는 워크플로우의 버전으로 사용)
+        self._floor = 0
+        # 종료 절차가 시작되면 True - 롱폴링 요청을 대기시키지 않음
+        self._closed = False
+        self._versions: OrderedDict[str, int] = OrderedDict()
+        # workflow_id -> [대기 이벤트, 대기 중인 요청 수]
+        self._waiters: Dict[str, list] = {}
+
+    def version(self, workflow_id: str) -> int:
+        """
+        워크플로우의 현재 상태 버전을 반환.
+
+        Args:
+            workflow_id: 워크플로우 식별자
+
+        Returns:
+            int: 마지막 상태 변경 시 부여된 버전, 기록이 없으면 floor 값
+        """
+        return self._versions.get(workflow_id, self._floor)
+
+    def bump(self, workflow_id: str) -> int:
+        """
+        워크플로우의 상태 버전을 올리고 대기 중인 롱폴링 요청을 깨움.
+
+        Args:
+            workflow_id: 워크플로우 식별자
+
+        Returns:
+            int: 새로 부여된 버전
+        """
+        self._counter += 1
+        self._versions[workflow_id] = self._counter
+        self._versions.move_to_end(workflow_id)
+        while len(self._versions) > self.max_workflows:
+            _, evicted = self._versions.popitem(last=False)
+            self._floor = max(self._floor, evicted)
+
+        waiter = self._waiters.pop(workflow_id, None)
+        if waiter:
+            waiter[0].set()
+        return self._counter
+
+    async def wait_for_change(
+        self, workflow_id: str, version: int, timeout: float
+    ) -> bool:
+        """
+        워크플로우 버전이 주어진 version과 달라질 때까지 최대 timeout 초 대기.
+
+        Args:
+            workflow_id: 워크플로우 식별자
+            version: 클라이언트가 알고 있는 버전
+            timeout: 최대 대기 시간(초)
+
+        Returns:
+            bool: 대기 중 상태가 변경되었으면 True, 시간 초과(또는 종료 시작)면 False
+        """
+        if self.version(workflow_id) != version:
+            return True
+        if self._closed:
+            return False
+        waiter = self._waiters.setdefault(workflow_id, [asyncio.Event(), 0])
+        waiter[1] += 1
+        try:
+            await asyncio.wait_for(waiter[0].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            waiter[1] -= 1
+            # 대기자가 모두 빠진 이벤트는 정리
+            if waiter[1] == 0 and self._waiters.get(workflow_id) is waiter:
+                del self._waiters[workflow_id]
+        return self.version(workflow_id) != version
+
+    def close(self):
+        """
+        종료 절차 시작 시 호출. 대기 중인 롱폴링 요청을 모두 깨우고 이후 요청은 대기하지 않음
+        (롱폴링 요청이 종료 대기 시간을 차지하지 않고 바로 304로 응답).
+        """
+        self._closed = True
+        for waiter in self._waiters.values():
+            waiter[0].set()
+
+
+state_tracker = WorkflowStateTracker()
@@ -0,0 +1,118 @@
+import hmac
+import os
+
+from fastapi import HTTPException, Response
+from fastapi.responses import JSONResponse
+
+from app.api.state import state_tracker
+from app.api.websocket import convert_datetime_to_str
+from app.db.database import (
+    check_workflow_belongs_to_user,
+    get_full_workflow_status_join,
+    get_latest_event_seq,
+    verify_auth_token,
+)
+
+# 롱폴링 요청의 최대 대기 시간(초)
+STATUS_LONG_POLL_MAX_SECONDS = float(os.getenv("STATUS_LONG_POLL_MAX_SECONDS", "30"))
+# 운영/대시보드용 관리자 토큰 (비어 있으면 관리자 기능 사용 안 함)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+
+def is_admin_token(token: str | None) -> bool:
+    """
+    ADMIN_TOKEN이 설정되어 있고 token과 일치하는지 확인 (상수 시간 비교).
+    """
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(
+        token.encode(), ADMIN_TOKEN.encode()
+    )
+
+
+async def authorize_workflow_access(workflow_id: str, auth_token: str) -> int:
+    """
+    auth_token을 검증하고 workflow_id가 해당 사용자 소유인지 확인.
+
+    Args:
+        workflow_id (str): 워크플로우 ID
+        auth_token (str): 인증 토큰
+
+    Returns:
+        int: 인증된 user_id
+
+    Raises:
+        HTTPException: 토큰이 유효하지 않으면 401, 소유 워크플로우가 아니면 404
+    """
+    user_id = await verify_auth_token(auth_token)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid auth token")
+    if not await check_workflow_belongs_to_user(workflow_id, user_id):
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    return user_id
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    If-None-Match 헤더 값에 etag(또는 약한 비교 W/etag, *)가 포함되어 있는지 확인.
+    """
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def status_etag(seq: int) -> str:
+    """
+    워크플로우의 마지막 상태 전이 이벤트 순번(workflow.event_seq)으로 ETag를 생성.
+    상태(및 응답, 시작/종료 시각)는 이벤트를 남기는 상태 전이와 함께 바뀌고, 순번은
+    커밋 순서대로 증가하므로 순번이 같으면 스냅샷도 같음 (어느 워커가 응답해도 같은 ETag).
+    """
+    return f'"s{seq}"'
+
+
+async def get_workflow_status_response(
+    workflow_id: str,
+    auth_token: str,
+    if_none_match: str | None,
+    wait: float = 0,
+) -> Response:
+    """
+    REST 방식의 워크플로우 상태 조회 처리 함수입니다.
+    - 마지막 상태 전이 이벤트 순번으로 만든 ETag가 If-None-Match와 같으면 스냅샷 조회 없이 304 반환
+    - wait > 0 이면 다음 상태 변경 알림 또는 시간 초과까지 대기(롱폴링)한 뒤 순번을 다시 확인하여 응답
+      (알림을 놓쳐도 시간 초과 후 DB 기준으로 판단하므로 이전 상태로 304를 반환하지 않음)
+    - 변경이 있으면 WebSocket init 메시지와 같은 형태의 스냅샷을 ETag와 함께 반환
+
+    Args:
+        workflow_id (str): 워크플로우 ID
+        auth_token (str): 인증 토큰
+        if_none_match (str | None): 클라이언트가 보낸 If-None-Match 헤더 값
+        wait (float): 롱폴링 최대 대기 시간(초), 0이면 즉시 응답
+
+    Returns:
+        Response: 304 응답 또는 상태 스냅샷 JSON 응답
+    """
+    await authorize_workflow_access(workflow_id, auth_token)
+
+    # 순번 조회 전에 알림 버전을 읽어 두어, 조회 직후의 변경 알림도 대기 중에 놓치지 않음
+    version = state_tracker.version(workflow_id)
+    etag = status_etag(await get_latest_event_seq(workflow_id))
+    if etag_matches(if_none_match, etag):
+        timeout = min(wait, STATUS_LONG_POLL_MAX_SECONDS)
+        if timeout > 0:
+            await state_tracker.wait_for_change(workflow_id, version, timeout)
+            etag = status_etag(await get_latest_event_seq(workflow_id))
+        if etag_matches(if_none_match, etag):
+            return Response(
+                status_code=304,
+                headers={"ETag": etag, "Cache-Control": "no-cache"},
+            )
+
+    # 조회 전에 읽은 순번을 ETag로 사용하므로, 조회 도중 변경이 생겨도 다음 폴링에서 다시 받게 됨
+    latest_status = await get_full_workflow_status_join(workflow_id)
+    if latest_status is None:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+
+    return JSONResponse(
+        content=convert_datetime_to_str(latest_status),
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
@@ -0,0 +1,236 @@
+# 토큰 사용량/비용 조회 및 사용자별 쿼터
+import os
+from datetime import date, datetime, time, timedelta, timezone
+
+from fastapi import HTTPException
+
+from app.api.status import authorize_workflow_access
+from app.db.database import AGENT_TABLES, agent_row_lateral, run_read, verify_auth_token
+from app.monitoring.metrics import registry
+
+# 사용자별 기본 토큰 쿼터 (입력+출력 토큰, 0이면 제한 없음) - users.token_quota로 사용자별 지정 가능
+USAGE_TOKEN_QUOTA = int(os.getenv("USAGE_TOKEN_QUOTA", "0"))
+# 사용자별 기본 비용 쿼터(USD, 0이면 제한 없음) - users.cost_quota_usd로 사용자별 지정 가능
+USAGE_COST_QUOTA_USD = float(os.getenv("USAGE_COST_QUOTA_USD", "0"))
+# 쿼터 집계 기간 ("day" 또는 "month", UTC 기준)
+USAGE_QUOTA_PERIOD = os.getenv("USAGE_QUOTA_PERIOD", "day")
+# /usage 조회 최대 기간(일)
+USAGE_MAX_DAYS = int(os.getenv("USAGE_MAX_DAYS", "90"))
+
+_quota_rejections = registry.counter(
+    "usage_quota_rejections_total",
+    "Workflow starts rejected because the user exceeded a usage quota (kind=tokens|cost)",
+    ("kind",),
+)
+
+_QUOTA_SQL_TEMPLATE = """
+    SELECT u.user_id,
+           coalesce(u.token_quota, $2) AS token_quota,
+           coalesce(u.cost_quota_usd, $3) AS cost_quota_usd,
+           coalesce(sum(uu.prompt_tokens + uu.completion_tokens), 0)::bigint AS tokens_used,
+           coalesce(sum(uu.cost_usd), 0) AS cost_used
+    FROM users u
+    LEFT JOIN user_usage uu ON uu.user_id = u.user_id AND uu.usage_date >= $4
+    WHERE {condition}
+    GROUP BY u.user_id
+"""
+QUOTA_BY_NAME_SQL = _QUOTA_SQL_TEMPLATE.format(condition="u.name = $1")
+QUOTA_BY_ID_SQL = _QUOTA_SQL_TEMPLATE.format(condition="u.user_id = $1")
+
+DAILY_USAGE_SQL = """
+    SELECT usage_date, prompt_tokens, completion_tokens, cached_tokens, cost_usd
+    FROM user_usage
+    WHERE user_id = $1 AND usage_date >= $2
+    ORDER BY usage_date
+"""
+
+_TOKEN_SUMS = """
+    count(*) AS runs,
+    sum(a.prompt_tokens)::bigint AS prompt_tokens,
+    sum(a.completion_tokens)::bigint AS completion_tokens,
+    sum(a.cached_tokens)::bigint AS cached_tokens,
+    sum(a.cost_usd) AS cost_usd"""
+
+# 기간 내 워크플로우의 agent별/모델별 사용량 (created_at 조건으로 월 파티션만 조회)
+AGENT_USAGE_SQL = " UNION ALL ".join(
+    f"""
+    SELECT '{table}' AS agent, a.model, {_TOKEN_SUMS}
+    FROM {table} a
+    JOIN workflow w ON w.workflow_id = a.workflow_id AND w.created_at = a.created_at
+    WHERE w.user_id = $1 AND w.created_at >= $2 AND a.created_at >= $2
+      AND a.prompt_tokens IS NOT NULL
+    GROUP BY a.model"""
+    for table in AGENT_TABLES
+)
+
+# 워크플로우 하나의 agent별 사용량 (workflow의 created_at으로 agent 테이블은 해당 월 파티션만 조회)
+WORKFLOW_USAGE_SQL = " UNION ALL ".join(
+    f"""
+    SELECT '{table}' AS agent, a.status::text AS status, a.model,
+           a.prompt_tokens, a.completion_tokens, a.cached_tokens, a.cost_usd
+    FROM workflow w
+    CROSS JOIN {agent_row_lateral(table)} a
+    WHERE w.workflow_id = $1"""
+    for table in AGENT_TABLES
+)
+
+
+def quota_window(now: datetime) -> tuple[date, datetime]:
+    """
+    현재 쿼터 집계 기간의 시작일과 다음 초기화 시각을 계산 (UTC 기준).
+
+    Args:
+        now (datetime): 현재 시각 (timezone-aware)
+
+    Returns:
+        tuple[date, datetime]: (기간 시작일, 다음 기간 시작 시각)
+    """
+    today = now.astimezone(timezone.utc).date()
+    if USAGE_QUOTA_PERIOD == "month":
+        start = today.replace(day=1)
+        reset = (start + timedelta(days=32)).replace(day=1)
+    else:
+        start = today
+        reset = today + timedelta(days=1)
+    return start, datetime.combine(reset, time.min, tzinfo=timezone.utc)
+
+
+def _quota_state(row, now: datetime) -> dict:
+    _, resets_at = quota_window(now)
+    return {
+        "period": USAGE_QUOTA_PERIOD,
+        "token_quota": row["token_quota"] or None,
+        "cost_quota_usd": row["cost_quota_usd"] or None,
+        "tokens_used": row["tokens_used"],
+        "cost_used_usd": row["cost_used"],
+        "resets_at": resets_at.isoformat(),
+    }
+
+
+def _exceeded_quota(row) -> str | None:
+    """
+    사용량이 쿼터에 도달했으면 초과한 쿼터 종류("tokens" 또는 "cost"), 아니면 None.
+    """
+    if row["token_quota"] and row["tokens_used"] >= row["token_quota"]:
+        return "tokens"
+    if row["cost_quota_usd"] and row["cost_used"] >= row["cost_quota_usd"]:
+        return "cost"
+    return None
+
+
+async def check_user_quota(conn, user_name: str) -> int:
+    """
+    사용자를 조회하고 현재 기간의 사용량이 쿼터를 넘었는지 확인 (워크플로우 시작 시 호출).
+    이미 실행 중인 워크플로우의 사용량은 끝난 뒤에 반영되므로 쿼터는 약간 넘을 수 있음.
+
+    Args:
+        conn: DB 커넥션
+        user_name (str): 사용자 이름
+
+    Returns:
+        int: user_id
+
+    Raises:
+        ValueError: 사용자가 없는 경우
+        HTTPException: 쿼터를 초과하면 429 (Retry-After: 다음 기간 시작까지 남은 초)
+    """
+    now = datetime.now(timezone.utc)
+    start, resets_at = quota_window(now)
+    row = await conn.fetchrow(
+        QUOTA_BY_NAME_SQL, user_name, USAGE_TOKEN_QUOTA, USAGE_COST_QUOTA_USD, start
+    )
+    if not row:
+        raise ValueError(f"User '{user_name}' not found")
+
+    kind = _exceeded_quota(row)
+    if kind is not None:
+        _quota_rejections.inc(kind=kind)
+        retry_after = max(1, int((resets_at - now).total_seconds()))
+        raise HTTPException(
+            status_code=429,
+            detail={"error": f"Usage quota exceeded ({kind})", "quota": _quota_state(row, now)},
+            headers={"Retry-After": str(retry_after)},
+        )
+    return row["user_id"]
+
+
+def _totals(rows) -> dict:
+    totals = {
+        "prompt_tokens": sum(row["prompt_tokens"] or 0 for row in rows),
+        "completion_tokens": sum(row["completion_tokens"] or 0 for row in rows),
+        "cached_tokens": sum(row["cached_tokens"] or 0 for row in rows),
+        "cost_usd": sum(row["cost_usd"] or 0 for row in rows),
+    }
+    totals["total_tokens"] = totals["prompt_tokens"] + totals["completion_tokens"]
+    return totals
+
+
+async def get_usage_response(auth_token: str, days: int = 30) -> dict:
+    """
+    인증된 사용자의 최근 days일 토큰 사용량/비용을 집계.
+
+    Args:
+        auth_token (str): 인증 토큰
+        days (int): 조회 기간(일, 오늘 포함, 최대 USAGE_MAX_DAYS)
+
+    Returns:
+        dict: totals(합계), daily(일별), by_agent(agent/모델별), quota(현재 쿼터 상태)
+
+    Raises:
+        HTTPException: 토큰이 유효하지 않으면 401
+    """
+    user_id = await verify_auth_token(auth_token)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid auth token")
+
+    now = datetime.now(timezone.utc)
+    since = now.date() - timedelta(days=min(days, USAGE_MAX_DAYS) - 1)
+    since_at = datetime.combine(since, time.min, tzinfo=timezone.utc)
+    quota_start, _ = quota_window(now)
+
+    async def fetch_usage(conn):
+        daily = await conn.fetch(DAILY_USAGE_SQL, user_id, since)
+        by_agent = await conn.fetch(AGENT_USAGE_SQL, user_id, since_at)
+        quota = await conn.fetchrow(
+            QUOTA_BY_ID_SQL, user_id, USAGE_TOKEN_QUOTA, USAGE_COST_QUOTA_USD, quota_start
+        )
+        return daily, by_agent, quota
+
+    daily, by_agent, quota = await run_read(fetch_usage)
+
+    return {
+        "user_id": user_id,
+        "since": since.isoformat(),
+        "totals": _totals(daily),
+        "daily": [
+            {**dict(row), "usage_date": row["usage_date"].isoformat()} for row in daily
+        ],
+        # 캐시 비율이 낮고 입력 토큰이 많은 agent가 프롬프트 캐싱 대상
+        "by_agent": [dict(row) for row in by_agent],
+        "quota": _quota_state(quota, now),
+    }
+
+
+async def get_workflow_usage_response(workflow_id: str, auth_token: str) -> dict:
+    """
+    워크플로우 하나의 agent별 토큰 사용량과 합계를 조회.
+
+    Args:
+        workflow_id (str): 워크플로우 ID
+        auth_token (str): 인증 토큰
+
+    Returns:
+        dict: workflow_id, totals, agents(agent별 사용량, LLM을 호출하지 않은 agent는 null)
+
+    Raises:
+        HTTPException: 토큰이 유효하지 않으면 401, 소유 워크플로우가 아니면 404
+    """
+    await authorize_workflow_access(workflow_id, auth_token)
+    rows = await run_read(
+        lambda conn: conn.fetch(WORKFLOW_USAGE_SQL, workflow_id), workflow_id=workflow_id
+    )
+    return {
+        "workflow_id": workflow_id,
+        "totals": _totals(rows),
+        "agents": [dict(row) for row in rows],
+    }
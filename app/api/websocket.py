@@ -1,13 +1,83 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
 from datetime import datetime
-from typing import Dict, List
+from typing import Awaitable, Callable, Dict, List, Set
 
 from fastapi import Query, WebSocket, WebSocketDisconnect, status
+from starlette.websockets import WebSocketState
 
+from app.api.encoding import encode_ws_message
+from app.api.state import state_tracker
 from app.db.database import (
     check_workflow_belongs_to_user,
+    connect_db,
+    create_listener_connection,
     get_full_workflow_status_join,
+    get_latest_event_seq,
+    get_workflow_events,
+    get_workflow_status,
+    note_workflow_write,
     verify_auth_token,
 )
+from app.monitoring.loop_watchdog import bind_workflow_context
+from app.monitoring.metrics import registry
+
+# 여러 워커/인스턴스가 상태 변경을 서로 전달할지 여부 (PostgreSQL LISTEN/NOTIFY 사용)
+WORKFLOW_UPDATE_RELAY = os.getenv("WORKFLOW_UPDATE_RELAY", "true").lower() == "true"
+WORKFLOW_UPDATE_CHANNEL = "workflow_update"
+# 종료 시 클라이언트에게 안내할 재연결 대기 시간(ms)
+RECONNECT_AFTER_MS = int(os.getenv("RECONNECT_AFTER_MS", "1000"))
+# 클라이언트 메시지 및 서버 전송이 이 시간(초) 동안 없으면 연결 종료 (0이면 사용 안 함)
+WS_IDLE_TIMEOUT_SECONDS = float(os.getenv("WS_IDLE_TIMEOUT_SECONDS", "900"))
+# 워크플로우가 완료/실패한 뒤 연결을 유지하는 시간(초) (음수면 자동 종료하지 않음)
+WS_TERMINAL_GRACE_SECONDS = float(os.getenv("WS_TERMINAL_GRACE_SECONDS", "30"))
+# 메시지 하나를 보내는 최대 시간(초) - 넘으면 느리거나 끊긴 연결로 보고 종료
+WS_SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "10"))
+# 끊긴 연결/유휴 연결 정리 주기(초)
+WS_REAP_INTERVAL_SECONDS = float(os.getenv("WS_REAP_INTERVAL_SECONDS", "30"))
+# 프로세스(워커)당 최대 동시 연결 수 및 사용자별 최대 동시 연결 수
+WS_MAX_CONNECTIONS = int(os.getenv("WS_MAX_CONNECTIONS", "10000"))
+WS_MAX_CONNECTIONS_PER_USER = int(os.getenv("WS_MAX_CONNECTIONS_PER_USER", "20"))
+
+TERMINAL_WORKFLOW_STATUSES = ("completed", "failed", "cancelled")
+
+# 자기 자신이 보낸 NOTIFY를 구분하기 위한 프로세스 식별자
+_INSTANCE_ID = uuid.uuid4().hex
+
+logger = logging.getLogger(__name__)
+
+_relay_task: asyncio.Task | None = None
+_reaper_task: asyncio.Task | None = None
+# 실행 중인 NOTIFY 처리 작업 (참조를 유지하지 않으면 완료 전에 GC될 수 있음)
+_relay_handler_tasks: set[asyncio.Task] = set()
+
+_ws_messages_sent = registry.counter(
+    "ws_messages_sent_total", "WebSocket messages sent", ("encoding",)
+)
+_ws_bytes_sent = registry.counter(
+    "ws_bytes_sent_total",
+    "WebSocket payload bytes sent before permessage-deflate",
+    ("encoding",),
+)
+_ws_connections = registry.gauge(
+    "ws_connections", "Open WebSocket connections in this process"
+)
+_ws_connected_users = registry.gauge(
+    "ws_connected_users", "Users with at least one open WebSocket connection in this process"
+)
+_ws_rejected = registry.counter(
+    "ws_connections_rejected_total",
+    "WebSocket connections rejected by connection caps",
+    ("reason",),
+)
+_ws_closed = registry.counter(
+    "ws_connections_closed_total",
+    "WebSocket connections closed by the server",
+    ("reason",),
+)
 
 
 def convert_datetime_to_str(obj):
@@ -31,6 +101,70 @@ def convert_datetime_to_str(obj):
         return obj
 
 
+def without_agent_responses(snapshot: dict | None) -> dict | None:
+    """
+    상태 스냅샷에서 agent별 response 본문을 제외한 복사본을 생성.
+    상태 변화만 필요한 클라이언트에게 보낼 메시지 크기를 줄이기 위해 사용.
+
+    Args:
+        snapshot: get_full_workflow_status_join 결과 딕셔너리
+
+    Returns:
+        response 키가 제거된 스냅샷 (snapshot이 None이면 None)
+    """
+    if not snapshot:
+        return snapshot
+    agents = {
+        name: {k: v for k, v in agent.items() if k != "response"}
+        for name, agent in snapshot.get("agents", {}).items()
+    }
+    return {**snapshot, "agents": agents}
+
+
+def is_terminal_status(snapshot: dict | None) -> bool:
+    """
+    상태 스냅샷의 워크플로우가 완료, 실패 또는 취소 상태인지 확인.
+    """
+    if not snapshot:
+        return False
+    return (snapshot.get("workflow") or {}).get("status") in TERMINAL_WORKFLOW_STATUSES
+
+
+def has_terminal_event(events: list[dict]) -> bool:
+    """
+    이벤트 목록에 워크플로우 완료, 실패 또는 취소 이벤트가 있는지 확인.
+    """
+    return any(
+        event["agent"] is None and event["status"] in TERMINAL_WORKFLOW_STATUSES
+        for event in events
+    )
+
+
+def contiguous_events(events: list[dict], cursor: int) -> list[dict]:
+    """
+    cursor 바로 다음 seq부터 빠짐없이 이어지는 이벤트만 반환.
+    seq는 워크플로우별로 커밋 순서대로 1씩 증가하므로 중간이 비어 있으면 아직 보이지 않는
+    이벤트가 있다는 뜻 - 그 앞까지만 보내고 cursor를 멈춰 두어 다음 조회에서 이어서 전송.
+
+    Args:
+        events: seq 순으로 정렬된 이벤트 목록
+        cursor: 마지막으로 보낸 seq
+
+    Returns:
+        list[dict]: cursor + 1부터 연속된 이벤트 목록
+    """
+    expected = cursor + 1
+    result = []
+    for event in events:
+        if event["seq"] < expected:
+            continue
+        if event["seq"] != expected:
+            break
+        result.append(event)
+        expected += 1
+    return result
+
+
 class ConnectionManager:
     """
     workflow_id 별로 WebSocket 연결을 관리.
@@ -43,28 +177,156 @@ class ConnectionManager:
         활성 연결을 저장할 빈 딕셔너리를 초기화합니다.
         """
         self.active_connections: Dict[str, List[WebSocket]] = {}
+        # agent 응답 본문 없이 상태만 받기를 원하는 연결
+        self.status_only: Set[WebSocket] = set()
+        # json이 아닌 인코딩(msgpack)을 요청한 연결 -> 인코딩
+        self.encodings: Dict[WebSocket, str] = {}
+        # since로 연결하여 스냅샷 대신 상태 전이 이벤트를 받는 연결 -> 마지막으로 보낸 이벤트 seq
+        self.event_cursors: Dict[WebSocket, int] = {}
+        # 마지막 구독자가 떠나면 워크플로우를 취소하도록 요청한 연결
+        self.cancel_on_disconnect: Set[WebSocket] = set()
+        # 연결 -> 사용자 ID, 사용자 ID -> 연결 수 (사용자별 연결 수 제한)
+        self.connection_users: Dict[WebSocket, int] = {}
+        self.user_connections: Dict[int, int] = {}
+        # 연결 -> 마지막 개별 송수신 시각, workflow_id -> 마지막 방송 시각 (유휴 연결 정리)
+        self.last_activity: Dict[WebSocket, float] = {}
+        self.workflow_activity: Dict[str, float] = {}
+        self.connection_count = 0
+        # 완료된 워크플로우의 연결 자동 종료 태스크
+        self._close_tasks: Dict[str, asyncio.Task] = {}
+
+    def reserve_slot(self, user_id: int | None) -> str | None:
+        """
+        연결 수 제한을 확인하고, 여유가 있으면 그 자리에서 연결 수를 하나 예약.
+        확인과 예약 사이에 await가 없으므로 동시에 들어온 연결이 함께 제한을 넘지 못함.
+        예약한 자리는 connect가 연결로 전환하거나, accept에 실패하면 release_slot으로 반환.
 
-    async def connect(self, workflow_id: str, websocket: WebSocket):
+        Args:
+            user_id: 연결을 요청한 사용자 ID
+
+        Returns:
+            str | None: 제한에 걸리면 사유("global" 또는 "user"), 예약했으면 None
+        """
+        if self.connection_count >= WS_MAX_CONNECTIONS:
+            return "global"
+        if user_id is not None:
+            if self.user_connections.get(user_id, 0) >= WS_MAX_CONNECTIONS_PER_USER:
+                return "user"
+            self.user_connections[user_id] = self.user_connections.get(user_id, 0) + 1
+        self.connection_count += 1
+        self._update_gauges()
+        return None
+
+    def release_slot(self, user_id: int | None):
+        """
+        reserve_slot으로 예약했지만 연결되지 못한 자리를 반환.
         """
-        새로운 WebSocket 연결을 수락하고
+        if user_id is not None:
+            remaining = self.user_connections.get(user_id, 1) - 1
+            if remaining > 0:
+                self.user_connections[user_id] = remaining
+            else:
+                self.user_connections.pop(user_id, None)
+        self.connection_count -= 1
+        self._update_gauges()
+
+    async def connect(
+        self,
+        workflow_id: str,
+        websocket: WebSocket,
+        include_responses: bool = True,
+        encoding: str = "json",
+        user_id: int | None = None,
+        since: int | None = None,
+        cancel_on_disconnect: bool = False,
+    ):
+        """
+        reserve_slot으로 자리를 예약한 WebSocket 연결을 수락하고
         해당 workflow의 초기 상태를 클라이언트에 전송.
+        since가 주어지면 초기 상태 대신 since 이후의 상태 전이 이벤트만 재전송하고,
+        이후에도 스냅샷 대신 새 이벤트만 전송.
+        이미 완료/실패한 워크플로우면 WS_TERMINAL_GRACE_SECONDS 뒤 연결을 종료하도록 예약.
 
         Args:
             workflow_id: 워크플로우 식별자
             websocket: WebSocket 연결 객체
+            include_responses: False이면 이 연결에는 agent 응답 본문을 제외하고 전송
+            encoding: 메시지 인코딩 ("json" 텍스트 프레임 또는 "msgpack" 바이너리 프레임)
+            user_id: 연결한 사용자 ID (reserve_slot에 넘긴 값)
+            since: 클라이언트가 마지막으로 받은 이벤트 seq (재연결 시)
+            cancel_on_disconnect: True이면 이 연결이 마지막 구독자로 끊길 때 워크플로우 취소 대상
         """
-        await websocket.accept()
+        try:
+            await websocket.accept()
+        except BaseException:
+            self.release_slot(user_id)
+            raise
         if workflow_id not in self.active_connections:
             self.active_connections[workflow_id] = []
         self.active_connections[workflow_id].append(websocket)
+        if not include_responses:
+            self.status_only.add(websocket)
+        if encoding != "json":
+            self.encodings[websocket] = encoding
+        if cancel_on_disconnect:
+            self.cancel_on_disconnect.add(websocket)
+        if user_id is not None:
+            self.connection_users[websocket] = user_id
+        self.last_activity[websocket] = time.monotonic()
 
-        # 연결 시 초기 상태 전송
-        initial_status = await get_full_workflow_status_join(workflow_id)
+        if since is None:
+            # 연결 시 초기 상태 전송 (datetime은 인코딩 시 문자열로 변환)
+            # seq를 먼저 읽으므로 스냅샷은 항상 seq까지의 이벤트를 반영함 (재연결 시 since로 사용)
+            seq = await get_latest_event_seq(workflow_id)
+            initial_status = await get_full_workflow_status_join(
+                workflow_id, include_responses=include_responses
+            )
+            await self.send(websocket, {"type": "init", "seq": seq, "data": initial_status})
+            terminal = is_terminal_status(initial_status)
+        else:
+            # 조회하는 동안 들어온 이벤트도 놓치지 않도록 먼저 이벤트 구독으로 등록
+            self.event_cursors[websocket] = since
+            events = await get_workflow_events(workflow_id, since)
+            # 조회하는 동안 실시간 전송으로 이미 받은 이벤트는 제외
+            cursor = self.event_cursors.get(websocket, since)
+            events = contiguous_events(events, cursor)
+            if events:
+                cursor = self.event_cursors[websocket] = events[-1]["seq"]
+            await self.send(websocket, {"type": "replay", "seq": cursor, "events": events})
+            terminal = (
+                await get_workflow_status(workflow_id) in TERMINAL_WORKFLOW_STATUSES
+            )
+        if terminal:
+            self.schedule_close(workflow_id)
 
-        # datetime 객체를 문자열로 변환
-        initial_status = convert_datetime_to_str(initial_status)
+    def touch(self, websocket: WebSocket):
+        """
+        연결에서 메시지를 주고받았을 때 마지막 활동 시각을 갱신.
+        """
+        if websocket in self.last_activity:
+            self.last_activity[websocket] = time.monotonic()
 
-        await websocket.send_json({"type": "init", "data": initial_status})
+    async def send(self, websocket: WebSocket, message: dict):
+        """
+        연결의 인코딩에 맞춰 메시지 하나를 전송.
+
+        Args:
+            websocket: WebSocket 연결 객체
+            message: 전송할 메시지 딕셔너리
+        """
+        encoding = self.encodings.get(websocket, "json")
+        # 수신하지 않는 클라이언트 때문에 호출자가 멈추지 않도록 전송 시간 제한
+        async with asyncio.timeout(WS_SEND_TIMEOUT_SECONDS):
+            await self._send_payload(websocket, encode_ws_message(message, encoding))
+        _ws_messages_sent.inc(encoding=encoding)
+        self.touch(websocket)
+
+    @staticmethod
+    async def _send_payload(websocket: WebSocket, payload: str | bytes):
+        if isinstance(payload, bytes):
+            await websocket.send_bytes(payload)
+        else:
+            await websocket.send_text(payload)
 
     def disconnect(self, workflow_id: str, websocket: WebSocket):
         """
@@ -74,23 +336,323 @@ class ConnectionManager:
             workflow_id: 워크플로우 식별자
             websocket: 제거할 WebSocket 객체
         """
-        if workflow_id in self.active_connections:
+        self.status_only.discard(websocket)
+        self.encodings.pop(websocket, None)
+        self.event_cursors.pop(websocket, None)
+        self.cancel_on_disconnect.discard(websocket)
+        self.last_activity.pop(websocket, None)
+        user_id = self.connection_users.pop(websocket, None)
+        if user_id is not None:
+            remaining = self.user_connections.get(user_id, 1) - 1
+            if remaining > 0:
+                self.user_connections[user_id] = remaining
+            else:
+                self.user_connections.pop(user_id, None)
+        if websocket in self.active_connections.get(workflow_id, []):
             self.active_connections[workflow_id].remove(websocket)
+            self.connection_count -= 1
             if not self.active_connections[workflow_id]:
                 del self.active_connections[workflow_id]
+                self.workflow_activity.pop(workflow_id, None)
+                close_task = self._close_tasks.pop(workflow_id, None)
+                if close_task is not None and close_task is not asyncio.current_task():
+                    close_task.cancel()
+        self._update_gauges()
+
+    def _update_gauges(self):
+        _ws_connections.set(self.connection_count)
+        _ws_connected_users.set(len(self.user_connections))
+
+    async def close_connection(
+        self, workflow_id: str, websocket: WebSocket, code: int, reason: str, label: str
+    ):
+        """
+        연결을 목록에서 제거하고 close frame을 보내 종료. (이미 끊긴 연결이면 제거만 함)
+
+        Args:
+            workflow_id: 워크플로우 식별자
+            websocket: 종료할 WebSocket 객체
+            code: close 코드
+            reason: close frame reason
+            label: 메트릭 라벨 (종료 사유)
+        """
+        self.disconnect(workflow_id, websocket)
+        _ws_closed.inc(reason=label)
+        try:
+            await websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+
+    def needs_responses(self, workflow_id: str) -> bool:
+        """
+        해당 workflow에 agent 응답 본문이 필요한 연결이 하나라도 있는지 확인.
+
+        Args:
+            workflow_id: 워크플로우 식별자
+
+        Returns:
+            bool: 응답 본문이 필요한 연결이 있으면 True
+        """
+        return any(
+            connection not in self.status_only and connection not in self.event_cursors
+            for connection in self.active_connections.get(workflow_id, [])
+        )
+
+    def needs_snapshot(self, workflow_id: str) -> bool:
+        """
+        해당 workflow에 상태 스냅샷을 받는(since 없이 연결한) 연결이 있는지 확인.
+        """
+        return any(
+            connection not in self.event_cursors
+            for connection in self.active_connections.get(workflow_id, [])
+        )
+
+    def min_event_cursor(self, workflow_id: str) -> int | None:
+        """
+        해당 workflow의 이벤트 구독 연결 중 가장 작은 cursor(마지막으로 보낸 seq)를 반환.
+
+        Returns:
+            int | None: 가장 작은 cursor, 이벤트 구독 연결이 없으면 None
+        """
+        if not self.event_cursors:
+            return None
+        cursors = [
+            self.event_cursors[connection]
+            for connection in self.active_connections.get(workflow_id, [])
+            if connection in self.event_cursors
+        ]
+        return min(cursors) if cursors else None
 
     async def broadcast(self, workflow_id: str, message: dict):
         """
         특정 workflow에 연결된 모든 WebSocket 클라이언트에게
-        JSON 메시지를 전송합니다. 한 사용자가 여러 기기를 사용해 동일한 workflow에 연결을 시도할 경우를 고려하였습니다.
+        메시지를 전송합니다. 한 사용자가 여러 기기를 사용해 동일한 workflow에 연결을 시도할 경우를 고려하였습니다.
+        이벤트 구독(since) 연결은 제외합니다.
+
+        (응답 본문 포함 여부, 인코딩) 조합별로 메시지를 한 번만 직렬화하여 모든 연결이 공유합니다.
 
         Args:
             workflow_id: 워크플로우 식별자
-            message: JSON 직렬화 가능한 메시지 딕셔너리
+            message: 직렬화 가능한 메시지 딕셔너리 (datetime은 문자열로 변환되어 전송)
         """
-        if workflow_id in self.active_connections:
-            for connection in self.active_connections[workflow_id]:
-                await connection.send_json(message)
+        if workflow_id not in self.active_connections:
+            return
+
+        connections = self.active_connections[workflow_id]
+        if self.event_cursors:
+            connections = [c for c in connections if c not in self.event_cursors]
+        else:
+            connections = list(connections)
+
+        status_only_message = None
+        # (상태만 여부, 인코딩) -> 직렬화된 메시지
+        payloads: Dict[tuple, str | bytes] = {}
+
+        def payload_for(connection: WebSocket, encoding: str) -> str | bytes:
+            nonlocal status_only_message
+            status_only = connection in self.status_only
+            payload = payloads.get((status_only, encoding))
+            if payload is None:
+                variant = message
+                if status_only:
+                    if status_only_message is None:
+                        status_only_message = {
+                            **message,
+                            "data": without_agent_responses(message.get("data")),
+                        }
+                    variant = status_only_message
+                payload = payloads[(status_only, encoding)] = encode_ws_message(
+                    variant, encoding
+                )
+            return payload
+
+        await self._deliver(workflow_id, connections, payload_for)
+        self._count_bytes(payloads)
+
+    async def broadcast_events(self, workflow_id: str, events: list[dict]):
+        """
+        이벤트 구독(since) 연결마다 아직 보내지 않은 이벤트만 전송.
+        같은 cursor와 인코딩을 가진 연결은 직렬화된 메시지를 공유합니다.
+
+        Args:
+            workflow_id: 워크플로우 식별자
+            events: seq 순으로 정렬된 이벤트 목록 (가장 작은 cursor 이후의 이벤트)
+        """
+        connections = [
+            connection
+            for connection in self.active_connections.get(workflow_id, [])
+            if connection in self.event_cursors
+        ]
+        if not connections or not events:
+            return
+
+        # (cursor, 인코딩) -> 직렬화된 메시지
+        payloads: Dict[tuple, str | bytes] = {}
+
+        def payload_for(connection: WebSocket, encoding: str) -> str | bytes | None:
+            cursor = self.event_cursors.get(connection)
+            if cursor is None:
+                return None
+            # 빠진 seq가 있으면 그 앞까지만 보내고 cursor를 멈춤 (다음 방송에서 이어서 전송)
+            pending = contiguous_events(events, cursor)
+            if not pending:
+                return None
+            # 전송을 기다리는 동안 다른 방송이 같은 이벤트를 다시 보내지 않도록 cursor를 먼저 옮김
+            self.event_cursors[connection] = pending[-1]["seq"]
+            payload = payloads.get((cursor, encoding))
+            if payload is None:
+                payload = payloads[(cursor, encoding)] = encode_ws_message(
+                    {"type": "events", "seq": pending[-1]["seq"], "events": pending},
+                    encoding,
+                )
+            return payload
+
+        await self._deliver(workflow_id, connections, payload_for)
+        self._count_bytes(payloads)
+
+    async def _deliver(
+        self,
+        workflow_id: str,
+        connections: List[WebSocket],
+        payload_for: Callable[[WebSocket, str], str | bytes | None],
+    ):
+        """
+        연결마다 payload_for(연결, 인코딩)가 반환한 메시지를 전송 (None이면 건너뜀).
+        전송에 실패했거나 WS_SEND_TIMEOUT_SECONDS 안에 보내지 못한 연결은 종료.
+        """
+        sent: Dict[str, int] = {}
+        dead: List[WebSocket] = []
+        loop = asyncio.get_running_loop()
+        index = 0
+        while index < len(connections):
+            try:
+                # 연결마다 타이머를 만들지 않도록 방송 전체에 타이머 하나를 두고,
+                # 전송이 진행되는 동안 마감 시각을 늦춤 (한 연결이 WS_SEND_TIMEOUT_SECONDS 이상 막으면 중단)
+                async with asyncio.timeout(WS_SEND_TIMEOUT_SECONDS) as deadline:
+                    armed_at = loop.time()
+                    while index < len(connections):
+                        connection = connections[index]
+                        encoding = self.encodings.get(connection, "json")
+                        payload = payload_for(connection, encoding)
+                        if payload is not None:
+                            now = loop.time()
+                            if now - armed_at > WS_SEND_TIMEOUT_SECONDS / 2:
+                                deadline.reschedule(now + WS_SEND_TIMEOUT_SECONDS)
+                                armed_at = now
+                            try:
+                                await self._send_payload(connection, payload)
+                                sent[encoding] = sent.get(encoding, 0) + 1
+                            except Exception:
+                                dead.append(connection)
+                        index += 1
+            except TimeoutError:
+                # 현재 연결이 제한 시간 안에 전송을 끝내지 못함
+                dead.append(connections[index])
+                index += 1
+        self.workflow_activity[workflow_id] = time.monotonic()
+
+        # 전송에 실패하거나 시간 내에 보내지 못한 연결은 정리
+        for connection in dead:
+            await self.close_connection(
+                workflow_id,
+                connection,
+                status.WS_1011_INTERNAL_ERROR,
+                "Send failed",
+                "send_failed",
+            )
+
+        for encoding, count in sent.items():
+            _ws_messages_sent.inc(count, encoding=encoding)
+
+    @staticmethod
+    def _count_bytes(payloads: Dict[tuple, str | bytes]):
+        for (_, encoding), payload in payloads.items():
+            size = len(payload) if isinstance(payload, bytes) else len(payload.encode("utf-8"))
+            _ws_bytes_sent.inc(size, encoding=encoding)
+
+    def schedule_close(self, workflow_id: str):
+        """
+        완료/실패한 워크플로우의 연결을 WS_TERMINAL_GRACE_SECONDS 뒤 정상 종료(1000)하도록 예약.
+        이미 예약되어 있으면 무시.
+
+        Args:
+            workflow_id: 워크플로우 식별자
+        """
+        if WS_TERMINAL_GRACE_SECONDS < 0 or workflow_id in self._close_tasks:
+            return
+        task = asyncio.create_task(self._close_after_grace(workflow_id))
+        self._close_tasks[workflow_id] = task
+
+    async def _close_after_grace(self, workflow_id: str):
+        try:
+            await asyncio.sleep(WS_TERMINAL_GRACE_SECONDS)
+            for connection in list(self.active_connections.get(workflow_id, [])):
+                await self.close_connection(
+                    workflow_id,
+                    connection,
+                    status.WS_1000_NORMAL_CLOSURE,
+                    "Workflow finished",
+                    "terminal",
+                )
+        finally:
+            if self._close_tasks.get(workflow_id) is asyncio.current_task():
+                del self._close_tasks[workflow_id]
+
+    async def reap(self):
+        """
+        이미 끊긴 연결과 WS_IDLE_TIMEOUT_SECONDS 동안 송수신이 없던 연결을 정리.
+        (응답이 없는 half-open 연결은 uvicorn의 ping/pong 시간 초과로 끊긴 뒤 여기서 제거됨)
+        """
+        now = time.monotonic()
+        for workflow_id, connections in list(self.active_connections.items()):
+            broadcast_at = self.workflow_activity.get(workflow_id, 0.0)
+            for connection in list(connections):
+                if WebSocketState.DISCONNECTED in (
+                    connection.client_state,
+                    connection.application_state,
+                ):
+                    self.disconnect(workflow_id, connection)
+                    _ws_closed.inc(reason="dead")
+                elif (
+                    WS_IDLE_TIMEOUT_SECONDS > 0
+                    and now - max(self.last_activity.get(connection, now), broadcast_at)
+                    > WS_IDLE_TIMEOUT_SECONDS
+                ):
+                    await self.close_connection(
+                        workflow_id,
+                        connection,
+                        status.WS_1000_NORMAL_CLOSURE,
+                        "Idle timeout",
+                        "idle",
+                    )
+
+    async def close_all(self, reason: str):
+        """
+        모든 WebSocket 연결에 재연결 안내 메시지를 보낸 뒤
+        1012(Service Restart) 코드로 연결을 종료합니다.
+
+        Args:
+            reason: 종료 사유 (close frame reason 및 안내 메시지에 포함)
+        """
+        hint = {
+            "type": "reconnect",
+            "reason": reason,
+            "retry_after_ms": RECONNECT_AFTER_MS,
+        }
+        for task in list(self._close_tasks.values()):
+            task.cancel()
+        self._close_tasks.clear()
+        for workflow_id, connections in list(self.active_connections.items()):
+            for connection in list(connections):
+                self.disconnect(workflow_id, connection)
+                try:
+                    await self.send(connection, hint)
+                    await connection.close(
+                        code=status.WS_1012_SERVICE_RESTART, reason=reason
+                    )
+                except Exception:
+                    # 이미 끊긴 연결은 무시
+                    pass
 
 
 manager = ConnectionManager()
@@ -100,18 +662,32 @@ async def websocket_endpoint(
     websocket: WebSocket,
     workflow_id: str,
     auth_token: str = Query(...),  # auth_token 쿼리 파라미터 필수
-):
+    include_responses: bool = True,
+    encoding: str = "json",
+    since: int | None = None,
+    cancel_on_disconnect: bool = False,
+) -> bool:
     """
     WebSocket 엔드포인트 처리 함수입니다.
     - auth_token을 검증하여 사용자 권한 확인
     - 권한이 없으면 연결 종료
-    - 권한이 있으면 연결 수락 및 유지
+    - 연결 수 제한(전체/사용자별)을 넘으면 1013(Try Again Later)으로 종료
+    - 권한이 있으면 연결 수락 및 유지 (클라이언트가 "ping" 텍스트를 보내면 {"type": "pong"} 응답)
     - 연결 종료 시 연결 해제 처리
+    - cancel_on_disconnect로 연결한 클라이언트가 직접 끊었고 이 워커에 남은 구독자가 없으면 True 반환
+      (서버가 종료한 연결은 제외 - 호출자가 워크플로우를 취소)
 
     Args:
         websocket: WebSocket 연결 객체
         workflow_id: URL 경로의 워크플로우 ID
         auth_token: 쿼리 파라미터로 전달된 인증 토큰
+        include_responses: False이면 agent 응답 본문 없이 상태만 전송
+        encoding: 메시지 인코딩 ("json" 또는 "msgpack")
+        since: 마지막으로 받은 이벤트 seq - 주어지면 놓친 이벤트만 재전송한 뒤 새 이벤트를 전송
+        cancel_on_disconnect: 마지막 구독자로서 연결을 끊으면 워크플로우를 취소할지 여부
+
+    Returns:
+        bool: 구독자가 모두 떠나 워크플로우를 취소해야 하면 True
     """
     # 1) 토큰 검증 -> user_id 반환 또는 None
     user_id = await verify_auth_token(auth_token)
@@ -119,23 +695,53 @@ async def websocket_endpoint(
         await websocket.close(
             code=status.WS_1008_POLICY_VIOLATION
         )  # 4008: Policy Violation
-        return
+        return False
 
     # 2) 권한 체크: workflow_id가 user_id 소유인지 확인
     allowed = await check_workflow_belongs_to_user(workflow_id, user_id)
     if not allowed:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)  # 권한 없으면 종료
-        return
+        return False
 
-    # 3) 연결 허용 및 WebSocket 관리
-    await manager.connect(workflow_id, websocket)
+    # 3) 연결 수 제한 확인 및 자리 예약 (accept 대기 중에 다른 연결이 제한을 넘지 않도록)
+    reason = manager.reserve_slot(user_id)
+    if reason:
+        _ws_rejected.inc(reason=reason)
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return False
 
+    # 4) 연결 허용 및 WebSocket 관리
+    bind_workflow_context(workflow_id)
+    client_left = False
     try:
+        await manager.connect(
+            workflow_id,
+            websocket,
+            include_responses,
+            encoding,
+            user_id,
+            since,
+            cancel_on_disconnect,
+        )
         while True:
-            # 클라이언트 메시지 수신(필요 시 처리)
-            await websocket.receive_text()
+            # 클라이언트 메시지 수신 - 수신 시각을 기록하고, 애플리케이션 수준 ping에 응답
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                client_left = True
+                break
+            manager.touch(websocket)
+            if message.get("text") == "ping":
+                await manager.send(websocket, {"type": "pong"})
     except WebSocketDisconnect:
+        client_left = True
+    except RuntimeError:
+        # 서버가 먼저 close한 연결 (종료 절차, 유휴/완료 연결 정리)
+        pass
+    finally:
+        # 서버가 종료한 연결은 close 전에 목록에서 제거되므로 취소 대상에서 빠짐
+        abandoned = client_left and websocket in manager.cancel_on_disconnect
         manager.disconnect(workflow_id, websocket)
+    return abandoned and workflow_id not in manager.active_connections
 
 
 # WebSocket 상태 변경 알림용 함수
@@ -147,6 +753,174 @@ async def notify_workflow_update(workflow_id: str):
     Args:
         workflow_id: 워크플로우 식별자
     """
-    latest_status = await get_full_workflow_status_join(workflow_id)
-    latest_status = convert_datetime_to_str(latest_status)
-    await manager.broadcast(workflow_id, {"type": "update", "data": latest_status})
+    await _publish_local_update(workflow_id)
+    # 다른 워커/인스턴스에 연결된 구독자에게도 전달
+    await publish_relay(WORKFLOW_UPDATE_CHANNEL, workflow_id)
+
+
+async def publish_relay(channel: str, workflow_id: str):
+    """
+    다른 워커/인스턴스에 workflow_id를 NOTIFY로 전달 (WORKFLOW_UPDATE_RELAY가 꺼져 있으면 무시).
+    자기 자신에게 돌아온 알림은 수신 측에서 무시.
+
+    Args:
+        channel: NOTIFY 채널 (register_relay_handler로 등록한 채널)
+        workflow_id: 워크플로우 식별자
+    """
+    if not WORKFLOW_UPDATE_RELAY:
+        return
+    try:
+        pool = await connect_db()
+        await pool.execute(
+            "SELECT pg_notify($1, $2)", channel, f"{_INSTANCE_ID}:{workflow_id}"
+        )
+    except Exception as e:
+        logger.error(f"workflow relay error ({channel}): {e}")
+
+
+def register_relay_handler(channel: str, handler: Callable[[str], Awaitable]):
+    """
+    다른 워커가 channel로 보낸 알림을 처리할 코루틴 함수를 등록.
+    수신 루프를 시작(start_update_relay)하기 전에 등록해야 함.
+
+    Args:
+        channel: NOTIFY 채널
+        handler: workflow_id를 받아 실행할 코루틴 함수
+    """
+    _relay_handlers[channel] = handler
+
+
+async def _publish_local_update(workflow_id: str):
+    """
+    이 프로세스의 상태 버전을 갱신하고, 이 프로세스에 연결된 구독자에게 최신 상태를 방송.
+    """
+    # 이후 이 워크플로우 조회는 잠시 primary에서 수행 (복제본이 아직 반영하지 못했을 수 있음)
+    note_workflow_write(workflow_id)
+    # REST 상태 조회의 ETag 갱신 및 롱폴링 대기 요청 깨우기
+    state_tracker.bump(workflow_id)
+
+    # 구독자가 없으면 상태 조회 자체를 생략
+    if workflow_id not in manager.active_connections:
+        return
+
+    terminal = False
+    # 이벤트 구독 연결에는 가장 뒤처진 연결의 cursor 이후 이벤트를 한 번만 조회하여 전송
+    since = manager.min_event_cursor(workflow_id)
+    if since is not None:
+        events = contiguous_events(await get_workflow_events(workflow_id, since), since)
+        await manager.broadcast_events(workflow_id, events)
+        terminal = has_terminal_event(events)
+
+    if manager.needs_snapshot(workflow_id):
+        seq = await get_latest_event_seq(workflow_id)
+        # 모든 구독자가 상태만 원하면 응답 본문(jsonb) 없이 조회
+        latest_status = await get_full_workflow_status_join(
+            workflow_id, include_responses=manager.needs_responses(workflow_id)
+        )
+        await manager.broadcast(
+            workflow_id, {"type": "update", "seq": seq, "data": latest_status}
+        )
+        terminal = terminal or is_terminal_status(latest_status)
+
+    if terminal:
+        manager.schedule_close(workflow_id)
+
+
+# NOTIFY 채널 -> 다른 워커가 보낸 알림을 처리하는 코루틴 함수
+_relay_handlers: Dict[str, Callable[[str], Awaitable]] = {
+    WORKFLOW_UPDATE_CHANNEL: _publish_local_update,
+}
+
+
+def _relay_handler_done(task: asyncio.Task):
+    _relay_handler_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"workflow update relay handler error: {task.exception()!r}")
+
+
+def _on_relay_notification(connection, pid, channel, payload: str):
+    instance_id, _, workflow_id = payload.partition(":")
+    if instance_id == _INSTANCE_ID:
+        return
+    task = asyncio.get_running_loop().create_task(_relay_handlers[channel](workflow_id))
+    _relay_handler_tasks.add(task)
+    task.add_done_callback(_relay_handler_done)
+
+
+async def _relay_loop():
+    """
+    다른 워커가 보낸 상태 변경/취소 등의 NOTIFY를 수신하는 루프. 연결이 끊기면 재연결.
+    """
+    while True:
+        connection = None
+        try:
+            connection = await create_listener_connection()
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _: closed.set())
+            for channel in _relay_handlers:
+                await connection.add_listener(channel, _on_relay_notification)
+            await closed.wait()
+        except asyncio.CancelledError:
+            if connection is not None:
+                await connection.close()
+            raise
+        except Exception as e:
+            logger.error(f"workflow update listener error: {e}")
+        await asyncio.sleep(1)
+
+
+def start_update_relay():
+    """
+    워커 간 상태 변경 전달 수신 루프를 시작 (WORKFLOW_UPDATE_RELAY가 꺼져 있으면 무시).
+    """
+    global _relay_task
+    if WORKFLOW_UPDATE_RELAY and (_relay_task is None or _relay_task.done()):
+        _relay_task = asyncio.create_task(_relay_loop())
+
+
+async def stop_update_relay():
+    """
+    워커 간 상태 변경 전달 수신 루프를 종료.
+    """
+    global _relay_task
+    if _relay_task is not None:
+        _relay_task.cancel()
+        await asyncio.gather(_relay_task, return_exceptions=True)
+        _relay_task = None
+    # 아직 처리 중인 알림 작업도 정리
+    handler_tasks = list(_relay_handler_tasks)
+    for task in handler_tasks:
+        task.cancel()
+    await asyncio.gather(*handler_tasks, return_exceptions=True)
+
+
+async def _reaper_loop():
+    """
+    WS_REAP_INTERVAL_SECONDS 간격으로 끊긴 연결과 유휴 연결을 정리하는 루프.
+    """
+    while True:
+        await asyncio.sleep(WS_REAP_INTERVAL_SECONDS)
+        try:
+            await manager.reap()
+        except Exception as e:
+            logger.error(f"websocket reaper error: {e}")
+
+
+def start_connection_reaper():
+    """
+    WebSocket 연결 정리 루프를 시작. 이미 실행 중이면 무시.
+    """
+    global _reaper_task
+    if _reaper_task is None or _reaper_task.done():
+        _reaper_task = asyncio.create_task(_reaper_loop())
+
+
+async def stop_connection_reaper():
+    """
+    WebSocket 연결 정리 루프를 종료.
+    """
+    global _reaper_task
+    if _reaper_task is not None:
+        _reaper_task.cancel()
+        await asyncio.gather(_reaper_task, return_exceptions=True)
+        _reaper_task = None
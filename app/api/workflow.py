@@ -1,15 +1,47 @@
 import asyncio
+import json
+import logging
+import time
 import uuid
 from datetime import datetime, timezone
 
+from fastapi import HTTPException
+
 from app.agents.budget_manager import BudgetManagerAgent
 from app.agents.data_collector import DataCollectorAgent
 from app.agents.itinerary_builder import ItineraryBuilderAgent
 from app.agents.report_generator import ReportGeneratorAgent
-from app.db.database import connect_db
+from app.agents.scheduler import workflow_scheduler
+from app.api.status import authorize_workflow_access
+from app.api.usage import check_user_quota
+from app.api.websocket import (
+    notify_workflow_update,
+    publish_relay,
+    register_relay_handler,
+)
+from app.db.database import AGENT_TABLES, connect_db, note_workflow_write
+from app.monitoring.metrics import registry
+
+# 다른 워커에서 실행 중인 워크플로우 취소를 전달하는 NOTIFY 채널
+WORKFLOW_CANCEL_CHANNEL = "workflow_cancel"
+
+logger = logging.getLogger(__name__)
+
+_cancelled_total = registry.counter(
+    "workflow_cancelled_total",
+    "Workflows cancelled before finishing (reason=api|disconnect)",
+    ("reason",),
+)
 
+# 이 프로세스에서 실행 중인 워크플로우 (workflow_id -> 에이전트 실행 태스크)
+_running_workflows: dict[str, asyncio.Task] = {}
+# 종료 절차가 시작되면 False로 바뀌어 새 워크플로우를 받지 않음
+_accepting_workflows = True
+# 종료 절차를 시작한 시각 (time.monotonic) - 요청 대기와 워크플로우 대기가 같은 종료 대기 시간을 나눠 씀
+_shutdown_started_at: float | None = None
 
-async def _run_agents_in_background(workflow_id: str) -> list | None:
+
+async def _run_agents_in_background(workflow_id: str, created_at: datetime) -> list | None:
     """
     주어진 workflow_id로 여러 Agent를 순차 및 병렬로 실행하는 비동기 함수.
 
@@ -22,6 +54,7 @@ async def _run_agents_in_background(workflow_id: str) -> list | None:
 
     Args:
         workflow_id (str): 실행할 워크플로우의 고유 ID
+        created_at (datetime): 워크플로우 생성 일시 (파티션 키)
 
     Returns:
         list[dict] | None: 각 Agent 실행 결과 리스트 혹은 DataCollectorAgent 실패 시 None 반환
@@ -31,7 +64,7 @@ async def _run_agents_in_background(workflow_id: str) -> list | None:
     """
     results = []
 
-    dc_agent = DataCollectorAgent(workflow_id)
+    dc_agent = DataCollectorAgent(workflow_id, created_at)
     try:
         dc_result = await dc_agent.run()
         results.append(
@@ -44,8 +77,29 @@ async def _run_agents_in_background(workflow_id: str) -> list | None:
         # 실패 시 이후 단계 건너뛰기
         return
 
-    bm_agent = BudgetManagerAgent(workflow_id)
-    ib_agent = ItineraryBuilderAgent(workflow_id)
+    results += await run_agent_branch(workflow_id, created_at)
+
+
+async def run_agent_branch(
+    workflow_id: str, created_at: datetime, scenario: dict | None = None
+) -> list[dict]:
+    """
+    데이터 수집 이후 단계를 실행.
+    BudgetManagerAgent와 ItineraryBuilderAgent를 병렬 실행한 뒤 ReportGeneratorAgent 실행.
+    시나리오 워크플로우는 부모 워크플로우가 수집한 데이터로 이 단계만 실행.
+
+    Args:
+        workflow_id (str): 실행할 워크플로우의 고유 ID
+        created_at (datetime): 워크플로우 생성 일시 (파티션 키)
+        scenario (dict | None): 시나리오 파라미터 (일반 워크플로우는 None)
+
+    Returns:
+        list[dict]: 각 Agent 실행 결과 리스트
+    """
+    results = []
+
+    bm_agent = BudgetManagerAgent(workflow_id, created_at, scenario)
+    ib_agent = ItineraryBuilderAgent(workflow_id, created_at, scenario)
     agent_tasks = [bm_agent.run(), ib_agent.run()]
     parallel_results = await asyncio.gather(*agent_tasks, return_exceptions=True)
 
@@ -63,7 +117,7 @@ async def _run_agents_in_background(workflow_id: str) -> list | None:
                 {"agent": agent.__class__.__name__, "status": "success", "result": res}
             )
 
-    rg_agent = ReportGeneratorAgent(workflow_id)
+    rg_agent = ReportGeneratorAgent(workflow_id, created_at, scenario)
     try:
         rg_result = await rg_agent.run()
         results.append(
@@ -73,41 +127,288 @@ async def _run_agents_in_background(workflow_id: str) -> list | None:
         results.append(
             {"agent": "ReportGeneratorAgent", "status": "error", "error": str(e)}
         )
+    return results
+
+
+async def run_workflow(
+    user_name: str, priority: str = "standard", execution_mode: str = "online"
+):
+    """
+    워크플로우와 agent 행을 생성하고, 에이전트 실행을 스케줄러 대기열에 넣은 뒤 바로 반환.
+    실제 실행 시점은 사용자별 가중 공정 큐(WorkflowScheduler)가 결정.
+    offline 워크플로우는 pending 상태로만 저장하고, 오프라인 배치 실행기(app.agents.batch)가 일괄 처리.
 
+    Args:
+        user_name (str): 워크플로우를 요청한 사용자 이름
+        priority (str): 우선순위 클래스 ("interactive", "standard", "batch")
+        execution_mode (str): "online"(즉시 실행) 또는 "offline"(배치 API로 일괄 실행)
+
+    Returns:
+        dict: {"workflow_id": ...}
+
+    Raises:
+        HTTPException: 종료 중이면 503, 사용량 쿼터를 초과했으면 429
+    """
+    if not _accepting_workflows:
+        # 종료 중인 인스턴스 - 클라이언트가 다른 인스턴스로 재시도하도록 503 반환
+        raise HTTPException(
+            status_code=503,
+            detail="Server is shutting down",
+            headers={"Retry-After": "1"},
+        )
 
-async def run_workflow(user_name: str):
     pool = await connect_db()
 
     async with pool.acquire() as conn:
         async with conn.transaction():
-            user = await conn.fetchrow(
-                "SELECT user_id FROM users WHERE name = $1", user_name
-            )
-            if not user:
-                raise ValueError(f"User '{user_name}' not found")
-            user_id = user["user_id"]
+            # 현재 기간 사용량이 쿼터를 넘었으면 429
+            user_id = await check_user_quota(conn, user_name)
 
             workflow_id = str(uuid.uuid4())
-            await conn.execute(
-                "INSERT INTO workflow (workflow_id, user_id, started_at) VALUES ($1, $2, $3)",
+            offline = execution_mode == "offline"
+            created_at = await conn.fetchval(
+                """
+                INSERT INTO workflow (workflow_id, user_id, started_at, status, execution_mode)
+                VALUES ($1, $2, $3, $4, $5) RETURNING created_at
+                """,
                 workflow_id,
                 user_id,
-                datetime.now(timezone.utc),
+                None if offline else datetime.now(timezone.utc),
+                "pending" if offline else "running",
+                execution_mode,
             )
 
-            agents = [
-                "data_collector",
-                "itinerary_builder",
-                "budget_manager",
-                "report_generator",
-            ]
-            for agent in agents:
+            # agent 행은 workflow와 같은 created_at으로 저장하여 같은 월 파티션에 위치시킴
+            for agent in AGENT_TABLES:
                 await conn.execute(
-                    f"INSERT INTO {agent} (workflow_id) VALUES ($1)", workflow_id
+                    f"INSERT INTO {agent} (workflow_id, created_at) VALUES ($1, $2)",
+                    workflow_id,
+                    created_at,
                 )
 
-    # 백그라운드에서 에이전트 실행 시작 (비동기 태스크로 띄움)
-    asyncio.create_task(_run_agents_in_background(workflow_id))
+    # 생성 직후의 상태/소유권 조회가 아직 복제되지 않은 복제본으로 가지 않도록 함
+    note_workflow_write(workflow_id)
+
+    if offline:
+        # 배치 실행기가 가져갈 때까지 pending 상태로 대기
+        return {"workflow_id": workflow_id}
+
+    # 백그라운드에서 스케줄러 차례를 기다린 뒤 에이전트 실행 (비동기 태스크로 띄움)
+    task = asyncio.create_task(
+        workflow_scheduler.run(
+            user_id, priority, lambda: _run_agents_in_background(workflow_id, created_at)
+        )
+    )
+    track_workflow_task(workflow_id, task)
 
     # 바로 workflow_id만 반환
     return {"workflow_id": workflow_id}
+
+
+def track_workflow_task(workflow_id: str, task: asyncio.Task):
+    """
+    이 프로세스에서 실행하는 워크플로우 태스크를 등록 (취소 및 종료 대기 대상).
+    태스크가 끝나면 자동으로 제거.
+    """
+    _running_workflows[workflow_id] = task
+    task.add_done_callback(lambda _: _running_workflows.pop(workflow_id, None))
+
+
+def is_accepting_workflows() -> bool:
+    """
+    새 워크플로우를 받을 수 있는 상태인지 반환 (종료 절차가 시작되면 False).
+    """
+    return _accepting_workflows
+
+
+def stop_accepting_workflows():
+    """
+    종료 절차 시작 시 호출. 이후 들어오는 워크플로우 시작 요청은 503으로 거절.
+    처음 호출된 시각부터 종료 대기 시간을 계산.
+    """
+    global _accepting_workflows, _shutdown_started_at
+    _accepting_workflows = False
+    if _shutdown_started_at is None:
+        _shutdown_started_at = time.monotonic()
+
+
+# 워크플로우와 (시나리오 묶음이면) 하위 시나리오 워크플로우 중 미완료 워크플로우의 상태를 바꾸는 쿼리
+# 하위 시나리오는 부모와 같은 created_at으로 저장되므로 $4 created_at으로 한 월 파티션만 조회
+_FINISH_FAMILY_SQL = """
+    UPDATE workflow SET status = $1::status_enum, ended_at = $2
+    WHERE (workflow_id = $3 OR parent_workflow_id = $3) AND created_at = $4
+      AND status IN ('pending', 'running')
+    RETURNING workflow_id::text
+"""
+_WORKFLOW_CREATED_AT_SQL = "SELECT created_at FROM workflow WHERE workflow_id = $1"
+
+
+async def finish_workflow_family(
+    workflow_id: str, status: str, error: str, created_at: datetime | None = None
+) -> list[str]:
+    """
+    미완료(pending/running) 워크플로우와 하위 시나리오 워크플로우, 그 pending/running agent를
+    status로 기록 (하위 시나리오가 부모의 데이터 수집을 기다리는 중에도 함께 정리).
+
+    Args:
+        workflow_id (str): 워크플로우(또는 시나리오 묶음의 부모) ID
+        status (str): 기록할 상태 ('failed' 또는 'cancelled')
+        error (str): agent 응답으로 남길 오류 메시지
+        created_at (datetime | None): 워크플로우 생성 일시 (파티션 키, 모르면 먼저 조회)
+
+    Returns:
+        list[str]: 상태를 바꾼 워크플로우 ID 목록 (이미 끝난 워크플로우면 빈 목록)
+    """
+    now = datetime.now(timezone.utc)
+    response = json.dumps({"error": error})
+    pool = await connect_db()
+    async with pool.acquire() as conn:
+        if created_at is None:
+            created_at = await conn.fetchval(_WORKFLOW_CREATED_AT_SQL, workflow_id)
+            if created_at is None:
+                return []
+        async with conn.transaction():
+            workflow_ids = [
+                row[0]
+                for row in await conn.fetch(
+                    _FINISH_FAMILY_SQL, status, now, workflow_id, created_at
+                )
+            ]
+            if not workflow_ids:
+                return []
+            for agent in AGENT_TABLES:
+                await conn.execute(
+                    f"""
+                    UPDATE {agent}
+                    SET status = $1, response = $2, ended_at = $3
+                    WHERE workflow_id = ANY($4::uuid[]) AND created_at = $5
+                      AND status IN ('pending', 'running')
+                    """,
+                    status,
+                    response,
+                    now,
+                    # 워크플로우가 이미 끝났어도(예: 데이터 수집 실패) 남은 agent는 함께 정리
+                    [workflow_id, *workflow_ids],
+                    created_at,
+                )
+    return workflow_ids
+
+
+async def _mark_workflow_interrupted(workflow_id: str):
+    """
+    종료 대기 시간 내에 끝나지 않은 워크플로우(하위 시나리오 포함)의 미완료 agent와 워크플로우를 failed로 기록.
+    """
+    for interrupted_id in await finish_workflow_family(
+        workflow_id, "failed", "Interrupted by server shutdown"
+    ):
+        await notify_workflow_update(interrupted_id)
+
+
+async def _cancel_local_task(workflow_id: str) -> bool:
+    """
+    이 프로세스에서 실행(또는 스케줄러 대기) 중인 워크플로우 태스크를 취소하고 끝날 때까지 대기.
+    태스크가 취소되면 진행 중인 LLM 스트림이 닫히고 스케줄러 슬롯과 DB 커넥션이 반환됨.
+
+    Returns:
+        bool: 이 프로세스에서 실행 중이던 워크플로우면 True
+    """
+    task = _running_workflows.get(workflow_id)
+    if task is None:
+        return False
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    return True
+
+
+async def cancel_workflow(workflow_id: str, reason: str = "api") -> bool:
+    """
+    미완료 워크플로우를 취소.
+    - 워크플로우와 pending/running agent를 cancelled로 기록
+      (시나리오 묶음의 부모 워크플로우면 미완료 하위 시나리오도 함께 취소)
+    - 이 프로세스에서 실행 중이면 태스크를 취소하고, 아니면 다른 워커에 취소를 전달
+    - 구독자에게 상태 변경을 알림
+
+    Args:
+        workflow_id (str): 취소할 워크플로우 ID
+        reason (str): 취소 사유 (메트릭 라벨 - "api" 또는 "disconnect")
+
+    Returns:
+        bool: 취소했으면 True, 이미 완료/실패/취소된 워크플로우면 False
+    """
+    # 취소 상태를 먼저 기록하여, 태스크가 멈추기 전에 끝난 agent의 결과가 덮어쓰지 않도록 함
+    cancelled_ids = await finish_workflow_family(workflow_id, "cancelled", "Workflow cancelled")
+    if workflow_id not in cancelled_ids:
+        return False
+    # 부모 워크플로우의 태스크가 취소되면 실행 중인 하위 시나리오 태스크도 함께 취소됨
+    if not await _cancel_local_task(workflow_id):
+        await publish_relay(WORKFLOW_CANCEL_CHANNEL, workflow_id)
+    _cancelled_total.inc(reason=reason)
+    logger.info(f"워크플로우 취소 ({reason}): {workflow_id}")
+    for cancelled_id in cancelled_ids:
+        await notify_workflow_update(cancelled_id)
+    return True
+
+
+async def cancel_workflow_request(workflow_id: str, auth_token: str) -> dict:
+    """
+    POST /workflow/{workflow_id}/cancel 처리 - 소유자 확인 후 워크플로우 취소.
+
+    Args:
+        workflow_id (str): 취소할 워크플로우 ID
+        auth_token (str): 인증 토큰
+
+    Returns:
+        dict: {"workflow_id": ..., "status": "cancelled"}
+
+    Raises:
+        HTTPException: 인증 실패 401, 소유 워크플로우가 아니면 404, 이미 끝난 워크플로우면 409
+    """
+    await authorize_workflow_access(workflow_id, auth_token)
+    if not await cancel_workflow(workflow_id):
+        raise HTTPException(status_code=409, detail="Workflow already finished")
+    return {"workflow_id": workflow_id, "status": "cancelled"}
+
+
+async def _on_remote_cancel(workflow_id: str):
+    # 다른 워커가 취소 상태를 기록한 워크플로우 - 이 프로세스의 태스크만 멈춤
+    await _cancel_local_task(workflow_id)
+
+
+register_relay_handler(WORKFLOW_CANCEL_CHANNEL, _on_remote_cancel)
+
+
+async def drain_running_workflows(timeout: float):
+    """
+    실행 중인 워크플로우가 끝나기를 종료 절차 시작(stop_accepting_workflows)부터 최대 timeout초까지 대기.
+    처리 중인 요청을 기다리는 동안(uvicorn graceful shutdown)에도 워크플로우는 계속 실행되므로,
+    그 시간을 뺀 나머지만 기다림 (전체 종료 시간이 timeout을 넘지 않음).
+    시간 내에 끝나지 않은 워크플로우는 취소하고 failed로 기록하여
+    running 상태로 남지 않도록 함.
+
+    Args:
+        timeout (float): 종료 절차 시작부터의 최대 대기 시간(초)
+    """
+    stop_accepting_workflows()
+    if not _running_workflows:
+        return
+
+    remaining = max(0.0, timeout - (time.monotonic() - _shutdown_started_at))
+    logger.info(
+        f"실행 중인 워크플로우 {len(_running_workflows)}개 종료 대기 (최대 {remaining:.1f}초)"
+    )
+    _, pending = await asyncio.wait(list(_running_workflows.values()), timeout=remaining)
+
+    interrupted = [
+        workflow_id for workflow_id, task in _running_workflows.items() if task in pending
+    ]
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    for workflow_id in interrupted:
+        try:
+            await _mark_workflow_interrupted(workflow_id)
+        except Exception as e:
+            logger.error(f"워크플로우 중단 기록 실패 ({workflow_id}): {e}")
+    if interrupted:
+        logger.warning(f"종료 대기 시간 초과로 워크플로우 {len(interrupted)}개 중단")
@@ -1,14 +1,104 @@
+import asyncio
+import logging
 import os
+import time
 import uuid
+from datetime import datetime, timezone
 
 import asyncpg
+from cachetools import LRUCache, TTLCache
 from dotenv import load_dotenv
 
+from app.db.utils import LOAD_AGENT_RESPONSE_SQL, decompress_response
+from app.monitoring.metrics import registry
+
 load_dotenv()  # .env 파일 읽기
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# 인증 토큰 검증 결과 캐시 유지 시간(초) - 토큰 변경은 최대 이 시간만큼 늦게 반영됨
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+# 커넥션 풀 크기 - 풀 생성 시 최소 크기만큼 미리 연결하고 자주 쓰는 쿼리를 준비함
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "10"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+# 읽기 전용 복제본 주소 - 지정하면 상태/인증 조회를 복제본 풀로 보냄 (비어 있으면 primary만 사용)
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", "")
+DB_READ_POOL_MIN_SIZE = int(os.getenv("DB_READ_POOL_MIN_SIZE", "5"))
+DB_READ_POOL_MAX_SIZE = int(os.getenv("DB_READ_POOL_MAX_SIZE", "20"))
+# 복제 지연이 이 시간(초)을 넘으면 복제 지연이 해소될 때까지 primary에서 조회
+READ_REPLICA_MAX_LAG_SECONDS = float(os.getenv("READ_REPLICA_MAX_LAG_SECONDS", "2"))
+# 복제본 상태(연결, 복제 지연) 확인 간격(초)
+READ_REPLICA_CHECK_INTERVAL_SECONDS = float(os.getenv("READ_REPLICA_CHECK_INTERVAL_SECONDS", "1"))
+# 워크플로우에 쓰기(상태 변경)가 있은 뒤 이 시간(초) 동안은 해당 워크플로우 조회를 primary로 보냄
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
 
 _pool = None  # 전역 변수
+_read_pool = None  # 복제본 풀 (DATABASE_READ_URL 지정 시)
+_replica_healthy = False
+_replica_monitor_task: asyncio.Task | None = None
+
+logger = logging.getLogger(__name__)
+
+# agent 테이블 이름 목록 (워크플로우 실행 순서와 무관)
+AGENT_TABLES = (
+    "data_collector",
+    "itinerary_builder",
+    "budget_manager",
+    "report_generator",
+)
+# 상태 조인 쿼리에서 사용하는 agent별 컬럼 접두사
+AGENT_PREFIXES = {
+    "dc": "data_collector",
+    "ib": "itinerary_builder",
+    "bm": "budget_manager",
+    "rg": "report_generator",
+}
+
+
+def agent_row_lateral(table: str) -> str:
+    """
+    workflow w 행에 속한 agent 행 하나를 조회하는 LATERAL 서브쿼리.
+    workflow_id로만 조인하면 플래너가 workflow_id 조건을 agent 테이블의 모든 월 파티션에 적용하므로,
+    w.created_at을 파라미터로 받는 서브쿼리(LIMIT 1로 일반 조인으로 펼쳐지지 않도록 함)로 만들어
+    실행 시점에 같은 월 파티션만 조회하도록 함.
+    """
+    return (
+        f"LATERAL (SELECT * FROM {table} a"
+        " WHERE a.workflow_id = w.workflow_id AND a.created_at = w.created_at LIMIT 1)"
+    )
+
+
+# 폴링 요청마다 DB를 조회하지 않도록 인증/소유권 확인 결과를 캐시 (성공한 결과만 저장)
+_auth_token_cache = TTLCache(maxsize=10000, ttl=AUTH_CACHE_TTL)
+_workflow_owner_cache = LRUCache(maxsize=100000)
+# 최근 쓰기가 있었던 워크플로우 (read-your-writes 구간 동안 primary에서 조회)
+_recent_writes = TTLCache(maxsize=100000, ttl=READ_YOUR_WRITES_SECONDS)
+
+# 복제본이 따라잡았으면(수신한 WAL을 모두 재생) 0, 아니면 마지막 재생 트랜잭션 이후 경과 시간
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END::float8
+"""
+
+# 복제본 조회를 primary에서 다시 시도할 오류 (연결 실패/끊김, 복구 충돌로 취소된 쿼리)
+_REPLICA_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.InterfaceError,
+    asyncpg.exceptions.OperatorInterventionError,
+    asyncpg.exceptions.SerializationError,
+)
+
+_db_reads = registry.counter(
+    "db_reads_total", "Routed read queries by target pool (target=replica|primary)", ("target",)
+)
+_replica_lag = registry.gauge("db_replica_lag_seconds", "Replication lag of the read replica")
+_replica_available = registry.gauge(
+    "db_replica_available", "1 if read queries are currently routed to the replica"
+)
 
 
 async def connect_db():
@@ -22,119 +112,360 @@ async def connect_db():
     global _pool  # 이 함수 안에서 전역 변수 _pool을 사용
     if _pool is None:
         _pool = await asyncpg.create_pool(
-            DATABASE_URL
+            DATABASE_URL,
+            min_size=DB_POOL_MIN_SIZE,
+            max_size=max(DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE),
+            init=_warm_connection,
         )  # 전역 변수 _pool에 새 값을 할당
     return _pool
 
 
-async def get_full_workflow_status_join(workflow_id: str):
+async def _warm_connection(conn):
     """
-    주어진 workflow_id에 대해 workflow 및 관련 agent들의 상태와 결과를 조인하여 조회.
+    풀에 새 커넥션이 추가될 때 자주 쓰는 쿼리를 한 번씩 실행하여
+    커넥션별 prepared statement 캐시를 미리 채움 (첫 요청의 파싱/계획 비용 제거).
+    존재하지 않는 ID로 조회하므로 실제 데이터는 읽지 않음.
+    """
+    dummy_id = "00000000-0000-0000-0000-000000000000"
+    dummy_created_at = datetime.fromtimestamp(0, timezone.utc)
+    await conn.fetchrow(STATUS_JOIN_SQL, dummy_id)
+    await conn.fetchrow(STATUS_ONLY_JOIN_SQL, dummy_id)
+    await conn.fetchrow(AUTH_TOKEN_SQL, "")
+    await conn.fetchrow(WORKFLOW_OWNER_SQL, dummy_id, 0)
+    await conn.fetchrow(WORKFLOW_STATUS_SQL, dummy_id)
+    await conn.fetchrow(LATEST_EVENT_SEQ_SQL, dummy_id)
+    await conn.fetch(WORKFLOW_EVENTS_SQL, dummy_id, 0)
+    for table in AGENT_TABLES:
+        await conn.fetchrow(AGENT_RESPONSE_SQL[table], dummy_id)
+        await conn.fetchrow(LOAD_AGENT_RESPONSE_SQL[table], dummy_id, dummy_created_at)
+
+
+async def close_db():
+    """
+    데이터베이스 연결 풀을 종료.
+    """
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def _set_replica_healthy(healthy: bool, reason: str = ""):
+    global _replica_healthy
+    if healthy != _replica_healthy:
+        if healthy:
+            logger.info("읽기 복제본 사용 재개")
+        else:
+            logger.warning(f"읽기 복제본 사용 중단, primary에서 조회: {reason}")
+    _replica_healthy = healthy
+    _replica_available.set(1 if healthy else 0)
+
+
+async def _check_replica():
+    """
+    복제본 풀을 (필요하면) 생성하고 복제 지연을 확인하여 사용 가능 여부를 갱신.
+    """
+    global _read_pool
+    try:
+        if _read_pool is None:
+            _read_pool = await asyncpg.create_pool(
+                DATABASE_READ_URL,
+                min_size=DB_READ_POOL_MIN_SIZE,
+                max_size=max(DB_READ_POOL_MIN_SIZE, DB_READ_POOL_MAX_SIZE),
+                init=_warm_connection,
+            )
+        lag = await asyncio.wait_for(
+            _read_pool.fetchval(REPLICA_LAG_SQL), READ_REPLICA_CHECK_INTERVAL_SECONDS
+        )
+    except Exception as e:
+        _set_replica_healthy(False, f"{type(e).__name__}: {e}")
+        return
+    _replica_lag.set(lag)
+    if lag > READ_REPLICA_MAX_LAG_SECONDS:
+        _set_replica_healthy(False, f"replication lag {lag:.1f}s")
+    else:
+        _set_replica_healthy(True)
+
+
+async def _replica_monitor_loop():
+    while True:
+        await _check_replica()
+        await asyncio.sleep(READ_REPLICA_CHECK_INTERVAL_SECONDS)
+
+
+async def start_replica_monitor():
+    """
+    읽기 복제본 풀을 만들고 상태 확인 루프를 시작 (DATABASE_READ_URL이 없으면 무시).
+    복제본이 없거나 지연되는 동안에는 모든 조회를 primary로 보냄.
+    """
+    global _replica_monitor_task
+    if not DATABASE_READ_URL or _replica_monitor_task is not None:
+        return
+    await _check_replica()
+    _replica_monitor_task = asyncio.create_task(_replica_monitor_loop())
+
+
+async def stop_replica_monitor():
+    """
+    복제본 상태 확인 루프와 복제본 풀을 종료.
+    """
+    global _replica_monitor_task, _read_pool
+    if _replica_monitor_task is not None:
+        _replica_monitor_task.cancel()
+        await asyncio.gather(_replica_monitor_task, return_exceptions=True)
+        _replica_monitor_task = None
+    if _read_pool is not None:
+        await _read_pool.close()
+        _read_pool = None
+    _set_replica_healthy(False)
+
+
+def note_workflow_write(workflow_id: str):
+    """
+    워크플로우에 쓰기(상태 변경)가 있었음을 기록. READ_YOUR_WRITES_SECONDS 동안
+    이 워크플로우의 조회는 복제본 대신 primary로 보내 방금 쓴 내용을 읽도록 보장.
+    """
+    if DATABASE_READ_URL:
+        _recent_writes[workflow_id] = time.monotonic()
+
+
+async def connect_read_db(workflow_id: str | None = None):
+    """
+    읽기 전용 조회에 사용할 풀을 반환. 복제본이 정상이고 해당 워크플로우에 최근 쓰기가 없으면
+    복제본 풀, 아니면 primary 풀.
 
     Args:
-        workflow_id (str): 조회할 워크플로우 ID
+        workflow_id (str | None): 조회 대상 워크플로우 (read-your-writes 확인용)
 
     Returns:
-        dict | None: workflow 기본 정보와 각 agent별 상태 및 결과를 포함하는 딕셔너리,
-                     workflow가 없으면 None 반환
+        asyncpg.Pool: 조회에 사용할 풀
     """
-    async with _pool.acquire() as conn:
-        row = await conn.fetchrow(
-            """
-            SELECT
-              w.*,
-              dc.data_collector_id AS dc_id,
-              dc.status AS dc_status,
-              dc.response AS dc_response,
-              dc.started_at AS dc_started_at,
-              dc.ended_at AS dc_ended_at,
-
-              ib.itinerary_builder_id AS ib_id,
-              ib.status AS ib_status,
-              ib.response AS ib_response,
-              ib.started_at AS ib_started_at,
-              ib.ended_at AS ib_ended_at,
-
-              bm.budget_manager_id AS bm_id,
-              bm.status AS bm_status,
-              bm.response AS bm_response,
-              bm.started_at AS bm_started_at,
-              bm.ended_at AS bm_ended_at,
-
-              rg.report_generator_id AS rg_id,
-              rg.status AS rg_status,
-              rg.response AS rg_response,
-              rg.started_at AS rg_started_at,
-              rg.ended_at AS rg_ended_at
+    if _replica_healthy and _read_pool is not None and workflow_id not in _recent_writes:
+        return _read_pool
+    return await connect_db()
+
+
+async def run_read(func, workflow_id: str | None = None, verify_missing: bool = False):
+    """
+    읽기 전용 조회 함수 func(conn)를 connect_read_db가 고른 풀의 커넥션으로 실행.
+    복제본 조회가 연결 오류 등으로 실패하면 복제본을 사용 중단으로 표시하고 primary에서 다시 실행.
+
+    Args:
+        func: 커넥션을 받아 조회 결과를 반환하는 코루틴 함수
+        workflow_id (str | None): 조회 대상 워크플로우 (read-your-writes 확인용)
+        verify_missing (bool): 복제본 결과가 None이면(아직 복제되지 않은 행일 수 있음) primary에서 확인
+
+    Returns:
+        func의 반환값
+    """
+    pool = await connect_read_db(workflow_id)
+    if pool is _read_pool:
+        try:
+            async with pool.acquire() as conn:
+                result = await func(conn)
+            if result is not None or not verify_missing:
+                _db_reads.inc(target="replica")
+                return result
+        except _REPLICA_ERRORS as e:
+            _set_replica_healthy(False, f"{type(e).__name__}: {e}")
+        pool = await connect_db()
+    _db_reads.inc(target="primary")
+    async with pool.acquire() as conn:
+        return await func(conn)
+
+
+async def _read(
+    method: str, sql: str, *args, workflow_id: str | None = None, verify_missing: bool = False
+):
+    """
+    쿼리 하나를 run_read로 실행 (method: "fetch", "fetchrow", "fetchval").
+    """
+    return await run_read(
+        lambda conn: getattr(conn, method)(sql, *args),
+        workflow_id=workflow_id,
+        verify_missing=verify_missing,
+    )
+
+
+async def create_listener_connection() -> asyncpg.Connection:
+    """
+    LISTEN 전용 커넥션을 생성. 풀의 커넥션을 계속 점유하지 않도록 풀과 별도로 연결.
+
+    Returns:
+        asyncpg.Connection: 새 DB 커넥션
+    """
+    return await asyncpg.connect(DATABASE_URL)
+
+
+# workflow 및 agent 상태 조인 쿼리 템플릿
+_STATUS_JOIN_TEMPLATE = """
+    SELECT
+      w.*,
+      dc.data_collector_id AS dc_id,
+      dc.status AS dc_status,
+      {dc_response} AS dc_response,
+      {dc_codec} AS dc_codec,
+      {dc_body} AS dc_body,
+      dc.started_at AS dc_started_at,
+      dc.ended_at AS dc_ended_at,
+      dc.model AS dc_model,
+
+      ib.itinerary_builder_id AS ib_id,
+      ib.status AS ib_status,
+      {ib_response} AS ib_response,
+      {ib_codec} AS ib_codec,
+      {ib_body} AS ib_body,
+      ib.started_at AS ib_started_at,
+      ib.ended_at AS ib_ended_at,
+      ib.model AS ib_model,
+
+      bm.budget_manager_id AS bm_id,
+      bm.status AS bm_status,
+      {bm_response} AS bm_response,
+      {bm_codec} AS bm_codec,
+      {bm_body} AS bm_body,
+      bm.started_at AS bm_started_at,
+      bm.ended_at AS bm_ended_at,
+      bm.model AS bm_model,
+
+      rg.report_generator_id AS rg_id,
+      rg.status AS rg_status,
+      {rg_response} AS rg_response,
+      {rg_codec} AS rg_codec,
+      {rg_body} AS rg_body,
+      rg.started_at AS rg_started_at,
+      rg.ended_at AS rg_ended_at,
+      rg.model AS rg_model
+
+    FROM workflow w
+    {agent_joins}
+    {content_joins}
+    WHERE w.workflow_id = $1
+"""
 
+# agent 테이블은 workflow와 같은 월 파티션만 조회
+_STATUS_AGENT_JOINS = "\n    ".join(
+    f"LEFT JOIN {agent_row_lateral(table)} {prefix} ON true"
+    for prefix, table in AGENT_PREFIXES.items()
+)
+
+# 전체 응답 본문을 포함하는 조인 쿼리 (별도 저장된 압축 본문도 함께 조회)
+STATUS_JOIN_SQL = _STATUS_JOIN_TEMPLATE.format(
+    agent_joins=_STATUS_AGENT_JOINS,
+    content_joins="\n    ".join(
+        f"LEFT JOIN agent_response_content {prefix}c ON {prefix}c.content_hash = {prefix}.response_ref"
+        for prefix in AGENT_PREFIXES
+    ),
+    **{f"{prefix}_response": f"{prefix}.response" for prefix in AGENT_PREFIXES},
+    **{f"{prefix}_codec": f"{prefix}c.codec" for prefix in AGENT_PREFIXES},
+    **{f"{prefix}_body": f"{prefix}c.body" for prefix in AGENT_PREFIXES},
+)
+# 상태 정보만 필요한 경우 응답 본문(jsonb, 압축 본문)을 읽지 않는 조인 쿼리
+STATUS_ONLY_JOIN_SQL = _STATUS_JOIN_TEMPLATE.format(
+    agent_joins=_STATUS_AGENT_JOINS,
+    content_joins="",
+    **{f"{prefix}_response": "NULL::jsonb" for prefix in AGENT_PREFIXES},
+    **{f"{prefix}_codec": "NULL::varchar" for prefix in AGENT_PREFIXES},
+    **{f"{prefix}_body": "NULL::bytea" for prefix in AGENT_PREFIXES},
+)
+
+AUTH_TOKEN_SQL = "SELECT user_id FROM users WHERE auth_token = $1"
+WORKFLOW_OWNER_SQL = "SELECT 1 FROM workflow WHERE workflow_id = $1 AND user_id = $2"
+WORKFLOW_STATUS_SQL = "SELECT status FROM workflow WHERE workflow_id = $1"
+# 상태 전이 이벤트 로그 조회 쿼리 (workflow_events)
+# 마지막 순번은 workflow.event_seq에서 읽음: 행 잠금 아래에서 커밋 순서대로 증가하므로
+# 아직 커밋되지 않은 이전 순번이 있는데 더 큰 순번이 먼저 보이는 일이 없음 (max(seq)와 달리)
+LATEST_EVENT_SEQ_SQL = "SELECT coalesce(max(event_seq), 0) FROM workflow WHERE workflow_id = $1"
+WORKFLOW_EVENTS_SQL = """
+    SELECT seq, agent, status, created_at AS at
+    FROM workflow_events
+    WHERE workflow_id = $1 AND seq > $2
+    ORDER BY seq
+"""
+# agent 하나의 상태와 응답 조회 쿼리 (workflow의 created_at으로 agent 테이블은 해당 월 파티션만 조회)
+AGENT_RESPONSE_SQL = {
+    table: f"""
+            SELECT a.status, a.response, a.started_at, a.ended_at, a.model, c.codec, c.body
             FROM workflow w
-            LEFT JOIN data_collector dc ON w.workflow_id = dc.workflow_id
-            LEFT JOIN itinerary_builder ib ON w.workflow_id = ib.workflow_id
-            LEFT JOIN budget_manager bm ON w.workflow_id = bm.workflow_id
-            LEFT JOIN report_generator rg ON w.workflow_id = rg.workflow_id
+            CROSS JOIN {agent_row_lateral(table)} a
+            LEFT JOIN agent_response_content c ON c.content_hash = a.response_ref
             WHERE w.workflow_id = $1
-            """,
-            workflow_id,
-        )
+            """
+    for table in AGENT_TABLES
+}
 
-        if not row:
-            return None
 
-        workflow_data = {
-            k: row[k]
-            for k in row.keys()
-            if not k.startswith(("dc_", "ib_", "bm_", "rg_"))
-        }
+def workflow_status_from_row(row) -> dict:
+    """
+    get_full_workflow_status_join 조인 결과 row를
+    workflow 기본 정보와 agent별 상태 딕셔너리로 변환.
 
-        # UUID 필드들 문자열로 변환
-        for k, v in workflow_data.items():
-            if isinstance(v, uuid.UUID):
-                workflow_data[k] = str(v)
-
-        agents = {
-            "data_collector": {
-                "id": str(row["dc_id"]) if row["dc_id"] else None,
-                "status": row["dc_status"],
-                "response": row["dc_response"],
-                "started_at": (
-                    str(row["dc_started_at"]) if row["dc_started_at"] else None
-                ),
-                "ended_at": str(row["dc_ended_at"]) if row["dc_ended_at"] else None,
-            },
-            "itinerary_builder": {
-                "id": str(row["ib_id"]) if row["ib_id"] else None,
-                "status": row["ib_status"],
-                "response": row["ib_response"],
-                "started_at": (
-                    str(row["ib_started_at"]) if row["ib_started_at"] else None
-                ),
-                "ended_at": str(row["ib_ended_at"]) if row["ib_ended_at"] else None,
-            },
-            "budget_manager": {
-                "id": str(row["bm_id"]) if row["bm_id"] else None,
-                "status": row["bm_status"],
-                "response": row["bm_response"],
-                "started_at": (
-                    str(row["bm_started_at"]) if row["bm_started_at"] else None
-                ),
-                "ended_at": str(row["bm_ended_at"]) if row["bm_ended_at"] else None,
-            },
-            "report_generator": {
-                "id": str(row["rg_id"]) if row["rg_id"] else None,
-                "status": row["rg_status"],
-                "response": row["rg_response"],
-                "started_at": (
-                    str(row["rg_started_at"]) if row["rg_started_at"] else None
-                ),
-                "ended_at": str(row["rg_ended_at"]) if row["rg_ended_at"] else None,
-            },
-        }
+    Args:
+        row: workflow 컬럼과 agent별 접두사(dc_, ib_, bm_, rg_) 컬럼을 가진 조회 결과
+
+    Returns:
+        dict: {"workflow": {...}, "agents": {...}} 형태의 딕셔너리
+    """
+    workflow_data = {
+        k: row[k]
+        for k in row.keys()
+        if not k.startswith(("dc_", "ib_", "bm_", "rg_"))
+    }
+
+    # UUID 필드들 문자열로 변환
+    for k, v in workflow_data.items():
+        if isinstance(v, uuid.UUID):
+            workflow_data[k] = str(v)
 
-        return {
-            "workflow": workflow_data,
-            "agents": agents,
+    agents = {}
+    for prefix, agent_table in AGENT_PREFIXES.items():
+        # 별도 저장된 응답은 압축을 해제하여 인라인 응답과 같은 JSON 텍스트로 반환
+        response = row[f"{prefix}_response"]
+        if row[f"{prefix}_body"] is not None:
+            response = decompress_response(row[f"{prefix}_codec"], row[f"{prefix}_body"])
+
+        started_at = row[f"{prefix}_started_at"]
+        ended_at = row[f"{prefix}_ended_at"]
+        agents[agent_table] = {
+            "id": str(row[f"{prefix}_id"]) if row[f"{prefix}_id"] else None,
+            "status": row[f"{prefix}_status"],
+            "response": response,
+            "started_at": str(started_at) if started_at else None,
+            "ended_at": str(ended_at) if ended_at else None,
+            "model": row[f"{prefix}_model"],
         }
 
+    return {
+        "workflow": workflow_data,
+        "agents": agents,
+    }
+
+
+async def get_full_workflow_status_join(
+    workflow_id: str, include_responses: bool = True
+):
+    """
+    주어진 workflow_id에 대해 workflow 및 관련 agent들의 상태와 결과를 조인하여 조회.
+
+    Args:
+        workflow_id (str): 조회할 워크플로우 ID
+        include_responses (bool): False이면 agent 응답 본문을 조회하지 않고 response를 None으로 반환
+
+    Returns:
+        dict | None: workflow 기본 정보와 각 agent별 상태 및 결과를 포함하는 딕셔너리,
+                     workflow가 없으면 None 반환
+    """
+    row = await _read(
+        "fetchrow",
+        STATUS_JOIN_SQL if include_responses else STATUS_ONLY_JOIN_SQL,
+        workflow_id,
+        workflow_id=workflow_id,
+    )
+    if not row:
+        return None
+
+    return workflow_status_from_row(row)
+
 
 async def verify_auth_token(token: str) -> int | None:
     """
@@ -146,14 +477,16 @@ async def verify_auth_token(token: str) -> int | None:
     Returns:
         int | None: 유효한 토큰인 경우 user_id 반환, 그렇지 않으면 None 반환
     """
-    pool = await connect_db()  # connect_db()가 _pool 초기화도 담당
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT user_id FROM users WHERE auth_token = $1", token
-        )
-        if row:
-            return row["user_id"]
-        return None
+    user_id = _auth_token_cache.get(token)
+    if user_id is not None:
+        return user_id
+
+    # 복제본에 없는 토큰은 아직 복제되지 않았을 수 있으므로 primary에서 한 번 더 확인
+    row = await _read("fetchrow", AUTH_TOKEN_SQL, token, verify_missing=True)
+    if row:
+        _auth_token_cache[token] = row["user_id"]
+        return row["user_id"]
+    return None
 
 
 async def check_workflow_belongs_to_user(workflow_id: str, user_id: int) -> bool:
@@ -167,11 +500,89 @@ async def check_workflow_belongs_to_user(workflow_id: str, user_id: int) -> bool
     Returns:
         bool: 소유주이면 True, 아니면 False
     """
-    pool = await connect_db()
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(
-            "SELECT 1 FROM workflow WHERE workflow_id = $1 AND user_id = $2",
-            workflow_id,
-            user_id,
-        )
-        return row is not None
+    # workflow 소유자는 바뀌지 않으므로 확인된 결과는 만료 없이 캐시
+    if _workflow_owner_cache.get(workflow_id) == user_id:
+        return True
+
+    row = await _read(
+        "fetchrow",
+        WORKFLOW_OWNER_SQL,
+        workflow_id,
+        user_id,
+        workflow_id=workflow_id,
+        verify_missing=True,
+    )
+    if row is not None:
+        _workflow_owner_cache[workflow_id] = user_id
+    return row is not None
+
+
+async def get_agent_response(workflow_id: str, agent_table: str) -> dict | None:
+    """
+    특정 agent 하나의 상태와 응답만 조회.
+    전체 상태 조인과 달리 다른 agent의 응답 본문을 읽지 않음.
+
+    Args:
+        workflow_id (str): 워크플로우 ID
+        agent_table (str): agent 테이블명 (AGENT_TABLES 중 하나)
+
+    Returns:
+        dict | None: status, response, started_at, ended_at, model을 담은 딕셔너리,
+                     해당 agent 기록이 없으면 None 반환
+    """
+    if agent_table not in AGENT_TABLES:
+        raise ValueError(f"Unknown agent '{agent_table}'")
+
+    row = await _read(
+        "fetchrow", AGENT_RESPONSE_SQL[agent_table], workflow_id, workflow_id=workflow_id
+    )
+    if not row:
+        return None
+
+    record = dict(row)
+    codec = record.pop("codec")
+    body = record.pop("body")
+    if body is not None:
+        record["response"] = decompress_response(codec, body)
+    return record
+
+
+async def get_workflow_status(workflow_id: str) -> str | None:
+    """
+    workflow 자체의 상태만 조회.
+
+    Args:
+        workflow_id (str): 워크플로우 ID
+
+    Returns:
+        str | None: workflow 상태, workflow가 없으면 None 반환
+    """
+    return await _read("fetchval", WORKFLOW_STATUS_SQL, workflow_id, workflow_id=workflow_id)
+
+
+async def get_latest_event_seq(workflow_id: str) -> int:
+    """
+    워크플로우의 마지막 상태 전이 이벤트 순번(커밋된 workflow.event_seq)을 조회.
+
+    Args:
+        workflow_id (str): 워크플로우 ID
+
+    Returns:
+        int: 마지막 이벤트의 seq (이벤트가 없으면 0)
+    """
+    return await _read("fetchval", LATEST_EVENT_SEQ_SQL, workflow_id, workflow_id=workflow_id)
+
+
+async def get_workflow_events(workflow_id: str, since: int) -> list[dict]:
+    """
+    since 이후에 기록된 상태 전이 이벤트를 순번 순으로 조회.
+
+    Args:
+        workflow_id (str): 워크플로우 ID
+        since (int): 이 seq보다 큰 이벤트만 조회 (클라이언트가 마지막으로 받은 seq)
+
+    Returns:
+        list[dict]: seq, agent(workflow 자체 이벤트는 None), status, at을 담은 이벤트 목록
+    """
+    rows = await _read("fetch", WORKFLOW_EVENTS_SQL, workflow_id, since, workflow_id=workflow_id)
+    return [dict(row) for row in rows]
@@ -0,0 +1,266 @@
+import asyncio
+import gzip
+import logging
+import os
+import re
+from datetime import datetime, timedelta, timezone
+
+from app.db.database import AGENT_TABLES, connect_db
+
+# 보관 기간(일) - 0이면 오래된 파티션을 제거하지 않고 파티션 생성만 수행
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "0"))
+# 보관 기간이 지난 파티션 처리 방식
+# - archive: 압축 CSV 파일로 내보낸 뒤 삭제
+# - detach: 파티션만 분리하여 별도 테이블로 남김 (수동 처리용)
+# - drop: 내보내지 않고 삭제
+RETENTION_ACTION = os.getenv("RETENTION_ACTION", "archive")
+RETENTION_ARCHIVE_DIR = os.getenv("RETENTION_ARCHIVE_DIR", "./archive")
+RETENTION_INTERVAL_SECONDS = float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+# 미리 만들어 둘 미래 파티션 개월 수
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "2"))
+
+# agent 테이블이 workflow를 참조하므로 agent 파티션을 먼저 분리하고 외래키를 제거해야 함
+# (workflow_events는 참조 관계가 없으며 같은 월 단위로 함께 정리)
+PARTITIONED_TABLES = (*AGENT_TABLES, "workflow_events", "workflow")
+# 여러 프로세스가 동시에 파티션 DDL을 실행하지 않도록 하는 advisory lock 키
+_RETENTION_LOCK_KEY = 7_310_031
+
+_PARTITION_NAME = re.compile(r"^workflow_p(\d{4})_(\d{2})$")
+
+logger = logging.getLogger(__name__)
+
+_retention_task: asyncio.Task | None = None
+
+
+def _month_end(year: int, month: int) -> datetime:
+    if month == 12:
+        return datetime(year + 1, 1, 1, tzinfo=timezone.utc)
+    return datetime(year, month + 1, 1, tzinfo=timezone.utc)
+
+
+async def ensure_partitions(conn):
+    """
+    이번 달부터 PARTITION_MONTHS_AHEAD 개월 뒤까지의 파티션이 존재하도록 생성.
+
+    Args:
+        conn: DB 커넥션
+    """
+    for table in PARTITIONED_TABLES:
+        await conn.execute(
+            "SELECT ensure_monthly_partitions($1, current_date, $2)",
+            table,
+            PARTITION_MONTHS_AHEAD + 1,
+        )
+
+
+async def find_expired_months(conn, cutoff: datetime) -> list[str]:
+    """
+    월 범위 전체가 cutoff 이전인 파티션의 월 접미사 목록을 반환.
+    분리(detach)만 되고 삭제되지 않은 테이블도 포함.
+
+    Args:
+        conn: DB 커넥션
+        cutoff (datetime): 이 시각 이전 데이터는 보관 기간이 지난 것으로 판단
+
+    Returns:
+        list[str]: "YYYY_MM" 형태의 월 접미사 목록 (오래된 순)
+    """
+    rows = await conn.fetch(
+        "SELECT relname FROM pg_class WHERE relkind IN ('r', 'p') AND relname LIKE 'workflow\\_p%'"
+    )
+    expired = []
+    for row in rows:
+        match = _PARTITION_NAME.match(row["relname"])
+        if not match:
+            continue
+        year, month = int(match.group(1)), int(match.group(2))
+        if _month_end(year, month) <= cutoff:
+            expired.append(f"{year:04d}_{month:02d}")
+    return sorted(expired)
+
+
+async def _is_attached(conn, table: str, partition: str) -> bool:
+    return await conn.fetchval(
+        """
+        SELECT EXISTS (
+            SELECT 1 FROM pg_inherits
+            WHERE inhparent = to_regclass($1) AND inhrelid = to_regclass($2)
+        )
+        """,
+        table,
+        partition,
+    )
+
+
+async def _copy_to_gzip(conn, path: str, table: str | None = None, query: str | None = None):
+    """
+    테이블 또는 쿼리 결과를 gzip 압축 CSV 파일로 내보냄.
+    압축 및 파일 쓰기는 스레드풀에서 실행하여 이벤트 루프를 막지 않음.
+    """
+    loop = asyncio.get_running_loop()
+    tmp_path = f"{path}.tmp"
+    f = await loop.run_in_executor(None, gzip.open, tmp_path, "wb")
+    try:
+
+        async def write(chunk: bytes):
+            await loop.run_in_executor(None, f.write, chunk)
+
+        if table:
+            await conn.copy_from_table(table, output=write, format="csv", header=True)
+        else:
+            await conn.copy_from_query(query, output=write, format="csv", header=True)
+    finally:
+        await loop.run_in_executor(None, f.close)
+    os.replace(tmp_path, path)
+
+
+async def _drop_workflow_foreign_keys(conn, partition: str):
+    """
+    분리한 agent 파티션에 남은 workflow 참조 외래키를 제거.
+    분리된 파티션은 부모의 외래키를 독립 제약조건으로 유지하므로, 그대로 두면
+    같은 월의 workflow 파티션을 분리할 때 참조 위반으로 실패함.
+    """
+    rows = await conn.fetch(
+        """
+        SELECT conname FROM pg_constraint
+        WHERE conrelid = to_regclass($1) AND contype = 'f'
+          AND confrelid = 'workflow'::regclass AND conparentid = 0
+        """,
+        partition,
+    )
+    for row in rows:
+        await conn.execute(f'ALTER TABLE {partition} DROP CONSTRAINT "{row["conname"]}"')
+
+
+async def archive_month(conn, suffix: str):
+    """
+    한 달치 workflow, agent 및 이벤트 로그 파티션을 분리한 뒤 RETENTION_ACTION에 따라 처리.
+    분리는 한 트랜잭션으로 실행하여 일부 테이블만 분리된 상태가 남지 않도록 하고,
+    내보내기/삭제는 분리된 테이블만 대상으로 하므로 운영 테이블의 잠금을 오래 잡지 않음
+    (실패하면 다음 실행에서 분리된 테이블부터 다시 처리).
+
+    Args:
+        conn: DB 커넥션
+        suffix (str): "YYYY_MM" 형태의 월 접미사
+    """
+    partitions = [(table, f"{table}_p{suffix}") for table in PARTITIONED_TABLES]
+    existing = []
+    async with conn.transaction():
+        for table, partition in partitions:
+            if not await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", partition):
+                continue
+            existing.append(partition)
+            if await _is_attached(conn, table, partition):
+                await conn.execute(f"ALTER TABLE {table} DETACH PARTITION {partition}")
+            if table in AGENT_TABLES:
+                await _drop_workflow_foreign_keys(conn, partition)
+
+    if RETENTION_ACTION == "detach" or not existing:
+        logger.info(f"파티션 분리 완료: {suffix} ({', '.join(existing)})")
+        return
+
+    async with conn.transaction():
+        if RETENTION_ACTION == "archive":
+            os.makedirs(RETENTION_ARCHIVE_DIR, exist_ok=True)
+            agent_partitions = [p for p in existing if not p.startswith("workflow_")]
+            if agent_partitions:
+                # 분리한 agent 행이 참조하는 압축 응답 본문도 함께 보관
+                refs = " UNION ".join(
+                    f"SELECT response_ref FROM {p} WHERE response_ref IS NOT NULL"
+                    for p in agent_partitions
+                )
+                await _copy_to_gzip(
+                    conn,
+                    os.path.join(
+                        RETENTION_ARCHIVE_DIR, f"agent_response_content_p{suffix}.csv.gz"
+                    ),
+                    query=f"SELECT * FROM agent_response_content WHERE content_hash IN ({refs})",
+                )
+            for partition in existing:
+                await _copy_to_gzip(
+                    conn,
+                    os.path.join(RETENTION_ARCHIVE_DIR, f"{partition}.csv.gz"),
+                    table=partition,
+                )
+
+        for partition in existing:
+            await conn.execute(f"DROP TABLE {partition}")
+    logger.info(f"파티션 {RETENTION_ACTION} 완료: {suffix}")
+
+
+async def delete_orphan_contents(conn, cutoff: datetime) -> str:
+    """
+    cutoff 이전에 저장되었고 어떤 agent 행에서도 참조하지 않는 압축 응답 본문을 삭제.
+
+    Args:
+        conn: DB 커넥션
+        cutoff (datetime): 이 시각 이전에 저장된 본문만 대상
+
+    Returns:
+        str: DELETE 실행 결과 상태 문자열
+    """
+    not_referenced = " AND ".join(
+        f"NOT EXISTS (SELECT 1 FROM {table} a WHERE a.response_ref = c.content_hash)"
+        for table in AGENT_TABLES
+    )
+    return await conn.execute(
+        f"DELETE FROM agent_response_content c WHERE c.created_at < $1 AND {not_referenced}",
+        cutoff,
+    )
+
+
+async def run_retention_once():
+    """
+    파티션 생성 및 보관 기간이 지난 파티션 정리를 1회 실행.
+    다른 프로세스가 이미 실행 중이면 건너뜀.
+    """
+    pool = await connect_db()
+    async with pool.acquire() as conn:
+        if not await conn.fetchval(
+            "SELECT pg_try_advisory_lock($1)", _RETENTION_LOCK_KEY
+        ):
+            return
+        try:
+            await ensure_partitions(conn)
+            if RETENTION_DAYS <= 0:
+                return
+
+            cutoff = datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)
+            for suffix in await find_expired_months(conn, cutoff):
+                await archive_month(conn, suffix)
+            if RETENTION_ACTION != "detach":
+                result = await delete_orphan_contents(conn, cutoff)
+                logger.info(f"참조되지 않는 응답 본문 정리: {result}")
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", _RETENTION_LOCK_KEY)
+
+
+async def retention_loop():
+    """
+    RETENTION_INTERVAL_SECONDS 간격으로 run_retention_once를 반복 실행하는 백그라운드 루프.
+    """
+    while True:
+        try:
+            await run_retention_once()
+        except Exception as e:
+            logger.error(f"retention job error: {e}")
+        await asyncio.sleep(RETENTION_INTERVAL_SECONDS)
+
+
+def start_retention_job() -> asyncio.Task:
+    """
+    백그라운드 retention 루프를 시작. 이미 실행 중이면 기존 태스크를 반환.
+
+    Returns:
+        asyncio.Task: retention 루프 태스크
+    """
+    global _retention_task
+    if _retention_task is None or _retention_task.done():
+        _retention_task = asyncio.create_task(retention_loop())
+    return _retention_task
+
+
+if __name__ == "__main__":
+    # 수동 실행 또는 cron 용: python -m app.db.retention
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_retention_once())
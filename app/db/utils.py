@@ -1,13 +1,170 @@
+import functools
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import lz4.frame
+
+# 이 크기(byte)를 넘는 응답은 압축하여 agent_response_content 테이블에 별도 저장
+RESPONSE_INLINE_MAX_BYTES = int(os.getenv("RESPONSE_INLINE_MAX_BYTES", "4096"))
+RESPONSE_CODEC = "lz4"
+
+# agent 테이블별 응답 본문 조회 쿼리 (쿼리 문자열을 고정하여 커넥션별 statement 캐시 재사용)
+# $2 created_at(워크플로우 생성 일시)으로 해당 월 파티션만 조회
+LOAD_AGENT_RESPONSE_SQL = {
+    table: f"""
+        SELECT a.response, c.codec, c.body
+        FROM {table} a
+        LEFT JOIN agent_response_content c ON c.content_hash = a.response_ref
+        WHERE a.workflow_id = $1 AND a.created_at = $2
+        """
+    for table in (
+        "data_collector",
+        "itinerary_builder",
+        "budget_manager",
+        "report_generator",
+    )
+}
+
+
+def compress_response(data: bytes) -> tuple[str, bytes]:
+    """
+    응답 본문을 압축.
+
+    Returns:
+        tuple[str, bytes]: (압축 방식, 압축된 본문)
+    """
+    return RESPONSE_CODEC, lz4.frame.compress(data)
+
+
+def decompress_response(codec: str, body: bytes) -> str:
+    """
+    agent_response_content에 저장된 본문을 JSON 텍스트로 복원.
+
+    Args:
+        codec (str): 압축 방식
+        body (bytes): 압축된 본문
+
+    Returns:
+        str: 압축 해제된 JSON 텍스트
+    """
+    if codec == "lz4":
+        return lz4.frame.decompress(body).decode("utf-8")
+    raise ValueError(f"Unsupported response codec '{codec}'")
+
+
+@functools.cache
+def _save_response_sql(
+    table_name: str, external: bool, update_workflow: bool, with_usage: bool = False
+) -> str:
+    """
+    agent 결과 저장 쿼리를 생성. 압축 본문 저장, 토큰 사용량 집계, 워크플로우 상태 갱신을
+    data-modifying CTE로 묶어 한 번의 왕복(단일 문장, 원자적)으로 실행.
+
+    파라미터: $1 status, $2 response(jsonb), $3 response_ref, $4 response_size, $5 ended_at,
+    $6 workflow_id, $7 model, $8 created_at, (external) codec, raw_size, body,
+    (with_usage) prompt_tokens, completion_tokens, cached_tokens, cost_usd,
+    (update_workflow) workflow status 순서로 이어짐
+    """
+    params = iter(range(9, 21))
+    ctes = []
+    if external:
+        codec, raw_size, body = next(params), next(params), next(params)
+        ctes.append(
+            f"""
+            content AS (
+                INSERT INTO agent_response_content (content_hash, codec, raw_size, body)
+                VALUES ($3, ${codec}, ${raw_size}, ${body})
+                ON CONFLICT (content_hash) DO NOTHING
+            )"""
+        )
+    usage_sets = ""
+    if with_usage:
+        prompt, completion, cached, cost = next(params), next(params), next(params), next(params)
+        usage_sets = f""",
+                prompt_tokens = ${prompt},
+                completion_tokens = ${completion},
+                cached_tokens = ${cached},
+                cost_usd = ${cost}"""
+    save = f"""
+            UPDATE {table_name}
+            SET status = $1,
+                response = $2,
+                response_ref = $3,
+                response_size = $4,
+                ended_at = $5,
+                model = $7{usage_sets}
+            WHERE workflow_id = $6 AND created_at = $8 AND status <> 'cancelled'"""
+    if not update_workflow and not with_usage:
+        return f"WITH {','.join(ctes)} {save}" if ctes else save
+
+    # agent 행을 실제로 갱신한 경우에만 워크플로우도 갱신 (취소된 워크플로우의 상태는 그대로 둠)
+    ctes.append(f"saved AS ({save} RETURNING workflow_id)")
+    workflow_sets = []
+    if with_usage:
+        workflow_sets += [
+            f"prompt_tokens = w.prompt_tokens + ${prompt}",
+            f"completion_tokens = w.completion_tokens + ${completion}",
+            f"cached_tokens = w.cached_tokens + ${cached}",
+            f"cost_usd = w.cost_usd + ${cost}",
+        ]
+    if update_workflow:
+        workflow_status = f"${next(params)}::status_enum"
+        workflow_sets += [
+            f"status = CASE WHEN w.status = 'cancelled' THEN w.status ELSE {workflow_status} END",
+            "ended_at = CASE WHEN w.status = 'cancelled' THEN w.ended_at ELSE $5 END",
+        ]
+    update = f"""
+        UPDATE workflow w
+        SET {', '.join(workflow_sets)}
+        FROM saved
+        WHERE w.workflow_id = $6 AND w.created_at = $8"""
+    if not with_usage:
+        return f"WITH {','.join(ctes)} {update}"
+
+    # 사용자별 일 단위 사용량(쿼터 계산용)도 같은 문장에서 누적
+    ctes.append(f"updated AS ({update} RETURNING w.user_id)")
+    return f"""
+        WITH {','.join(ctes)}
+        INSERT INTO user_usage
+            (user_id, usage_date, prompt_tokens, completion_tokens, cached_tokens, cost_usd)
+        SELECT user_id, ($5 AT TIME ZONE 'UTC')::date, ${prompt}, ${completion}, ${cached}, ${cost}
+        FROM updated
+        ON CONFLICT (user_id, usage_date) DO UPDATE
+        SET prompt_tokens = user_usage.prompt_tokens + excluded.prompt_tokens,
+            completion_tokens = user_usage.completion_tokens + excluded.completion_tokens,
+            cached_tokens = user_usage.cached_tokens + excluded.cached_tokens,
+            cost_usd = user_usage.cost_usd + excluded.cost_usd
+        """
+
+
 async def save_agent_response(
-    conn, table_name: str, workflow_id: str, status: str, response: dict | str
+    conn,
+    table_name: str,
+    workflow_id: str,
+    created_at: datetime,
+    status: str,
+    response: dict | str,
+    model: str | None = None,
+    workflow_status: str | None = None,
+    usage=None,
 ):
     """
     agent 결과를 DB에 저장하는 함수.
+    - created_at: 워크플로우 생성 일시 (파티션 키 - 해당 월 파티션의 행만 갱신)
     - response는 dict면 JSON으로 변환 후 저장, 아니면 문자열 그대로 저장
-    - status: 'pending', 'running', 'completed', 'failed' 중 하나
+    - status: 'pending', 'running', 'completed', 'failed', 'cancelled' 중 하나
+    - 이미 취소(cancelled)된 agent는 갱신하지 않음 (취소 후 뒤늦게 끝난 실행의 결과 무시)
+    - model: 실제로 응답을 생성한 LLM 모델 (LLM 호출 전에 실패한 경우 None)
+    - workflow_status: 지정하면 같은 쿼리에서 워크플로우 상태와 ended_at도 갱신
+      (마지막 단계 완료 시 'completed', 실패 시 'failed')
+    - usage: 토큰 사용량(TokenUsage). 지정하면 agent 행에 기록하고 워크플로우 합계와
+      사용자별 일 사용량(user_usage)에도 같은 쿼리에서 누적
+    - RESPONSE_INLINE_MAX_BYTES를 넘는 응답은 압축하여 agent_response_content에 저장하고
+      agent 테이블에는 내용 해시(response_ref)만 기록. 같은 내용은 한 번만 저장됨
+    - 모든 경우 단일 문장으로 실행되므로 DB 왕복은 한 번
     """
-    import json
-
     if isinstance(response, dict):
         response_data = json.dumps(response)
     else:
@@ -15,20 +172,56 @@ async def save_agent_response(
 
     # started_at, ended_at은 현재 시간으로 자동 처리 가능하지만,
     # 필요한 경우 별도로 인자로 받을 수도 있음
-    from datetime import datetime, timezone
-
     now = datetime.now(timezone.utc)
 
+    encoded = response_data.encode("utf-8")
+    external = len(encoded) > RESPONSE_INLINE_MAX_BYTES
+    args = [status, None, None, len(encoded), now, workflow_id, model, created_at]
+    if external:
+        # jsonb 컬럼을 거치지 않으므로 유효한 JSON인지 직접 확인 (기존과 동일하게 실패 처리)
+        if not isinstance(response, dict):
+            json.loads(response_data)
+        codec, body = compress_response(encoded)
+        args[2] = hashlib.sha256(encoded).digest()
+        args += [codec, len(encoded), body]
+    else:
+        args[1] = response_data
+    if usage is not None:
+        args += [
+            usage.prompt_tokens,
+            usage.completion_tokens,
+            usage.cached_tokens,
+            usage.cost_usd,
+        ]
+    if workflow_status is not None:
+        args.append(workflow_status)
+
     await conn.execute(
-        f"""
-        UPDATE {table_name}
-        SET status = $1,
-            response = $2,
-            ended_at = $3
-        WHERE workflow_id = $4
-        """,
-        status,
-        response_data,
-        now,
-        workflow_id,
+        _save_response_sql(
+            table_name, external, workflow_status is not None, usage is not None
+        ),
+        *args,
     )
+
+
+async def load_agent_response(
+    conn, table_name: str, workflow_id: str, created_at: datetime
+) -> str | None:
+    """
+    agent 응답 본문을 조회. 별도 저장된 응답은 압축을 해제하여 반환.
+
+    Args:
+        conn: DB 커넥션
+        table_name (str): agent 테이블명
+        workflow_id (str): 워크플로우 ID
+        created_at (datetime): 워크플로우 생성 일시 (파티션 키)
+
+    Returns:
+        str | None: 응답 JSON 텍스트, 기록이 없거나 응답이 없으면 None
+    """
+    row = await conn.fetchrow(LOAD_AGENT_RESPONSE_SQL[table_name], workflow_id, created_at)
+    if not row:
+        return None
+    if row["body"] is not None:
+        return decompress_response(row["codec"], row["body"])
+    return row["response"]
@@ -1,16 +1,60 @@
 import asyncio
 import logging
+import os
+import random
+from datetime import datetime
+from typing import Literal
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, Query, WebSocket
-from pydantic import BaseModel
+from fastapi import FastAPI, Header, Query, Response, WebSocket
+from pydantic import BaseModel, Field
 
-from app.api.websocket import websocket_endpoint
-from app.api.workflow import run_workflow
-from app.db.database import connect_db
+from app.agents.llm import close_llm_client, warmup_llm_client
+from app.api.health import get_liveness_response, get_readiness_response, mark_ready
+from app.api.listing import list_workflows_response
+from app.api.render import close_render_executor
+from app.api.results import (
+    get_agent_result_response,
+    get_rendered_report_response,
+    get_report_response,
+)
+from app.api.scenarios import get_scenarios_response, run_scenarios
+from app.api.status import get_workflow_status_response
+from app.api.usage import get_usage_response, get_workflow_usage_response
+from app.api.websocket import (
+    manager,
+    start_connection_reaper,
+    start_update_relay,
+    stop_connection_reaper,
+    stop_update_relay,
+    websocket_endpoint,
+)
+from app.api.workflow import (
+    cancel_workflow,
+    cancel_workflow_request,
+    drain_running_workflows,
+    run_workflow,
+)
+from app.db.database import (
+    close_db,
+    connect_db,
+    start_replica_monitor,
+    stop_replica_monitor,
+)
+from app.db.retention import start_retention_job
+from app.monitoring.loop_watchdog import start_loop_watchdog, stop_loop_watchdog
+from app.monitoring.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry
+from app.monitoring.profiler import get_profile_response
 
 load_dotenv()
 
+# 종료 신호부터 처리 중인 요청과 실행 중인 워크플로우가 끝나기를 기다리는 전체 최대 시간(초)
+SHUTDOWN_GRACE_SECONDS = float(os.getenv("SHUTDOWN_GRACE_SECONDS", "25"))
+# 시작 시 DB 연결 재시도 횟수 및 백오프 간격(초)
+STARTUP_DB_RETRIES = int(os.getenv("STARTUP_DB_RETRIES", "10"))
+STARTUP_RETRY_BASE_DELAY = float(os.getenv("STARTUP_RETRY_BASE_DELAY", "0.5"))
+STARTUP_RETRY_MAX_DELAY = float(os.getenv("STARTUP_RETRY_MAX_DELAY", "8"))
+
 app = FastAPI()
 
 logging.basicConfig(
@@ -19,44 +63,240 @@ logging.basicConfig(
 )
 
 
-@app.on_event("startup")
-async def startup_event():
-    retries = 10
-    delay = 3
-    for i in range(retries):
+async def _connect_db_with_backoff():
+    """
+    DB 커넥션 풀을 생성 (풀 최소 크기만큼 연결 및 쿼리 준비 포함).
+    실패 시 지수 백오프(+지터)로 STARTUP_DB_RETRIES회까지 재시도.
+    """
+    delay = STARTUP_RETRY_BASE_DELAY
+    for i in range(STARTUP_DB_RETRIES):
         try:
-            pool = await connect_db()
-            async with pool.acquire() as conn:
-                await conn.execute("SELECT 1")
+            await connect_db()
             print("DB 연결 성공")
             return
         except Exception as e:
-            print(f"DB 연결 실패 {i+1}/{retries}, 재시도 중... {e}")
-            await asyncio.sleep(delay)
+            if i + 1 == STARTUP_DB_RETRIES:
+                print(f"DB 연결 실패 {i+1}/{STARTUP_DB_RETRIES}: {e}")
+                break
+            print(f"DB 연결 실패 {i+1}/{STARTUP_DB_RETRIES}, {delay:.1f}초 후 재시도... {e}")
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, STARTUP_RETRY_MAX_DELAY)
     raise RuntimeError("DB 연결 실패 - 서버 시작 중단")
 
 
+@app.on_event("startup")
+async def startup_event():
+    # DB 풀 예열과 LLM 커넥션 예열을 동시에 진행
+    _, llm_warm = await asyncio.gather(_connect_db_with_backoff(), warmup_llm_client())
+    mark_ready("llm", llm_warm)
+    # 읽기 복제본 풀 생성 및 복제 지연 감시 (DATABASE_READ_URL 지정 시)
+    await start_replica_monitor()
+
+    # 월별 파티션 생성 및 보관 기간이 지난 기록 정리
+    start_retention_job()
+    # 다른 워커에서 실행 중인 워크플로우의 상태 변경 수신
+    start_update_relay()
+    # 끊긴/유휴 WebSocket 연결 정리
+    start_connection_reaper()
+    # 이벤트 루프 지연 측정 및 정지(블로킹 호출) 감지
+    start_loop_watchdog()
+    mark_ready("db")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # 새 워크플로우 접수 중단 후 실행 중인 에이전트가 끝날 시간을 줌 (요청 대기에 쓴 시간을 뺀 나머지)
+    await drain_running_workflows(SHUTDOWN_GRACE_SECONDS)
+    await manager.close_all("Server restarting, please reconnect")
+    await stop_update_relay()
+    await stop_connection_reaper()
+    await stop_loop_watchdog()
+    await close_llm_client()
+    close_render_executor()
+    await stop_replica_monitor()
+    await close_db()
+
+
 class WorkflowRequest(BaseModel):
     user_name: str
+    # interactive: 대화형 요청(짧은 대기), batch: 대량 요청(여유 용량 사용)
+    priority: Literal["interactive", "standard", "batch"] = "standard"
+    # online: 즉시 스트리밍 실행, offline: 배치 API로 일괄 실행 (python -m app.agents.batch)
+    execution_mode: Literal["online", "offline"] = "online"
 
 
 @app.post("/workflow/start")
 async def start_workflow(req: WorkflowRequest):
     result = await run_workflow(
         req.user_name,
+        req.priority,
+        req.execution_mode,
     )
     return {"workflow_id": result["workflow_id"]}
 
 
+class ScenarioRequest(BaseModel):
+    # 비교용 이름 (생략 시 scenario-1, scenario-2, ...)
+    name: str | None = Field(None, max_length=100)
+    # 총예산(USD) - 생략 시 allocation 합계 또는 기본 3000
+    total_budget: float | None = Field(None, gt=0)
+    # 항목별 예산 배분(USD) - 생략 시 기본 배분을 총예산 비율로 조정
+    allocation: dict[str, float] | None = None
+    # 방문 순서 (수집한 도시 Tokyo, Kyoto, Osaka 중에서)
+    route: list[str] | None = None
+    # 추가 요구사항 (예: "prefer ryokan over hotels")
+    notes: str | None = Field(None, max_length=500)
+
+
+class ScenarioSetRequest(BaseModel):
+    user_name: str
+    priority: Literal["interactive", "standard", "batch"] = "standard"
+    scenarios: list[ScenarioRequest]
+
+
+@app.post("/workflow/scenarios")
+async def start_scenarios(req: ScenarioSetRequest):
+    return await run_scenarios(
+        req.user_name,
+        [scenario.model_dump() for scenario in req.scenarios],
+        req.priority,
+    )
+
+
+@app.get("/workflow/{workflow_id}/scenarios")
+async def workflow_scenarios(workflow_id: str, auth_token: str = Query(...)):
+    return await get_scenarios_response(workflow_id, auth_token)
+
+
+@app.get("/workflows")
+async def list_workflows(
+    auth_token: str = Query(...),
+    user: str | None = Query(None, description="사용자 이름 (관리자 토큰만 다른 사용자 조회 가능)"),
+    status: Literal["pending", "running", "completed", "failed", "cancelled"] | None = None,
+    since: datetime | None = Query(None, description="이 시각 이후 생성된 워크플로우만 조회"),
+    cursor: str | None = Query(None, description="이전 응답의 next_cursor"),
+    limit: int = Query(20, ge=1),
+):
+    return await list_workflows_response(auth_token, user, status, since, cursor, limit)
+
+
+@app.post("/workflow/{workflow_id}/cancel")
+async def workflow_cancel(workflow_id: str, auth_token: str = Query(...)):
+    return await cancel_workflow_request(workflow_id, auth_token)
+
+
+@app.get("/workflow/{workflow_id}/status")
+async def workflow_status(
+    workflow_id: str,
+    auth_token: str = Query(...),
+    wait: float = Query(0, ge=0, description="롱폴링 최대 대기 시간(초)"),
+    if_none_match: str | None = Header(None),
+):
+    return await get_workflow_status_response(
+        workflow_id, auth_token, if_none_match, wait
+    )
+
+
+@app.get("/workflow/{workflow_id}/agents/{agent}")
+async def workflow_agent_result(
+    workflow_id: str,
+    agent: str,
+    auth_token: str = Query(...),
+    fields: str | None = Query(None, description="쉼표로 구분된 필드 경로 (예: remaining.flights)"),
+    accept_encoding: str | None = Header(None),
+):
+    return await get_agent_result_response(
+        workflow_id, agent, auth_token, fields, accept_encoding
+    )
+
+
+@app.get("/workflow/{workflow_id}/report")
+async def workflow_report(
+    workflow_id: str,
+    auth_token: str = Query(...),
+    fields: str | None = Query(None, description="쉼표로 구분된 필드 경로 (예: markdown)"),
+    accept_encoding: str | None = Header(None),
+):
+    return await get_report_response(workflow_id, auth_token, fields, accept_encoding)
+
+
+@app.get("/workflow/{workflow_id}/report/{fmt}")
+async def workflow_report_rendered(
+    workflow_id: str,
+    fmt: Literal["html", "pdf"],
+    auth_token: str = Query(...),
+    download: bool = Query(False, description="true이면 첨부파일로 다운로드"),
+    if_none_match: str | None = Header(None),
+):
+    return await get_rendered_report_response(
+        workflow_id, fmt, auth_token, if_none_match, download
+    )
+
+
+@app.get("/workflow/{workflow_id}/usage")
+async def workflow_usage(workflow_id: str, auth_token: str = Query(...)):
+    return await get_workflow_usage_response(workflow_id, auth_token)
+
+
+@app.get("/usage")
+async def usage(
+    auth_token: str = Query(...),
+    days: int = Query(30, ge=1, description="조회 기간(일, 오늘 포함)"),
+):
+    return await get_usage_response(auth_token, days)
+
+
 @app.get("/")
 def root():
     return {"msg": "Multi-Agent Workflow API is running!"}
 
 
+@app.get("/healthz")
+def healthz():
+    return get_liveness_response()
+
+
+@app.get("/readyz")
+def readyz():
+    return get_readiness_response()
+
+
+@app.get("/metrics")
+def metrics():
+    return Response(content=registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/admin/profile")
+async def admin_profile(
+    auth_token: str = Query(..., description="ADMIN_TOKEN"),
+    seconds: float = Query(10, gt=0, description="프로파일링 시간(초, 최대 PROFILER_MAX_SECONDS)"),
+    mode: Literal["tasks", "loop"] = Query(
+        "tasks", description="tasks: 코루틴별 wall time, loop: 이벤트 루프 스레드 점유"
+    ),
+    interval_ms: float = Query(10, gt=0, description="샘플링 간격(ms)"),
+    focus: str | None = Query(None, description="이 문자열을 포함한 스택만 반환 (예: app.db.database)"),
+):
+    return await get_profile_response(auth_token, seconds, mode, interval_ms, focus)
+
+
 @app.websocket("/ws/{workflow_id}")
 async def websocket_route(
     websocket: WebSocket,
     workflow_id: str,
     auth_token: str = Query(...),
+    responses: bool = Query(True, description="False이면 agent 응답 본문 없이 상태만 전송"),
+    encoding: Literal["json", "msgpack"] = Query(
+        "json", description="json: 텍스트 프레임, msgpack: 바이너리 프레임"
+    ),
+    since: int | None = Query(
+        None, ge=0, description="마지막으로 받은 이벤트 seq - 놓친 상태 전이 이벤트만 재전송한 뒤 실시간 전송"
+    ),
+    cancel_on_disconnect: bool = Query(
+        False, description="True이면 마지막 구독자로서 연결을 끊을 때 워크플로우 취소"
+    ),
 ):
-    await websocket_endpoint(websocket, workflow_id, auth_token)
+    abandoned = await websocket_endpoint(
+        websocket, workflow_id, auth_token, responses, encoding, since, cancel_on_disconnect
+    )
+    if abandoned:
+        await cancel_workflow(workflow_id, reason="disconnect")
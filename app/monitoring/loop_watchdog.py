@@ -0,0 +1,173 @@
+# 이벤트 루프 지연 측정 및 정지(블로킹 호출) 감지 - 정지 중인 코드의 스택을 워크플로우/agent 정보와 함께 기록
+import asyncio
+import contextvars
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+from app.monitoring.metrics import registry
+
+# 감시 사용 여부
+LOOP_WATCHDOG_ENABLED = os.getenv("LOOP_WATCHDOG_ENABLED", "true").lower() == "true"
+# 루프 지연 측정 간격(초)
+LOOP_WATCHDOG_INTERVAL_SECONDS = float(os.getenv("LOOP_WATCHDOG_INTERVAL_SECONDS", "0.1"))
+# 이 시간(초) 이상 루프가 응답하지 않으면 정지로 보고 스택을 기록
+LOOP_STALL_THRESHOLD_SECONDS = float(os.getenv("LOOP_STALL_THRESHOLD_SECONDS", "0.25"))
+# 같은 위치에서 반복되는 정지는 이 간격(초)마다 한 번만 전체 스택을 기록
+LOOP_STALL_LOG_INTERVAL_SECONDS = float(os.getenv("LOOP_STALL_LOG_INTERVAL_SECONDS", "60"))
+# 기록할 스택 프레임 수 (정지 지점에 가까운 프레임부터)
+LOOP_STALL_STACK_LIMIT = int(os.getenv("LOOP_STALL_STACK_LIMIT", "25"))
+
+logger = logging.getLogger(__name__)
+
+_loop_lag = registry.histogram(
+    "event_loop_lag_seconds",
+    "Delay between a scheduled event-loop wakeup and when it actually ran",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+_loop_stalls = registry.counter(
+    "event_loop_stalls_total",
+    "Event-loop stalls longer than LOOP_STALL_THRESHOLD_SECONDS (agent is empty outside agents)",
+    ("agent",),
+)
+
+# 현재 실행 중인 워크플로우/agent (정지 기록에 함께 남김). 태스크를 만들 때 컨텍스트가 복사되므로
+# asyncio.gather/wait_for로 만든 하위 태스크에도 그대로 전달됨
+workflow_context: contextvars.ContextVar[tuple[str, str | None] | None] = (
+    contextvars.ContextVar("workflow_context", default=None)
+)
+
+_heartbeat_task: asyncio.Task | None = None
+_watch_thread: threading.Thread | None = None
+_stop = threading.Event()
+# 마지막으로 루프가 깨어난 시각 (루프 스레드가 기록, 감시 스레드가 읽음)
+_last_beat = 0.0
+# 정지 위치(가장 안쪽 프레임) -> 마지막으로 전체 스택을 기록한 시각
+_logged_at: dict[tuple[str, int], float] = {}
+
+
+def bind_workflow_context(workflow_id: str, agent: str | None = None) -> contextvars.Token:
+    """
+    현재 태스크(와 이후 만드는 하위 태스크)의 워크플로우/agent 정보를 지정.
+
+    Returns:
+        contextvars.Token: reset_workflow_context에 넘길 토큰
+    """
+    return workflow_context.set((workflow_id, agent))
+
+
+def reset_workflow_context(token: contextvars.Token):
+    workflow_context.reset(token)
+
+
+def _task_context(task: asyncio.Task | None) -> tuple[str, str | None] | None:
+    """
+    다른 스레드에서 태스크의 워크플로우/agent 정보를 읽음.
+    태스크 컨텍스트 조회(Task.get_context)는 Python 3.12 이상에서만 가능하며, 그 전 버전은 None.
+    """
+    get_context = getattr(task, "get_context", None)
+    if get_context is None:
+        return None
+    return get_context().get(workflow_context)
+
+
+async def _heartbeat_loop():
+    """
+    LOOP_WATCHDOG_INTERVAL_SECONDS마다 깨어나 예정 시각보다 늦어진 만큼을 루프 지연으로 기록.
+    """
+    global _last_beat
+    interval = LOOP_WATCHDOG_INTERVAL_SECONDS
+    while True:
+        await asyncio.sleep(interval)
+        now = time.monotonic()
+        lag = max(0.0, now - _last_beat - interval)
+        _loop_lag.observe(lag)
+        _last_beat = now
+        if lag >= LOOP_STALL_THRESHOLD_SECONDS:
+            logger.warning(f"이벤트 루프 정지 종료 (총 {lag:.3f}초)")
+
+
+def _log_stall(loop: asyncio.AbstractEventLoop, loop_thread_id: int, stalled: float):
+    """
+    정지 중인 루프 스레드의 스택과 실행 중인 태스크의 워크플로우/agent 정보를 기록.
+    같은 위치의 정지는 LOOP_STALL_LOG_INTERVAL_SECONDS마다 한 번만 전체 스택을 기록.
+    """
+    frame = sys._current_frames().get(loop_thread_id)
+    if frame is None:
+        return
+    try:
+        task = asyncio.current_task(loop)
+    except RuntimeError:
+        task = None
+    context = _task_context(task)
+    workflow_id, agent = context or (None, None)
+    _loop_stalls.inc(agent=agent or "")
+
+    where = f"workflow={workflow_id or '-'} agent={agent or '-'} task={task.get_name() if task else '-'}"
+    location = (frame.f_code.co_filename, frame.f_lineno)
+    now = time.monotonic()
+    if now - _logged_at.get(location, float("-inf")) < LOOP_STALL_LOG_INTERVAL_SECONDS:
+        logger.warning(
+            f"이벤트 루프 {stalled:.3f}초 이상 정지 ({where}) at {location[0]}:{location[1]}"
+        )
+        return
+    _logged_at[location] = now
+    stack = "".join(traceback.format_stack(frame, limit=LOOP_STALL_STACK_LIMIT))
+    logger.warning(f"이벤트 루프 {stalled:.3f}초 이상 정지 ({where})\n{stack}")
+
+
+def _watch(loop: asyncio.AbstractEventLoop, loop_thread_id: int):
+    """
+    감시 스레드. 루프가 LOOP_STALL_THRESHOLD_SECONDS 넘게 깨어나지 못하면
+    정지 1회당 한 번 스택을 기록 (루프가 다시 깨어나면 다음 정지를 감시).
+    """
+    reported_beat = None
+    check_interval = LOOP_STALL_THRESHOLD_SECONDS / 2
+    while not _stop.wait(check_interval):
+        beat = _last_beat
+        stalled = time.monotonic() - beat - LOOP_WATCHDOG_INTERVAL_SECONDS
+        if stalled < LOOP_STALL_THRESHOLD_SECONDS or beat == reported_beat:
+            continue
+        reported_beat = beat
+        try:
+            _log_stall(loop, loop_thread_id, stalled)
+        except Exception as e:
+            logger.error(f"이벤트 루프 정지 기록 실패: {e}")
+
+
+def start_loop_watchdog():
+    """
+    이벤트 루프 지연 측정 태스크와 정지 감시 스레드를 시작 (서버 시작 시 호출).
+    """
+    global _heartbeat_task, _watch_thread, _last_beat
+    if not LOOP_WATCHDOG_ENABLED or _heartbeat_task is not None:
+        return
+    loop = asyncio.get_running_loop()
+    _stop.clear()
+    _last_beat = time.monotonic()
+    _heartbeat_task = asyncio.create_task(_heartbeat_loop())
+    _watch_thread = threading.Thread(
+        target=_watch,
+        args=(loop, threading.get_ident()),
+        name="loop-watchdog",
+        daemon=True,
+    )
+    _watch_thread.start()
+
+
+async def stop_loop_watchdog():
+    """
+    지연 측정 태스크와 감시 스레드를 종료 (서버 종료 시 호출).
+    """
+    global _heartbeat_task, _watch_thread
+    _stop.set()
+    if _heartbeat_task is not None:
+        _heartbeat_task.cancel()
+        await asyncio.gather(_heartbeat_task, return_exceptions=True)
+        _heartbeat_task = None
+    if _watch_thread is not None:
+        await asyncio.to_thread(_watch_thread.join)
+        _watch_thread = None
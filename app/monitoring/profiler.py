@@ -0,0 +1,227 @@
+# 운영 중인 프로세스의 온디맨드 샘플링 프로파일러 (asyncio 태스크 스택, flame graph용 folded 형식)
+import asyncio
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from fastapi import HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.api.status import is_admin_token
+from app.monitoring.metrics import registry
+
+# 프로파일링 1회 최대 시간(초)
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+# 샘플링 간격 하한(ms) - 부하 중에 너무 촘촘하게 샘플링하지 않도록 제한
+PROFILER_MIN_INTERVAL_MS = float(os.getenv("PROFILER_MIN_INTERVAL_MS", "5"))
+# 샘플 1회에 스택을 수집할 최대 태스크 수 (태스크가 아주 많을 때 샘플 1회 비용 제한)
+PROFILER_MAX_TASKS = int(os.getenv("PROFILER_MAX_TASKS", "1000"))
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+logger = logging.getLogger(__name__)
+
+_profiles_total = registry.counter(
+    "profiler_runs_total", "On-demand profiling runs (mode=tasks|loop)", ("mode",)
+)
+_profile_samples = registry.counter(
+    "profiler_samples_total", "Stack samples collected by the on-demand profiler", ("mode",)
+)
+
+# 동시에 하나의 프로파일링만 허용 (부하 중 여러 요청이 겹쳐 오버헤드가 쌓이지 않도록)
+_profile_lock = asyncio.Lock()
+
+
+@functools.lru_cache(maxsize=4096)
+def _module_name(filename: str) -> str:
+    """
+    파일 경로를 flame graph에 표시할 모듈 이름으로 변환
+    (app.agents.base, asyncio.tasks, asyncpg.pool 형태 - 가장 가까운 import 경로 기준).
+    """
+    path = os.path.abspath(filename)
+    roots = [_PROJECT_ROOT, *(os.path.abspath(entry) for entry in sys.path if entry)]
+    matches = [root for root in roots if path.startswith(root + os.sep)]
+    if matches:
+        path = os.path.relpath(path, max(matches, key=len))
+    else:
+        path = os.path.basename(path)
+    return os.path.splitext(path)[0].replace(os.sep, ".")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{_module_name(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _thread_stack(frame) -> list[str]:
+    """
+    스레드의 현재 프레임부터 바깥쪽으로 올라가며 스택을 구성 (바깥쪽 프레임이 먼저).
+    """
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _coroutine_stack(coro) -> list[str]:
+    """
+    태스크의 코루틴에서 시작해 await 중인 코루틴/제너레이터를 따라 내려가며 스택을 구성.
+    중단된 코루틴의 프레임은 f_back으로 연결되지 않으므로 cr_await 체인을 직접 따라감.
+    """
+    stack = []
+    while coro is not None:
+        frame = (
+            getattr(coro, "cr_frame", None)
+            or getattr(coro, "gi_frame", None)
+            or getattr(coro, "ag_frame", None)
+        )
+        if frame is None:
+            break
+        stack.append(_frame_label(frame))
+        coro = (
+            getattr(coro, "cr_await", None)
+            or getattr(coro, "gi_yieldfrom", None)
+            or getattr(coro, "ag_await", None)
+        )
+    return stack
+
+
+def _sample_tasks(loop: asyncio.AbstractEventLoop, samples: Counter):
+    try:
+        tasks = list(asyncio.all_tasks(loop))
+    except RuntimeError:
+        # 다른 스레드에서 태스크 집합을 읽는 중 변경된 경우 - 이번 샘플은 건너뜀
+        return
+    for task in tasks[:PROFILER_MAX_TASKS]:
+        stack = _coroutine_stack(task.get_coro())
+        if stack:
+            samples[";".join(stack)] += 1
+
+
+def _sample_loop(loop_thread_id: int, samples: Counter):
+    frame = sys._current_frames().get(loop_thread_id)
+    if frame is not None:
+        samples[";".join(_thread_stack(frame))] += 1
+
+
+def _run_sampler(
+    mode: str,
+    loop: asyncio.AbstractEventLoop,
+    loop_thread_id: int,
+    seconds: float,
+    interval: float,
+) -> tuple[Counter, int]:
+    """
+    별도 스레드에서 seconds 동안 interval마다 스택을 샘플링.
+    이벤트 루프가 블로킹되어 있어도 샘플링은 계속되므로 루프를 점유한 코드가 그대로 드러남.
+    샘플 사이에는 항상 샘플 1회에 걸린 시간 이상 쉬어, 샘플링이 느려져도 GIL을 절반 넘게 점유하지 않음.
+
+    Returns:
+        tuple[Counter, int]: (folded 스택 -> 샘플 수, 샘플링 횟수)
+    """
+    samples = Counter()
+    ticks = 0
+    deadline = time.monotonic() + seconds
+    next_tick = time.monotonic()
+    while next_tick < deadline:
+        started = time.monotonic()
+        if mode == "tasks":
+            _sample_tasks(loop, samples)
+        else:
+            _sample_loop(loop_thread_id, samples)
+        ticks += 1
+        now = time.monotonic()
+        # 샘플 1회가 간격보다 오래 걸리면 밀린 샘플은 버리고, 걸린 시간만큼 물러나서 다시 시작
+        next_tick = max(next_tick + interval, now + (now - started))
+        time.sleep(next_tick - now)
+    return samples, ticks
+
+
+def format_folded(samples: Counter, focus: str | None = None) -> str:
+    """
+    샘플을 flame graph 도구(flamegraph.pl, speedscope, inferno)가 읽는 folded 형식으로 변환.
+    한 줄에 "바깥 프레임;...;안쪽 프레임 샘플수".
+
+    Args:
+        samples (Counter): folded 스택 -> 샘플 수
+        focus (str | None): 지정하면 이 문자열을 포함한 스택만 출력 (예: "app.db.database")
+
+    Returns:
+        str: folded 형식 텍스트
+    """
+    lines = [
+        f"{stack} {count}"
+        for stack, count in sorted(samples.items())
+        if focus is None or focus in stack
+    ]
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+async def profile(
+    seconds: float, mode: str = "tasks", interval_ms: float = 10
+) -> tuple[Counter, int]:
+    """
+    현재 프로세스를 seconds 동안 샘플링 (이벤트 루프 밖의 스레드에서 실행).
+    호출하지 않을 때는 훅이나 스레드가 전혀 없으므로 오버헤드 없음.
+
+    Args:
+        seconds (float): 프로파일링 시간(초, 최대 PROFILER_MAX_SECONDS)
+        mode (str): "tasks"(모든 asyncio 태스크의 대기 중인 코루틴 체인 - LLM/DB/WebSocket 대기를 포함한
+                    코루틴별 wall time) 또는 "loop"(이벤트 루프 스레드에서 실행 중인 스택 - 루프를 점유하는 작업)
+        interval_ms (float): 샘플링 간격(ms, 최소 PROFILER_MIN_INTERVAL_MS)
+
+    Returns:
+        tuple[Counter, int]: (folded 스택 -> 샘플 수, 샘플링 횟수)
+    """
+    seconds = min(seconds, PROFILER_MAX_SECONDS)
+    interval = max(interval_ms, PROFILER_MIN_INTERVAL_MS) / 1000
+    loop = asyncio.get_running_loop()
+    samples, ticks = await asyncio.to_thread(
+        _run_sampler, mode, loop, threading.get_ident(), seconds, interval
+    )
+    _profiles_total.inc(mode=mode)
+    _profile_samples.inc(sum(samples.values()), mode=mode)
+    return samples, ticks
+
+
+async def get_profile_response(
+    auth_token: str,
+    seconds: float = 10,
+    mode: str = "tasks",
+    interval_ms: float = 10,
+    focus: str | None = None,
+) -> PlainTextResponse:
+    """
+    관리자 토큰으로 요청한 프로파일링을 실행하고 folded 형식 결과를 반환.
+
+    Args:
+        auth_token (str): ADMIN_TOKEN
+        seconds (float): 프로파일링 시간(초)
+        mode (str): "tasks"(코루틴별 wall time) 또는 "loop"(이벤트 루프 스레드 점유)
+        interval_ms (float): 샘플링 간격(ms)
+        focus (str | None): 이 문자열을 포함한 스택만 반환
+
+    Returns:
+        PlainTextResponse: folded 스택 텍스트 (X-Profile-Samples: 샘플링 횟수)
+
+    Raises:
+        HTTPException: 관리자 토큰이 아니면 403, 이미 프로파일링 중이면 409
+    """
+    if not is_admin_token(auth_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="Profiling already in progress")
+
+    async with _profile_lock:
+        logger.info(f"프로파일링 시작 ({mode}, {seconds}s, {interval_ms}ms)")
+        samples, ticks = await profile(seconds, mode, interval_ms)
+    return PlainTextResponse(
+        format_folded(samples, focus),
+        headers={"X-Profile-Samples": str(ticks), "X-Profile-Mode": mode},
+    )
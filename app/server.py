@@ -0,0 +1,93 @@
+import logging
+import os
+
+import uvicorn
+from dotenv import load_dotenv
+from uvicorn.supervisors import Multiprocess
+
+load_dotenv()
+
+# production: 멀티 워커 + uvloop/httptools, development: 코드 변경 시 자동 재시작(--reload)
+APP_ENV = os.getenv("APP_ENV", "development")
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+# 종료 신호 이후 처리 중인 요청 및 실행 중인 워크플로우를 기다리는 최대 시간(초)
+# 요청 대기(timeout_graceful_shutdown)와 워크플로우 대기(shutdown 이벤트)를 합친 전체 시간
+SHUTDOWN_GRACE_SECONDS = float(os.getenv("SHUTDOWN_GRACE_SECONDS", "25"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
+# 클라이언트가 요청하면 WebSocket 메시지를 permessage-deflate로 압축
+WS_PER_MESSAGE_DEFLATE = os.getenv("WS_PER_MESSAGE_DEFLATE", "true").lower() == "true"
+# WebSocket ping 전송 간격 및 pong 대기 시간(초) - 응답이 없는 연결(half-open)은 종료
+WS_PING_INTERVAL_SECONDS = float(os.getenv("WS_PING_INTERVAL_SECONDS", "20"))
+WS_PING_TIMEOUT_SECONDS = float(os.getenv("WS_PING_TIMEOUT_SECONDS", "20"))
+
+logger = logging.getLogger(__name__)
+
+
+class DrainingServer(uvicorn.Server):
+    """
+    종료 시 리스너를 먼저 닫아 새 연결을 받지 않고, 새 워크플로우 접수를 중단하고,
+    롱폴링 대기 요청을 바로 응답시키고, WebSocket 클라이언트에 재연결 안내를 보낸 뒤 종료하는 uvicorn 서버.
+    실행 중인 워크플로우 대기는 애플리케이션 shutdown 이벤트에서 처리.
+    """
+
+    async def shutdown(self, sockets=None):
+        from app.api.state import state_tracker
+        from app.api.websocket import manager
+        from app.api.workflow import stop_accepting_workflows
+
+        # 재연결 안내 후 같은 프로세스로 다시 연결되지 않도록 리스너부터 닫음 (super().shutdown에서 다시 닫아도 무방)
+        for server in self.servers:
+            server.close()
+        for sock in sockets or []:
+            sock.close()
+
+        stop_accepting_workflows()
+        state_tracker.close()
+        await manager.close_all("Server restarting, please reconnect")
+        await super().shutdown(sockets=sockets)
+
+
+def main():
+    """
+    APP_ENV에 맞는 설정으로 API 서버를 실행.
+    """
+    if APP_ENV != "production":
+        uvicorn.run(
+            "app.main:app",
+            host=HOST,
+            port=PORT,
+            reload=True,
+            log_level=LOG_LEVEL,
+            ws_per_message_deflate=WS_PER_MESSAGE_DEFLATE,
+            ws_ping_interval=WS_PING_INTERVAL_SECONDS,
+            ws_ping_timeout=WS_PING_TIMEOUT_SECONDS,
+        )
+        return
+
+    config = uvicorn.Config(
+        "app.main:app",
+        host=HOST,
+        port=PORT,
+        workers=WEB_CONCURRENCY,
+        loop="uvloop",
+        http="httptools",
+        ws_per_message_deflate=WS_PER_MESSAGE_DEFLATE,
+        ws_ping_interval=WS_PING_INTERVAL_SECONDS,
+        ws_ping_timeout=WS_PING_TIMEOUT_SECONDS,
+        log_level=LOG_LEVEL,
+        proxy_headers=True,
+        timeout_graceful_shutdown=SHUTDOWN_GRACE_SECONDS,
+    )
+    server = DrainingServer(config)
+    if config.workers > 1:
+        # 모든 워커가 같은 소켓을 공유하도록 부모 프로세스에서 바인딩
+        sock = config.bind_socket()
+        Multiprocess(config, target=server.run, sockets=[sock]).run()
+    else:
+        server.run()
+
+
+if __name__ == "__main__":
+    main()
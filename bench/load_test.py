@@ -0,0 +1,255 @@
+# 엔드투엔드 부하 테스트 도구
+"""
+POST /workflow/start 호출과 WebSocket 구독을 동시에 N개 실행하여
+처리량, 엔드투엔드 지연 시간(p50/p95/p99), WebSocket 업데이트 지연을 측정.
+
+사용 예:
+    python -m bench.load_test --base-url http://localhost:8000 --workflows 100 --concurrency 20
+
+WebSocket 업데이트 지연은 메시지에 포함된 가장 최근 상태 변경 시각과 수신 시각의
+차이로 계산하므로, 서버와 부하 생성기가 같은 시계를 사용하는 로컬 환경을 전제로 함.
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+
+import httpx
+import msgpack
+from websockets.asyncio.client import connect
+
+from bench.stats import summarize
+
+# init.sql 로 생성되는 테스트 계정
+DEFAULT_USERS = "user01:token01,user02:token02,user03:token03,user04:token04,user05:token05"
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+def _parse_users(raw: str) -> list[tuple[str, str]]:
+    users = []
+    for item in raw.split(","):
+        name, token = item.split(":", 1)
+        users.append((name.strip(), token.strip()))
+    return users
+
+
+def _parse_timestamp(value) -> float | None:
+    if not value:
+        return None
+    try:
+        ts = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+def _latest_change(data: dict) -> float | None:
+    """
+    스냅샷에서 가장 최근의 상태 변경 시각(started_at/ended_at)을 epoch 초로 반환.
+    """
+    stamps = []
+    for agent in (data.get("agents") or {}).values():
+        stamps.append(_parse_timestamp(agent.get("started_at")))
+        stamps.append(_parse_timestamp(agent.get("ended_at")))
+    stamps.append(_parse_timestamp((data.get("workflow") or {}).get("ended_at")))
+    stamps = [s for s in stamps if s is not None]
+    return max(stamps) if stamps else None
+
+
+def _is_terminal(data: dict) -> bool:
+    workflow = data.get("workflow") or {}
+    report = (data.get("agents") or {}).get("report_generator") or {}
+    return (
+        workflow.get("status") in TERMINAL_STATUSES
+        or report.get("status") in TERMINAL_STATUSES
+    )
+
+
+class LoadResult:
+    """
+    부하 테스트 중 수집한 측정값 모음.
+    """
+
+    def __init__(self):
+        self.start_latencies: list[float] = []
+        self.e2e_latencies: list[float] = []
+        self.update_lags: list[float] = []
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.errors: list[str] = []
+
+    def report(self, elapsed: float, total: int) -> dict:
+        return {
+            "workflows": total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "errors": len(self.errors),
+            "error_samples": self.errors[:10],
+            "elapsed_sec": elapsed,
+            "throughput_wf_per_sec": self.completed / elapsed if elapsed else None,
+            "start_latency_ms": summarize([v * 1000 for v in self.start_latencies]),
+            "e2e_latency_ms": summarize([v * 1000 for v in self.e2e_latencies]),
+            "ws_update_lag_ms": summarize([v * 1000 for v in self.update_lags]),
+        }
+
+
+async def _subscribe(
+    ws_url: str, result: LoadResult, done: asyncio.Event, timeout: float
+) -> tuple[float, str] | None:
+    """
+    WebSocket을 구독하며 업데이트 지연을 기록하고,
+    워크플로우가 종료 상태가 되면 (수신 시각, 최종 상태)를 반환.
+    """
+    async with connect(ws_url, max_size=None, open_timeout=timeout) as ws:
+        while not done.is_set():
+            raw = await asyncio.wait_for(ws.recv(), timeout=timeout)
+            received = time.time()
+            # ?encoding=msgpack 이면 바이너리 프레임
+            message = msgpack.unpackb(raw) if isinstance(raw, bytes) else json.loads(raw)
+            data = message.get("data") or {}
+            if message.get("type") == "update":
+                changed = _latest_change(data)
+                if changed is not None:
+                    result.update_lags.append(max(0.0, received - changed))
+            if _is_terminal(data):
+                done.set()
+                return received, (data.get("workflow") or {}).get("status")
+    return None
+
+
+async def _run_one(
+    client: httpx.AsyncClient,
+    ws_base: str,
+    user: tuple[str, str],
+    subscribers: int,
+    timeout: float,
+    result: LoadResult,
+    ws_encoding: str = "json",
+):
+    name, token = user
+    started = time.time()
+    try:
+        response = await client.post("/workflow/start", json={"user_name": name})
+        response.raise_for_status()
+        result.start_latencies.append(time.time() - started)
+        workflow_id = response.json()["workflow_id"]
+
+        done = asyncio.Event()
+        ws_url = f"{ws_base}/ws/{workflow_id}?auth_token={token}&encoding={ws_encoding}"
+        outcomes = await asyncio.wait_for(
+            asyncio.gather(
+                *[_subscribe(ws_url, result, done, timeout) for _ in range(subscribers)],
+                return_exceptions=True,
+            ),
+            timeout=timeout,
+        )
+        finished = [o for o in outcomes if isinstance(o, tuple)]
+        if not finished:
+            errors = [o for o in outcomes if isinstance(o, Exception)]
+            raise errors[0] if errors else RuntimeError("workflow did not finish")
+
+        received, status = min(finished)
+        # 취소/실패한 워크플로우는 완료 수와 종단 간 지연에 포함하지 않음
+        if status == "failed":
+            result.failed += 1
+        elif status == "cancelled":
+            result.cancelled += 1
+        else:
+            result.completed += 1
+            result.e2e_latencies.append(received - started)
+    except Exception as e:
+        result.errors.append(f"{type(e).__name__}: {e}")
+
+
+async def run_load_test(
+    base_url: str,
+    workflows: int,
+    concurrency: int,
+    users: list[tuple[str, str]],
+    subscribers: int,
+    timeout: float,
+    ws_encoding: str = "json",
+) -> dict:
+    """
+    지정된 동시성으로 워크플로우를 실행하고 측정 결과 리포트를 반환.
+
+    Args:
+        base_url (str): 애플리케이션 HTTP 주소
+        workflows (int): 실행할 워크플로우 총 개수
+        concurrency (int): 동시에 진행할 워크플로우 수
+        users (list[tuple[str, str]]): (user_name, auth_token) 목록, 순서대로 돌아가며 사용
+        subscribers (int): 워크플로우당 WebSocket 구독자 수
+        timeout (float): 워크플로우 하나의 최대 대기 시간(초)
+        ws_encoding (str): WebSocket 메시지 인코딩 ("json" 또는 "msgpack")
+
+    Returns:
+        dict: 처리량, 지연 시간 통계 등을 담은 리포트
+    """
+    ws_base = base_url.replace("http://", "ws://").replace("https://", "wss://")
+    result = LoadResult()
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+
+        async def worker(i: int):
+            async with semaphore:
+                await _run_one(
+                    client,
+                    ws_base,
+                    users[i % len(users)],
+                    subscribers,
+                    timeout,
+                    result,
+                    ws_encoding,
+                )
+
+        started = time.time()
+        await asyncio.gather(*[worker(i) for i in range(workflows)])
+        elapsed = time.time() - started
+
+    report = result.report(elapsed, workflows)
+    report["config"] = {
+        "base_url": base_url,
+        "concurrency": concurrency,
+        "subscribers_per_workflow": subscribers,
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="워크플로우 엔드투엔드 부하 테스트")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--workflows", type=int, default=50, help="실행할 워크플로우 수")
+    parser.add_argument("--concurrency", type=int, default=10, help="동시 실행 워크플로우 수")
+    parser.add_argument("--subscribers", type=int, default=1, help="워크플로우당 WebSocket 구독자 수")
+    parser.add_argument("--users", default=DEFAULT_USERS, help="user_name:auth_token 목록 (쉼표 구분)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="워크플로우당 최대 대기 시간(초)")
+    parser.add_argument("--ws-encoding", choices=["json", "msgpack"], default="json", help="WebSocket 메시지 인코딩")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        run_load_test(
+            args.base_url,
+            args.workflows,
+            args.concurrency,
+            _parse_users(args.users),
+            args.subscribers,
+            args.timeout,
+            args.ws_encoding,
+        )
+    )
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
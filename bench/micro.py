@@ -0,0 +1,379 @@
+# 핫패스 마이크로벤치마크
+"""
+상태 변경마다 실행되는 DB/WebSocket 코드 경로의 마이크로벤치마크.
+
+사용 예:
+    # 기준(baseline) 결과 저장
+    python -m bench.micro --output microbench_baseline.json
+
+    # 기준 대비 비교 (중앙값이 threshold 이상 느려지면 종료 코드 1)
+    python -m bench.micro --compare microbench_baseline.json --threshold 0.15
+
+agent 시작 쿼리 벤치마크는 DATABASE_URL 로 접속 가능한 로컬 Postgres가 있을 때만 실행.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import string
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from bench.stats import percentile
+
+AGENT_PREFIXES = {
+    "dc": "data_collector",
+    "ib": "itinerary_builder",
+    "bm": "budget_manager",
+    "rg": "report_generator",
+}
+
+
+def _random_text(rng: random.Random, length: int) -> str:
+    return "".join(rng.choices(string.ascii_letters + " ", k=length))
+
+
+def make_agent_response(target_bytes: int, seed: int = 0) -> dict:
+    """
+    LLM 응답과 비슷한 모양(중첩 dict/list, 문자열, 숫자)의 JSON 객체를
+    직렬화 크기가 target_bytes 근처가 되도록 생성.
+    """
+    rng = random.Random(seed)
+    items = []
+    size = 0
+    while size < target_bytes:
+        item = {
+            "name": _random_text(rng, 24),
+            "city": rng.choice(["Tokyo", "Kyoto", "Osaka"]),
+            "price": rng.randint(10, 500),
+            "notes": _random_text(rng, 160),
+            "tags": [_random_text(rng, 8) for _ in range(3)],
+        }
+        items.append(item)
+        size += len(json.dumps(item))
+    return {"items": items, "summary": {"count": len(items), "currency": "USD"}}
+
+
+def make_status_row(response_bytes: int) -> dict:
+    """
+    get_full_workflow_status_join 조회 결과와 같은 키를 가진 가짜 row를 생성.
+    asyncpg는 jsonb를 문자열로 반환하므로 response는 JSON 문자열로 둠.
+    """
+    now = datetime.now(timezone.utc)
+    row = {
+        "workflow_id": uuid.uuid4(),
+        "created_at": now,
+        "model": "openai/gpt-4o-mini-2024-07-18",
+        "user_id": 1,
+        "started_at": now,
+        "ended_at": None,
+        "status": "running",
+    }
+    for i, prefix in enumerate(AGENT_PREFIXES):
+        row[f"{prefix}_id"] = i + 1
+        row[f"{prefix}_status"] = "completed"
+        row[f"{prefix}_response"] = json.dumps(make_agent_response(response_bytes, i))
+        row[f"{prefix}_codec"] = None
+        row[f"{prefix}_body"] = None
+        row[f"{prefix}_started_at"] = now - timedelta(seconds=30)
+        row[f"{prefix}_ended_at"] = now
+        row[f"{prefix}_model"] = "openai/gpt-4o-mini-2024-07-18"
+    return row
+
+
+def make_snapshot(response_bytes: int, parsed: bool) -> dict:
+    """
+    WebSocket으로 전송되는 스냅샷을 생성.
+    parsed=True 이면 응답을 파싱된 중첩 구조로 두어 재귀 순회 비용을 측정.
+    """
+    from app.db.database import workflow_status_from_row
+
+    snapshot = workflow_status_from_row(make_status_row(response_bytes))
+    snapshot["workflow"]["created_at"] = datetime.now(timezone.utc)
+    if parsed:
+        for agent in snapshot["agents"].values():
+            agent["response"] = json.loads(agent["response"])
+    return snapshot
+
+
+class FakeConnection:
+    """
+    save_agent_response 인코딩 비용만 측정하기 위한 가짜 DB 커넥션.
+    """
+
+    async def execute(self, query, *args):
+        return "UPDATE 1"
+
+    def transaction(self):
+        return FakeTransaction()
+
+
+class FakeTransaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeWebSocket:
+    """
+    Starlette WebSocket과 같은 방식으로 메시지를 직렬화하지만 네트워크로 보내지 않는 가짜 소켓.
+    """
+
+    async def send_json(self, data, mode: str = "text"):
+        text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        if mode == "binary":
+            text.encode("utf-8")
+
+    async def send_text(self, data: str):
+        return None
+
+    async def send_bytes(self, data: bytes):
+        return None
+
+
+def _measure(fn, iterations: int, rounds: int) -> list[float]:
+    fn()  # warmup
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        samples.append((time.perf_counter() - started) / iterations)
+    return samples
+
+
+async def _measure_async(fn, iterations: int, rounds: int) -> list[float]:
+    await fn()  # warmup
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await fn()
+        samples.append((time.perf_counter() - started) / iterations)
+    return samples
+
+
+def _summary(samples: list[float], iterations: int) -> dict:
+    return {
+        "median_us": percentile(samples, 50) * 1e6,
+        "min_us": min(samples) * 1e6,
+        "p95_us": percentile(samples, 95) * 1e6,
+        "rounds": len(samples),
+        "iterations": iterations,
+    }
+
+
+def bench_cpu(rounds: int) -> dict:
+    """
+    DB 없이 실행 가능한 CPU 바운드 벤치마크.
+    """
+    from app.api.websocket import convert_datetime_to_str
+    from app.db.database import workflow_status_from_row
+
+    results = {}
+    for kb in (10, 200):
+        row = make_status_row(kb * 1024)
+        samples = _measure(lambda: workflow_status_from_row(row), 2000, rounds)
+        results[f"status_row_to_dict[{kb}kb]"] = _summary(samples, 2000)
+
+    for kb in (100, 500):
+        for parsed in (False, True):
+            snapshot = make_snapshot(kb * 1024 // 4, parsed)
+            label = "parsed" if parsed else "raw"
+            iterations = 20 if parsed else 2000
+            samples = _measure(
+                lambda: convert_datetime_to_str(snapshot), iterations, rounds
+            )
+            results[f"convert_datetime_to_str[{kb}kb,{label}]"] = _summary(
+                samples, iterations
+            )
+    return results
+
+
+async def bench_async(rounds: int) -> dict:
+    """
+    이벤트 루프 위에서 실행되는 벤치마크 (save_agent_response, broadcast).
+    """
+    from app.api.websocket import ConnectionManager, convert_datetime_to_str
+    from app.db.utils import save_agent_response
+
+    results = {}
+    conn = FakeConnection()
+    created_at = datetime.now(timezone.utc)
+    for kb in (10, 200):
+        response = make_agent_response(kb * 1024)
+        samples = await _measure_async(
+            lambda: save_agent_response(
+                conn, "data_collector", "wf", created_at, "completed", response
+            ),
+            50,
+            rounds,
+        )
+        results[f"save_agent_response[{kb}kb,dict]"] = _summary(samples, 50)
+
+    snapshot = convert_datetime_to_str(make_snapshot(8 * 1024, parsed=False))
+    message = {"type": "update", "data": snapshot}
+    for fanout in (1, 100, 1000):
+        manager = ConnectionManager()
+        manager.active_connections["wf"] = [FakeWebSocket() for _ in range(fanout)]
+        iterations = max(1, 1000 // fanout)
+        samples = await _measure_async(
+            lambda: manager.broadcast("wf", message), iterations, rounds
+        )
+        results[f"broadcast[{fanout}]"] = _summary(samples, iterations)
+    return results
+
+
+async def bench_db(rounds: int) -> dict:
+    """
+    로컬 Postgres에 대한 agent 시작 쿼리(_start_sql) 왕복 벤치마크.
+    itinerary_builder를 running으로 바꾸면서 압축 저장된 data_collector 결과를 함께 조회.
+    테스트용 workflow를 만들고 측정 후 삭제.
+    """
+    import asyncpg
+
+    from app.agents.base import _start_sql
+    from app.db.utils import save_agent_response
+
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        return {}
+    try:
+        conn = await asyncpg.connect(database_url, timeout=5)
+    except (OSError, asyncpg.PostgresError, asyncio.TimeoutError) as e:
+        print(f"DB 벤치마크 건너뜀: {e}", file=sys.stderr)
+        return {}
+
+    results = {}
+    workflow_id = str(uuid.uuid4())
+    try:
+        user_id = await conn.fetchval("SELECT user_id FROM users ORDER BY user_id LIMIT 1")
+        created_at = await conn.fetchval(
+            "INSERT INTO workflow (workflow_id, user_id) VALUES ($1, $2) RETURNING created_at",
+            workflow_id,
+            user_id,
+        )
+        for agent in ("data_collector", "itinerary_builder"):
+            await conn.execute(
+                f"INSERT INTO {agent} (workflow_id, created_at) VALUES ($1, $2)",
+                workflow_id,
+                created_at,
+            )
+        await save_agent_response(
+            conn,
+            "data_collector",
+            workflow_id,
+            created_at,
+            "completed",
+            make_agent_response(50 * 1024),
+        )
+        query = _start_sql("itinerary_builder", ("data_collector",))
+        samples = await _measure_async(
+            lambda: conn.fetch(
+                query, workflow_id, created_at, datetime.now(timezone.utc)
+            ),
+            100,
+            rounds,
+        )
+        results["agent_start[db]"] = _summary(samples, 100)
+    finally:
+        await conn.execute("DELETE FROM workflow WHERE workflow_id = $1", workflow_id)
+        await conn.close()
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(rounds: int, only: str | None, skip_db: bool) -> dict:
+    """
+    전체 벤치마크를 실행하고 메타 정보와 함께 결과를 반환.
+    """
+    benchmarks = bench_cpu(rounds)
+    benchmarks.update(asyncio.run(bench_async(rounds)))
+    if not skip_db:
+        benchmarks.update(asyncio.run(bench_db(rounds)))
+    if only:
+        benchmarks = {k: v for k, v in benchmarks.items() if only in k}
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "benchmarks": benchmarks,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    중앙값 기준으로 baseline과 비교한 표를 출력하고,
+    threshold 비율 이상 느려진 벤치마크 이름 목록을 반환.
+    """
+    regressions = []
+    print(f"{'benchmark':<44} {'baseline(us)':>14} {'current(us)':>14} {'change':>9}")
+    for name, result in current["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if not base:
+            print(f"{name:<44} {'-':>14} {result['median_us']:>14.2f} {'new':>9}")
+            continue
+        change = result["median_us"] / base["median_us"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  << REGRESSION"
+        print(
+            f"{name:<44} {base['median_us']:>14.2f} {result['median_us']:>14.2f} {change:>+8.1%}{flag}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DB/WebSocket 핫패스 마이크로벤치마크")
+    parser.add_argument("--rounds", type=int, default=15, help="벤치마크별 반복 라운드 수")
+    parser.add_argument("--only", help="이름에 해당 문자열이 포함된 벤치마크만 실행")
+    parser.add_argument("--skip-db", action="store_true", help="Postgres 벤치마크 제외")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일 경로")
+    parser.add_argument("--compare", help="비교할 baseline JSON 파일 경로")
+    parser.add_argument(
+        "--threshold", type=float, default=0.15, help="회귀로 판단할 중앙값 증가 비율"
+    )
+    args = parser.parse_args()
+
+    current = run_benchmarks(args.rounds, args.only, args.skip_db)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)}개 벤치마크 회귀: {', '.join(regressions)}")
+            sys.exit(1)
+    else:
+        for name, result in current["benchmarks"].items():
+            print(f"{name:<44} median {result['median_us']:>12.2f}us  p95 {result['p95_us']:>12.2f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,519 @@
+# 로컬 OpenAI 호환 목(mock) LLM 서버
+"""
+실제 토큰을 소비하지 않고 부하 테스트를 하기 위한 OpenAI 호환 스트리밍 서버.
+
+사용 예:
+    python -m bench.mock_llm --port 9000 --ttft-ms 300 --tokens-per-sec 80 --error-rate 0.01
+
+애플리케이션에서는 LLM_BASE_URL=http://<host>:9000/v1 로 지정하여 사용.
+오프라인 배치 실행(app.agents.batch)을 위한 /v1/files, /v1/batches 도 제공.
+"""
+import argparse
+import asyncio
+import email.parser
+import email.policy
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+# system prompt 문구로 어떤 에이전트의 요청인지 판별
+AGENT_MARKERS = {
+    "Data Collector": "data_collector",
+    "Budget Manager": "budget_manager",
+    "Itinerary Builder": "itinerary_builder",
+    "Report Generator": "report_generator",
+}
+
+DEFAULT_PAYLOADS = {
+    "data_collector": {
+        "preferences": {
+            "total_budget": 3000,
+            "preferred_route": ["Tokyo", "Kyoto", "Osaka"],
+            "accommodation_type": "3-star hotel",
+            "travel_dates": {"start_date": "2025-10-01", "end_date": "2025-10-05"},
+            "special_interests": ["onsen", "local cuisine", "temple visits"],
+        },
+        "flights": [
+            {"route": "ICN-NRT", "airline": "Korean Air", "flight": "KE703", "price": 380},
+            {"route": "KIX-ICN", "airline": "Asiana", "flight": "OZ113", "price": 360},
+        ],
+        "hotels": [
+            {"city": "Tokyo", "name": "Hotel Gracery Shinjuku", "nights": 2, "price_per_night": 140},
+            {"city": "Kyoto", "name": "Hotel Vischio Kyoto", "nights": 1, "price_per_night": 150},
+            {"city": "Osaka", "name": "Hotel Monterey Osaka", "nights": 1, "price_per_night": 130},
+        ],
+        "transport": {"jr_pass_7day": 350, "regional_transfers": 60},
+        "attractions": [
+            {"city": "Tokyo", "name": "Senso-ji", "hours": "06:00-17:00", "fee": 0},
+            {"city": "Kyoto", "name": "Kinkaku-ji", "hours": "09:00-17:00", "fee": 4},
+            {"city": "Osaka", "name": "Osaka Castle", "hours": "09:00-17:00", "fee": 6},
+        ],
+        "weather": [
+            {"date": "2025-10-01", "city": "Tokyo", "forecast": "sunny", "high": 24},
+            {"date": "2025-10-02", "city": "Tokyo", "forecast": "cloudy", "high": 23},
+            {"date": "2025-10-03", "city": "Kyoto", "forecast": "rain", "high": 22},
+            {"date": "2025-10-04", "city": "Osaka", "forecast": "sunny", "high": 25},
+            {"date": "2025-10-05", "city": "Osaka", "forecast": "sunny", "high": 25},
+        ],
+    },
+    "budget_manager": {
+        "allocated": {"flights": 800, "accommodation": 1000, "transport": 200, "meals": 600, "entrance_fees": 400},
+        "spent": {"flights": 740, "accommodation": 560, "transport": 60, "meals": 450, "entrance_fees": 10},
+        "remaining": {"flights": 60, "accommodation": 440, "transport": 140, "meals": 150, "entrance_fees": 390},
+        "alternatives": [],
+    },
+    "itinerary_builder": {
+        f"day{i}": {
+            "city": city,
+            "morning": "Temple visit",
+            "lunch": "Local cuisine",
+            "afternoon": "Sightseeing",
+            "evening": "Dinner and transfer planning",
+        }
+        for i, city in enumerate(["Tokyo", "Tokyo", "Kyoto", "Osaka", "Osaka"], start=1)
+    },
+    "report_generator": (
+        "# Japan Trip Report\n\n"
+        "## Trip Overview\n2025-10-01 to 2025-10-05, Tokyo → Kyoto → Osaka, 3000 USD\n\n"
+        "## Budget Summary\n| Category | Allocated | Spent | Remaining |\n|---|---|---|---|\n"
+        "| Flights | 800 | 740 | 60 |\n| Accommodation | 1000 | 560 | 440 |\n"
+    ),
+}
+
+
+class MockConfig:
+    """
+    목 서버의 동작을 결정하는 설정값 모음.
+    실행 중에도 /mock/config 로 조회 및 변경 가능.
+    """
+
+    def __init__(
+        self,
+        ttft_ms: float = 300.0,
+        tokens_per_sec: float = 80.0,
+        chars_per_token: int = 4,
+        error_rate: float = 0.0,
+        error_mode: str = "http",
+        jitter: float = 0.1,
+        payloads: dict | None = None,
+        batch_delay_ms: float = 2000.0,
+    ):
+        self.ttft_ms = ttft_ms
+        self.tokens_per_sec = tokens_per_sec
+        self.chars_per_token = chars_per_token
+        self.error_rate = error_rate
+        self.error_mode = error_mode  # "http": 500 응답, "stream": 스트림 도중 연결 종료
+        self.jitter = jitter
+        # 배치 하나가 in_progress 상태로 머무는 시간 (요청 수와 무관)
+        self.batch_delay_ms = batch_delay_ms
+        self.payloads = dict(DEFAULT_PAYLOADS)
+        if payloads:
+            self.payloads.update(payloads)
+        # 모델별로 ttft_ms, tokens_per_sec, error_rate를 다르게 지정 (모델 라우팅/폴백 테스트용)
+        self.models: dict[str, dict] = {}
+
+    def for_model(self, model: str, key: str) -> float:
+        """
+        모델별 설정이 있으면 그 값을, 없으면 전체 설정 값을 반환.
+        """
+        return float(self.models.get(model, {}).get(key, getattr(self, key)))
+
+    def to_dict(self) -> dict:
+        return {
+            "ttft_ms": self.ttft_ms,
+            "tokens_per_sec": self.tokens_per_sec,
+            "chars_per_token": self.chars_per_token,
+            "error_rate": self.error_rate,
+            "error_mode": self.error_mode,
+            "jitter": self.jitter,
+            "batch_delay_ms": self.batch_delay_ms,
+            "models": self.models,
+            "agents": sorted(self.payloads),
+        }
+
+    def update(self, values: dict):
+        for key in ("ttft_ms", "tokens_per_sec", "error_rate", "jitter", "batch_delay_ms"):
+            if key in values:
+                setattr(self, key, float(values[key]))
+        if "chars_per_token" in values:
+            self.chars_per_token = max(1, int(values["chars_per_token"]))
+        if "error_mode" in values:
+            self.error_mode = values["error_mode"]
+        if "payloads" in values:
+            self.payloads.update(values["payloads"])
+        if "models" in values:
+            # null을 지정한 모델은 설정 제거
+            for model, overrides in values["models"].items():
+                if overrides is None:
+                    self.models.pop(model, None)
+                else:
+                    self.models[model] = overrides
+
+
+config = MockConfig()
+app = FastAPI(title="Mock LLM")
+
+# 업로드된 파일 (file_id -> {"meta": 파일 객체, "content": bytes}) 및 배치 (batch_id -> 배치 객체)
+files: dict[str, dict] = {}
+batches: dict[str, dict] = {}
+
+
+def _detect_agent(messages: list[dict]) -> str | None:
+    """
+    요청 메시지의 system/user 프롬프트에서 에이전트 종류를 판별.
+    """
+    for message in messages:
+        content = message.get("content") or ""
+        if not isinstance(content, str):
+            continue
+        for marker, agent in AGENT_MARKERS.items():
+            if marker in content:
+                return agent
+    return None
+
+
+def _payload_text(agent: str | None) -> str:
+    """
+    에이전트별 canned 응답을 문자열로 반환. dict/list는 JSON 문자열로 직렬화.
+    """
+    payload = config.payloads.get(agent, {"message": "mock response"})
+    if isinstance(payload, str):
+        return payload
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def _truncate(text: str, max_tokens) -> tuple[str, str]:
+    """
+    max_tokens를 넘는 응답은 잘라서 finish_reason="length"로 반환 (출력 토큰 예산 테스트용).
+    """
+    if max_tokens and len(text) > int(max_tokens) * config.chars_per_token:
+        return text[: int(max_tokens) * config.chars_per_token], "length"
+    return text, "stop"
+
+
+def _jittered(seconds: float) -> float:
+    if config.jitter <= 0:
+        return seconds
+    return max(0.0, seconds * random.uniform(1 - config.jitter, 1 + config.jitter))
+
+
+def _usage(messages: list[dict], text: str) -> dict:
+    prompt_tokens = sum(len(m.get("content") or "") for m in messages) // config.chars_per_token
+    completion_tokens = max(1, len(text) // config.chars_per_token)
+    # 프롬프트 캐시 흉내: 1024 토큰 이상이면 앞부분 절반을 128 토큰 단위로 캐시된 것으로 처리
+    cached_tokens = prompt_tokens // 2 // 128 * 128 if prompt_tokens >= 1024 else 0
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+        "prompt_tokens_details": {"cached_tokens": cached_tokens},
+    }
+
+
+def _chunk(completion_id: str, model: str, delta: dict, finish_reason=None) -> str:
+    body = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(body, ensure_ascii=False)}\n\n"
+
+
+async def _stream_completion(body: dict, text: str, finish_reason: str = "stop"):
+    """
+    TTFT 만큼 대기 후 tokens_per_sec 속도로 토큰 단위 SSE 청크를 전송.
+    """
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    model = body.get("model", "mock-model")
+    step = config.chars_per_token
+    pieces = [text[i : i + step] for i in range(0, len(text), step)]
+    fail_at = None
+    if config.error_mode == "stream" and random.random() < config.for_model(model, "error_rate"):
+        fail_at = random.randint(0, max(0, len(pieces) - 1))
+
+    await asyncio.sleep(_jittered(config.for_model(model, "ttft_ms") / 1000))
+    yield _chunk(completion_id, model, {"role": "assistant", "content": ""})
+
+    tokens_per_sec = config.for_model(model, "tokens_per_sec")
+    interval = 1 / tokens_per_sec if tokens_per_sec > 0 else 0
+    started = time.perf_counter()
+    for i, piece in enumerate(pieces):
+        if fail_at is not None and i == fail_at:
+            raise RuntimeError("mock stream failure")
+        yield _chunk(completion_id, model, {"content": piece})
+        # 누적 기준으로 대기 시간을 맞춰 sleep 오차가 쌓이지 않도록 함
+        delay = started + (i + 1) * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    yield _chunk(completion_id, model, {}, finish_reason=finish_reason)
+    if (body.get("stream_options") or {}).get("include_usage"):
+        # 사용량은 choices가 빈 마지막 청크로 전송 (OpenAI와 동일)
+        usage_chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [],
+            "usage": _usage(body.get("messages", []), text),
+        }
+        yield f"data: {json.dumps(usage_chunk, ensure_ascii=False)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    messages = body.get("messages", [])
+    text, finish_reason = _truncate(_payload_text(_detect_agent(messages)), body.get("max_tokens"))
+    model = body.get("model", "mock-model")
+
+    if config.error_mode == "http" and random.random() < config.for_model(model, "error_rate"):
+        return JSONResponse(
+            status_code=500,
+            content={"error": {"message": "mock upstream error", "type": "server_error"}},
+        )
+
+    if body.get("stream"):
+        return StreamingResponse(
+            _stream_completion(body, text, finish_reason), media_type="text/event-stream"
+        )
+
+    # 비스트리밍 요청은 전체 생성 시간만큼 대기 후 한 번에 응답
+    tokens = max(1, len(text) // config.chars_per_token)
+    tokens_per_sec = config.for_model(model, "tokens_per_sec")
+    generation = tokens / tokens_per_sec if tokens_per_sec > 0 else 0
+    await asyncio.sleep(_jittered(config.for_model(model, "ttft_ms") / 1000) + generation)
+    return _completion_body(model, messages, text, finish_reason)
+
+
+def _completion_body(
+    model: str, messages: list[dict], text: str, finish_reason: str = "stop"
+) -> dict:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": finish_reason,
+            }
+        ],
+        "usage": _usage(messages, text),
+    }
+
+
+def _file_object(file_id: str, filename: str, size: int, purpose: str) -> dict:
+    return {
+        "id": file_id,
+        "object": "file",
+        "bytes": size,
+        "created_at": int(time.time()),
+        "filename": filename,
+        "purpose": purpose,
+        "status": "processed",
+    }
+
+
+def _store_file(content: bytes, filename: str, purpose: str) -> dict:
+    file_id = f"file-{uuid.uuid4().hex}"
+    meta = _file_object(file_id, filename, len(content), purpose)
+    files[file_id] = {"meta": meta, "content": content}
+    return meta
+
+
+@app.post("/v1/files")
+async def upload_file(request: Request):
+    # python-multipart 의존성 없이 multipart/form-data 본문을 파싱
+    raw = await request.body()
+    header = f"Content-Type: {request.headers.get('content-type', '')}\r\n\r\n".encode()
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(header + raw)
+    content, filename, purpose = b"", "upload.jsonl", "batch"
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if name == "file":
+            content = part.get_payload(decode=True) or b""
+            filename = part.get_filename() or filename
+        elif name == "purpose":
+            purpose = part.get_content().strip()
+    return _store_file(content, filename, purpose)
+
+
+@app.get("/v1/files/{file_id}")
+async def get_file(file_id: str):
+    if file_id not in files:
+        return JSONResponse(status_code=404, content={"error": {"message": "file not found"}})
+    return files[file_id]["meta"]
+
+
+@app.get("/v1/files/{file_id}/content")
+async def get_file_content(file_id: str):
+    if file_id not in files:
+        return JSONResponse(status_code=404, content={"error": {"message": "file not found"}})
+    return Response(content=files[file_id]["content"], media_type="application/jsonl")
+
+
+async def _process_batch(batch: dict):
+    """
+    입력 파일의 요청을 모두 처리하여 결과/에러 파일을 만들고 배치를 완료 상태로 바꿈.
+    요청별 실패 여부는 모델별 error_rate를 따름.
+    """
+    batch["status"] = "in_progress"
+    batch["in_progress_at"] = int(time.time())
+    await asyncio.sleep(_jittered(config.batch_delay_ms / 1000))
+    if batch["status"] != "in_progress":
+        return
+
+    outputs, errors = [], []
+    for raw in files[batch["input_file_id"]]["content"].decode("utf-8").splitlines():
+        if not raw.strip():
+            continue
+        line = json.loads(raw)
+        body = line.get("body", {})
+        model = body.get("model", "mock-model")
+        messages = body.get("messages", [])
+        result = {"id": f"batch_req_{uuid.uuid4().hex}", "custom_id": line.get("custom_id"), "error": None}
+        if random.random() < config.for_model(model, "error_rate"):
+            result["response"] = {
+                "status_code": 500,
+                "request_id": uuid.uuid4().hex,
+                "body": {"error": {"message": "mock upstream error", "type": "server_error"}},
+            }
+            errors.append(result)
+        else:
+            text, finish_reason = _truncate(
+                _payload_text(_detect_agent(messages)), body.get("max_tokens")
+            )
+            result["response"] = {
+                "status_code": 200,
+                "request_id": uuid.uuid4().hex,
+                "body": _completion_body(model, messages, text, finish_reason),
+            }
+            outputs.append(result)
+
+    def to_jsonl(lines: list[dict]) -> bytes:
+        return "\n".join(json.dumps(line, ensure_ascii=False) for line in lines).encode("utf-8")
+
+    if outputs:
+        batch["output_file_id"] = _store_file(to_jsonl(outputs), "batch_output.jsonl", "batch_output")["id"]
+    if errors:
+        batch["error_file_id"] = _store_file(to_jsonl(errors), "batch_errors.jsonl", "batch_output")["id"]
+    batch["request_counts"] = {
+        "total": len(outputs) + len(errors),
+        "completed": len(outputs),
+        "failed": len(errors),
+    }
+    batch["status"] = "completed"
+    batch["completed_at"] = int(time.time())
+
+
+@app.post("/v1/batches")
+async def create_batch(request: Request):
+    body = await request.json()
+    input_file_id = body.get("input_file_id")
+    if input_file_id not in files:
+        return JSONResponse(status_code=404, content={"error": {"message": "input file not found"}})
+    batch_id = f"batch_{uuid.uuid4().hex}"
+    total = sum(1 for raw in files[input_file_id]["content"].splitlines() if raw.strip())
+    batch = {
+        "id": batch_id,
+        "object": "batch",
+        "endpoint": body.get("endpoint", "/v1/chat/completions"),
+        "errors": None,
+        "input_file_id": input_file_id,
+        "completion_window": body.get("completion_window", "24h"),
+        "status": "validating",
+        "output_file_id": None,
+        "error_file_id": None,
+        "created_at": int(time.time()),
+        "request_counts": {"total": total, "completed": 0, "failed": 0},
+        "metadata": body.get("metadata"),
+    }
+    batches[batch_id] = batch
+    asyncio.create_task(_process_batch(batch))
+    return batch
+
+
+@app.get("/v1/batches/{batch_id}")
+async def get_batch(batch_id: str):
+    if batch_id not in batches:
+        return JSONResponse(status_code=404, content={"error": {"message": "batch not found"}})
+    return batches[batch_id]
+
+
+@app.post("/v1/batches/{batch_id}/cancel")
+async def cancel_batch(batch_id: str):
+    if batch_id not in batches:
+        return JSONResponse(status_code=404, content={"error": {"message": "batch not found"}})
+    batch = batches[batch_id]
+    if batch["status"] not in ("completed", "failed", "expired", "cancelled"):
+        batch["status"] = "cancelled"
+        batch["cancelled_at"] = int(time.time())
+    return batch
+
+
+@app.get("/v1/models")
+async def list_models():
+    models = ["openai/gpt-4o-mini-2024-07-18", *config.models]
+    return {
+        "object": "list",
+        "data": [{"id": model, "object": "model", "owned_by": "mock"} for model in models],
+    }
+
+
+@app.get("/mock/config")
+async def get_config():
+    return config.to_dict()
+
+
+@app.put("/mock/config")
+async def put_config(request: Request):
+    config.update(await request.json())
+    return config.to_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI 호환 목 LLM 서버")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--ttft-ms", type=float, default=300.0, help="첫 토큰까지 지연(ms)")
+    parser.add_argument("--tokens-per-sec", type=float, default=80.0, help="초당 토큰 생성 속도")
+    parser.add_argument("--chars-per-token", type=int, default=4, help="토큰 1개당 문자 수")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="요청 실패 확률 (0~1)")
+    parser.add_argument("--error-mode", choices=["http", "stream"], default="http")
+    parser.add_argument("--jitter", type=float, default=0.1, help="지연 시간 무작위 편차 비율")
+    parser.add_argument("--payloads", help="에이전트별 canned 응답 JSON 파일 경로")
+    parser.add_argument("--batch-delay-ms", type=float, default=2000.0, help="배치 처리 시간(ms)")
+    args = parser.parse_args()
+
+    payloads = None
+    if args.payloads:
+        with open(args.payloads, encoding="utf-8") as f:
+            payloads = json.load(f)
+
+    global config
+    config = MockConfig(
+        ttft_ms=args.ttft_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        chars_per_token=max(1, args.chars_per_token),
+        error_rate=args.error_rate,
+        error_mode=args.error_mode,
+        jitter=args.jitter,
+        payloads=payloads,
+        batch_delay_ms=args.batch_delay_ms,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# 벤치마크 공통 통계 유틸
+import math
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """
+    선형 보간 방식으로 백분위수를 계산.
+
+    Args:
+        values (list[float]): 측정값 리스트
+        pct (float): 0~100 사이의 백분위
+
+    Returns:
+        float | None: 백분위수 값, 측정값이 없으면 None
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(values: list[float]) -> dict:
+    """
+    측정값 리스트를 count / mean / p50 / p95 / p99 / max 요약으로 변환.
+
+    Args:
+        values (list[float]): 측정값 리스트
+
+    Returns:
+        dict: 요약 통계 딕셔너리
+    """
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values) if values else None,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None,
+    }
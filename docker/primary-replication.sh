@@ -0,0 +1,4 @@
+#!/bin/bash
+# 복제본(db-replica)이 스트리밍 복제로 접속할 수 있도록 허용 (새 데이터 디렉터리 초기화 시 1회 실행)
+set -e
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
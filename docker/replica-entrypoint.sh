@@ -0,0 +1,16 @@
+#!/bin/bash
+# 읽기 전용 복제본: 데이터 디렉터리가 비어 있으면 primary(db)에서 베이스 백업을 받아 스트리밍 복제로 시작
+set -e
+export PGDATA="${PGDATA:-/var/lib/postgresql/data}"
+mkdir -p "$PGDATA"
+chown postgres:postgres "$PGDATA"
+chmod 700 "$PGDATA"
+
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+  until gosu postgres pg_basebackup -h "${PRIMARY_HOST:-db}" -U "$POSTGRES_USER" -D "$PGDATA" -R -X stream -c fast; do
+    echo "primary 대기 중..."
+    sleep 2
+  done
+fi
+
+exec gosu postgres postgres -c hot_standby=on
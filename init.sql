@@ -5,122 +5,474 @@ create table if not exists users
     user_id serial primary key,
     created_at timestamptz not null default current_timestamp,
     name varchar(255) not null unique,
-    auth_token varchar(255) not null
+    auth_token varchar(255) not null,
+    token_quota bigint,
+    cost_quota_usd double precision
 );
+-- 기존 DB에 쿼터 컬럼 추가
+alter table users add column if not exists token_quota bigint;
+alter table users add column if not exists cost_quota_usd double precision;
 comment on table users is '유저 테이블';
 comment on column users.user_id is '유저 고유 ID';
 comment on column users.created_at is '생성일시';
 comment on column users.name is '유저 - 과제용 임시 아이디, 비밀번호 X';
 comment on column users.auth_token is '권한 확인용 토큰 (유효기간 만료 시 재발급 로직은 반영X)';
+comment on column users.token_quota is '기간(USAGE_QUOTA_PERIOD)당 최대 토큰 수 - null이면 USAGE_TOKEN_QUOTA 사용, 0이면 무제한';
+comment on column users.cost_quota_usd is '기간(USAGE_QUOTA_PERIOD)당 최대 비용(USD) - null이면 USAGE_COST_QUOTA_USD 사용, 0이면 무제한';
+
+-- 사용자별 일 단위 LLM 토큰 사용량 및 비용 집계 (agent 실행이 끝날 때마다 누적, 쿼터 확인에 사용)
+create table if not exists user_usage
+(
+    user_id integer not null references users (user_id) on delete cascade,
+    usage_date date not null,
+    prompt_tokens bigint not null default 0,
+    completion_tokens bigint not null default 0,
+    cached_tokens bigint not null default 0,
+    cost_usd double precision not null default 0,
+    primary key (user_id, usage_date)
+);
+comment on table user_usage is '사용자별 일 단위 LLM 사용량 집계';
+comment on column user_usage.user_id is 'users 테이블의 외래키';
+comment on column user_usage.usage_date is '사용 일자 (UTC)';
+comment on column user_usage.prompt_tokens is '입력 토큰 수';
+comment on column user_usage.completion_tokens is '출력 토큰 수';
+comment on column user_usage.cached_tokens is '입력 토큰 중 프롬프트 캐시에서 처리된 토큰 수';
+comment on column user_usage.cost_usd is '추정 비용(USD) - MODEL_PRICES 기준';
 
 -- 워크플로우 상태 Enum 타입 생성
 do $$
 begin
     if not exists (select 1 from pg_type where typname = 'status_enum') then
-        create type status_enum as Enum ('pending', 'running', 'completed', 'failed');
+        create type status_enum as Enum ('pending', 'running', 'completed', 'failed', 'cancelled');
+    end if;
+end
+$$ language plpgsql;
+-- 기존 DB에 취소 상태 추가
+alter type status_enum add value if not exists 'cancelled';
+
+-- 기존 DB 마이그레이션 (1/2): 파티션 도입 전의 일반 테이블이 있으면 *_unpartitioned로 이름을 바꿔 두고,
+-- 아래에서 파티션 테이블을 만든 뒤 파일 끝의 마이그레이션 (2/2)에서 데이터를 옮기고 삭제
+-- (인덱스 이름이 새 테이블의 create index if not exists와 겹치지 않도록 인덱스 이름도 변경)
+do $$
+declare
+    v_table text;
+    v_index text;
+begin
+    if not exists (select 1 from pg_class where oid = to_regclass('workflow') and relkind = 'r') then
+        return;
     end if;
+    foreach v_table in array array['data_collector', 'itinerary_builder', 'budget_manager', 'report_generator', 'workflow'] loop
+        continue when to_regclass(v_table) is null;
+        execute format('alter table %I rename to %I', v_table, v_table || '_unpartitioned');
+        for v_index in
+            select c.relname from pg_index i join pg_class c on c.oid = i.indexrelid
+            where i.indrelid = (v_table || '_unpartitioned')::regclass
+        loop
+            execute format('alter index %I rename to %I', v_index, left(v_index, 50) || '_unpartitioned');
+        end loop;
+    end loop;
 end
 $$ language plpgsql;
 
+-- workflow 및 agent 테이블은 created_at 기준 월 단위 파티션 테이블
+-- (오래된 파티션은 app/db/retention.py 의 백그라운드 작업이 아카이브 후 제거)
 create table if not exists workflow
 (
-    workflow_id UUID primary key,
+    workflow_id UUID not null,
     created_at timestamptz not null default current_timestamp,
     model varchar(255) not null default 'openai/gpt-4o-mini-2024-07-18',
     user_id integer references users (user_id) on delete cascade, 
     started_at timestamptz,
     ended_at timestamptz,
-    status status_enum not null default 'running'
-);
+    status status_enum not null default 'running',
+    execution_mode varchar(16) not null default 'online',
+    prompt_tokens bigint not null default 0,
+    completion_tokens bigint not null default 0,
+    cached_tokens bigint not null default 0,
+    cost_usd double precision not null default 0,
+    parent_workflow_id UUID,
+    scenario jsonb,
+    event_seq bigint not null default 0,
+    -- 시나리오 워크플로우는 부모와 같은 created_at으로 저장 (같은 월 파티션, 보관 기간 만료 시 함께 정리)
+    -- parent_workflow_id는 외래키로 두지 않음: 자기 참조 외래키가 있으면 하위 워크플로우가 있는 월 파티션을 분리(DETACH)할 수 없음
+    primary key (workflow_id, created_at)
+) partition by range (created_at);
+-- 기존 DB의 자기 참조 외래키 제거
+alter table workflow drop constraint if exists workflow_parent_workflow_id_created_at_fkey;
+-- 기존 DB에 워크플로우별 이벤트 순번 컬럼 추가
+alter table workflow add column if not exists event_seq bigint not null default 0;
+-- 오프라인 배치 실행기가 대기 중인 워크플로우를 빠르게 찾기 위한 인덱스
+create index if not exists workflow_offline_idx on workflow (created_at) where execution_mode = 'offline' and status in ('pending', 'running');
+-- 워크플로우 목록 조회(GET /workflows)의 키셋 페이지네이션용 인덱스 (created_at, workflow_id 내림차순)
+create index if not exists workflow_user_created_idx on workflow (user_id, created_at desc, workflow_id desc);
+create index if not exists workflow_status_created_idx on workflow (status, created_at desc, workflow_id desc);
+-- 시나리오 묶음(부모 워크플로우)의 하위 워크플로우 조회용 인덱스
+create index if not exists workflow_parent_idx on workflow (parent_workflow_id) where parent_workflow_id is not null;
 comment on table workflow is 'workflow 테이블';
 comment on column workflow.workflow_id is '워크플로우 고유 ID';
-comment on column workflow.created_at is '생성 일시';
+comment on column workflow.created_at is '생성 일시 (파티션 키)';
 comment on column workflow.model is '사용된 모델 이름 (예: openai/gpt-4o)';
 comment on column workflow.user_id is 'users 테이블의 외래키 - 해당 워크플로우를 생성한 유저 ID';
 comment on column workflow.started_at is '시작 시간';
 comment on column workflow.ended_at is '종료 시간';
-comment on column workflow.status is 'workflow의 상태 - `pending`, `running`, `completed`, `failed`';
+comment on column workflow.status is 'workflow의 상태 - `pending`, `running`, `completed`, `failed`, `cancelled`';
+comment on column workflow.execution_mode is '실행 방식 - `online`(즉시 스트리밍 실행), `offline`(배치 API로 일괄 실행)';
+comment on column workflow.prompt_tokens is 'agent 입력 토큰 수 합계';
+comment on column workflow.completion_tokens is 'agent 출력 토큰 수 합계';
+comment on column workflow.cached_tokens is 'agent 입력 토큰 중 캐시된 토큰 수 합계';
+comment on column workflow.cost_usd is 'agent 추정 비용(USD) 합계';
+comment on column workflow.parent_workflow_id is '시나리오 워크플로우인 경우 데이터 수집을 공유하는 부모 워크플로우 ID';
+comment on column workflow.scenario is '시나리오 워크플로우의 파라미터 (이름, 예산, 배분, 경로 등)';
+comment on column workflow.event_seq is '마지막 상태 전이 이벤트 순번 (workflow_events.seq, 행 잠금 아래에서 커밋 순서대로 증가)';
 
-create table if not exists data_collector
+create table if not exists agent_response_content
 (
-    data_collector_id serial primary key,
+    content_hash bytea primary key,
     created_at timestamptz not null default current_timestamp,
-    workflow_id UUID references workflow (workflow_id) on delete cascade, -- 데이터의 정합성을 위해 cascade를 넣었지만, 데이터 보관 정책에 따라 변경 가능
+    codec varchar(16) not null,
+    raw_size integer not null,
+    body bytea not null
+);
+comment on table agent_response_content is '크기가 큰 agent 응답 본문을 압축하여 별도 보관하는 테이블 (내용 해시로 중복 제거)';
+comment on column agent_response_content.content_hash is '압축 전 응답 본문(JSON 텍스트)의 SHA-256 해시';
+comment on column agent_response_content.created_at is '생성 일시';
+comment on column agent_response_content.codec is '압축 방식 (예: lz4)';
+comment on column agent_response_content.raw_size is '압축 전 본문 크기(byte)';
+comment on column agent_response_content.body is '압축된 응답 본문';
+create index if not exists agent_response_content_created_at_idx on agent_response_content (created_at);
+
+create table if not exists data_collector
+(
+    data_collector_id serial,
+    created_at timestamptz not null, -- workflow.created_at과 동일한 값 (같은 월 파티션에 저장되도록 함)
+    workflow_id UUID not null,
     started_at timestamptz,
     ended_at timestamptz,
     status status_enum not null default 'pending',
-    response jsonb
-);
+    response jsonb,
+    response_ref bytea,
+    response_size integer,
+    model varchar(255),
+    prompt_tokens integer,
+    completion_tokens integer,
+    cached_tokens integer,
+    cost_usd double precision,
+    primary key (data_collector_id, created_at),
+    foreign key (workflow_id, created_at) references workflow (workflow_id, created_at) on delete cascade -- 데이터의 정합성을 위해 cascade를 넣었지만, 데이터 보관 정책에 따라 변경 가능
+) partition by range (created_at);
 comment on table data_collector is 'data_collector 테이블';
 comment on column data_collector.data_collector_id is '데이터 수집 고유 ID';
-comment on column data_collector.created_at is '생성 일시';
+comment on column data_collector.created_at is '생성 일시 - workflow.created_at과 동일 (파티션 키)';
 comment on column data_collector.workflow_id is '워크플로우 ID';
 comment on column data_collector.started_at is '시작 시간';
 comment on column data_collector.ended_at is '종료 시간';
-comment on column data_collector.status is 'data_collector agent의 상태 - `pending`, `running`, `completed`, `failed`';
+comment on column data_collector.status is 'data_collector agent의 상태 - `pending`, `running`, `completed`, `failed`, `cancelled`';
 comment on column data_collector.response is '반환값 - 성공 응답값 || 실패 에러값';
+comment on column data_collector.response_ref is '응답이 큰 경우 agent_response_content.content_hash 참조 (이때 response는 null)';
+comment on column data_collector.response_size is '응답 본문 크기(byte)';
+comment on column data_collector.model is '실제로 응답을 생성한 LLM 모델';
+comment on column data_collector.prompt_tokens is '입력 토큰 수';
+comment on column data_collector.completion_tokens is '출력 토큰 수';
+comment on column data_collector.cached_tokens is '입력 토큰 중 프롬프트 캐시에서 처리된 토큰 수';
+comment on column data_collector.cost_usd is '추정 비용(USD) - MODEL_PRICES 기준';
+create index if not exists data_collector_workflow_id_idx on data_collector (workflow_id);
+create index if not exists data_collector_response_ref_idx on data_collector (response_ref) where response_ref is not null;
 
 create table if not exists itinerary_builder
 (
-    itinerary_builder_id serial primary key,
-    created_at timestamptz not null default current_timestamp,
-    workflow_id UUID references workflow (workflow_id) on delete cascade, -- 데이터의 정합성을 위해 cascade를 넣었지만, 데이터 보관 정책에 따라 변경 가능
+    itinerary_builder_id serial,
+    created_at timestamptz not null, -- workflow.created_at과 동일한 값 (같은 월 파티션에 저장되도록 함)
+    workflow_id UUID not null,
     started_at timestamptz,
     ended_at timestamptz,
     status status_enum not null default 'pending',
-    response jsonb
-);
+    response jsonb,
+    response_ref bytea,
+    response_size integer,
+    model varchar(255),
+    prompt_tokens integer,
+    completion_tokens integer,
+    cached_tokens integer,
+    cost_usd double precision,
+    primary key (itinerary_builder_id, created_at),
+    foreign key (workflow_id, created_at) references workflow (workflow_id, created_at) on delete cascade -- 데이터의 정합성을 위해 cascade를 넣었지만, 데이터 보관 정책에 따라 변경 가능
+) partition by range (created_at);
 comment on table itinerary_builder is 'itinerary_builder 테이블';
 comment on column itinerary_builder.itinerary_builder_id is '일정 고유 ID';
-comment on column itinerary_builder.created_at is '생성 일시';
+comment on column itinerary_builder.created_at is '생성 일시 - workflow.created_at과 동일 (파티션 키)';
 comment on column itinerary_builder.workflow_id is '워크플로우 ID';
 comment on column itinerary_builder.started_at is '시작 시간';
 comment on column itinerary_builder.ended_at is '종료 시간';
-comment on column itinerary_builder.status is 'itinerary_builder agent의 상태 - `pending`, `running`, `completed`, `failed`';
+comment on column itinerary_builder.status is 'itinerary_builder agent의 상태 - `pending`, `running`, `completed`, `failed`, `cancelled`';
 comment on column itinerary_builder.response is '반환값 - 성공 응답값 || 실패 에러값';
+comment on column itinerary_builder.response_ref is '응답이 큰 경우 agent_response_content.content_hash 참조 (이때 response는 null)';
+comment on column itinerary_builder.response_size is '응답 본문 크기(byte)';
+comment on column itinerary_builder.model is '실제로 응답을 생성한 LLM 모델';
+comment on column itinerary_builder.prompt_tokens is '입력 토큰 수';
+comment on column itinerary_builder.completion_tokens is '출력 토큰 수';
+comment on column itinerary_builder.cached_tokens is '입력 토큰 중 프롬프트 캐시에서 처리된 토큰 수';
+comment on column itinerary_builder.cost_usd is '추정 비용(USD) - MODEL_PRICES 기준';
+create index if not exists itinerary_builder_workflow_id_idx on itinerary_builder (workflow_id);
+create index if not exists itinerary_builder_response_ref_idx on itinerary_builder (response_ref) where response_ref is not null;
 
 create table if not exists budget_manager
 (
-    budget_manager_id serial primary key,
-    created_at timestamptz not null default current_timestamp,
-    workflow_id UUID references workflow (workflow_id) on delete cascade, -- 데이터의 정합성을 위해 cascade를 넣었지만, 데이터 보관 정책에 따라 변경 가능
+    budget_manager_id serial,
+    created_at timestamptz not null, -- workflow.created_at과 동일한 값 (같은 월 파티션에 저장되도록 함)
+    workflow_id UUID not null,
     started_at timestamptz,
     ended_at timestamptz,
     status status_enum not null default 'pending',
-    response jsonb
-);
+    response jsonb,
+    response_ref bytea,
+    response_size integer,
+    model varchar(255),
+    prompt_tokens integer,
+    completion_tokens integer,
+    cached_tokens integer,
+    cost_usd double precision,
+    primary key (budget_manager_id, created_at),
+    foreign key (workflow_id, created_at) references workflow (workflow_id, created_at) on delete cascade -- 데이터의 정합성을 위해 cascade를 넣었지만, 데이터 보관 정책에 따라 변경 가능
+) partition by range (created_at);
 comment on table budget_manager is 'budget_manager 테이블';
 comment on column budget_manager.budget_manager_id is '예산 고유 ID';
-comment on column budget_manager.created_at is '생성 일시';
+comment on column budget_manager.created_at is '생성 일시 - workflow.created_at과 동일 (파티션 키)';
 comment on column budget_manager.workflow_id is '워크플로우 ID';
 comment on column budget_manager.started_at is '시작 시간';
 comment on column budget_manager.ended_at is '종료 시간';
-comment on column budget_manager.status is 'budget_manager agent의 상태 - `pending`, `running`, `completed`, `failed`';
+comment on column budget_manager.status is 'budget_manager agent의 상태 - `pending`, `running`, `completed`, `failed`, `cancelled`';
 comment on column budget_manager.response is '반환값 - 성공 응답값 || 실패 에러값';
+comment on column budget_manager.response_ref is '응답이 큰 경우 agent_response_content.content_hash 참조 (이때 response는 null)';
+comment on column budget_manager.response_size is '응답 본문 크기(byte)';
+comment on column budget_manager.model is '실제로 응답을 생성한 LLM 모델';
+comment on column budget_manager.prompt_tokens is '입력 토큰 수';
+comment on column budget_manager.completion_tokens is '출력 토큰 수';
+comment on column budget_manager.cached_tokens is '입력 토큰 중 프롬프트 캐시에서 처리된 토큰 수';
+comment on column budget_manager.cost_usd is '추정 비용(USD) - MODEL_PRICES 기준';
+create index if not exists budget_manager_workflow_id_idx on budget_manager (workflow_id);
+create index if not exists budget_manager_response_ref_idx on budget_manager (response_ref) where response_ref is not null;
 
 create table if not exists report_generator
 (
-    report_generator_id serial primary key,
-    created_at timestamptz not null default current_timestamp,
-    workflow_id UUID references workflow (workflow_id) on delete cascade, -- 데이터의 정합성을 위해 cascade를 넣었지만, 데이터 보관 정책에 따라 변경 가능
+    report_generator_id serial,
+    created_at timestamptz not null, -- workflow.created_at과 동일한 값 (같은 월 파티션에 저장되도록 함)
+    workflow_id UUID not null,
     started_at timestamptz,
     ended_at timestamptz,
     status status_enum not null default 'pending',
-    response jsonb
-);
+    response jsonb,
+    response_ref bytea,
+    response_size integer,
+    model varchar(255),
+    prompt_tokens integer,
+    completion_tokens integer,
+    cached_tokens integer,
+    cost_usd double precision,
+    primary key (report_generator_id, created_at),
+    foreign key (workflow_id, created_at) references workflow (workflow_id, created_at) on delete cascade -- 데이터의 정합성을 위해 cascade를 넣었지만, 데이터 보관 정책에 따라 변경 가능
+) partition by range (created_at);
 comment on table report_generator is 'report_generator 테이블';
 comment on column report_generator.report_generator_id is '리포트 고유 ID';
-comment on column report_generator.created_at is '생성 일시';
+comment on column report_generator.created_at is '생성 일시 - workflow.created_at과 동일 (파티션 키)';
 comment on column report_generator.workflow_id is '워크플로우 ID';
 comment on column report_generator.started_at is '시작 시간';
 comment on column report_generator.ended_at is '종료 시간';
-comment on column report_generator.status is 'report_generator agent의 상태 - `pending`, `running`, `completed`, `failed`';
+comment on column report_generator.status is 'report_generator agent의 상태 - `pending`, `running`, `completed`, `failed`, `cancelled`';
 comment on column report_generator.response is '반환값 - 성공 응답값 || 실패 에러값';
+comment on column report_generator.response_ref is '응답이 큰 경우 agent_response_content.content_hash 참조 (이때 response는 null)';
+comment on column report_generator.response_size is '응답 본문 크기(byte)';
+comment on column report_generator.model is '실제로 응답을 생성한 LLM 모델';
+comment on column report_generator.prompt_tokens is '입력 토큰 수';
+comment on column report_generator.completion_tokens is '출력 토큰 수';
+comment on column report_generator.cached_tokens is '입력 토큰 중 프롬프트 캐시에서 처리된 토큰 수';
+comment on column report_generator.cost_usd is '추정 비용(USD) - MODEL_PRICES 기준';
+create index if not exists report_generator_workflow_id_idx on report_generator (workflow_id);
+create index if not exists report_generator_response_ref_idx on report_generator (response_ref) where response_ref is not null;
+
+-- workflow/agent 상태 전이 로그 (추가 전용, WebSocket 재연결 시 놓친 이벤트 재전송에 사용)
+create table if not exists workflow_events
+(
+    seq bigint not null,
+    created_at timestamptz not null default current_timestamp,
+    workflow_id UUID not null,
+    agent varchar(32),
+    status status_enum not null,
+    primary key (workflow_id, seq, created_at)
+) partition by range (created_at);
+comment on table workflow_events is 'workflow 및 agent 상태 전이 이벤트 로그';
+comment on column workflow_events.seq is '워크플로우별 이벤트 순번 (1부터 빈틈없이 커밋 순서대로 증가, 재연결 시 since 기준)';
+comment on column workflow_events.created_at is '이벤트 발생 일시 (파티션 키)';
+comment on column workflow_events.workflow_id is '워크플로우 ID';
+comment on column workflow_events.agent is '상태가 바뀐 agent 테이블명 - null이면 workflow 자체의 상태 변경';
+comment on column workflow_events.status is '변경된 상태';
+
+-- 기존 DB: 전체 공용 순번(bigserial)을 워크플로우별 순번으로 변환
+do $$
+begin
+    if exists (
+        select 1 from pg_attrdef d
+        join pg_attribute a on a.attrelid = d.adrelid and a.attnum = d.adnum
+        where d.adrelid = 'workflow_events'::regclass and a.attname = 'seq'
+    ) then
+        alter table workflow_events alter column seq drop default;
+        alter table workflow_events drop constraint if exists workflow_events_pkey;
+        drop index if exists workflow_events_workflow_id_seq_idx;
+        update workflow_events e
+        set seq = r.seq
+        from (
+            select workflow_id, seq as old_seq, created_at,
+                   row_number() over (partition by workflow_id order by seq) as seq
+            from workflow_events
+        ) r
+        where e.workflow_id = r.workflow_id and e.seq = r.old_seq and e.created_at = r.created_at;
+        alter table workflow_events add primary key (workflow_id, seq, created_at);
+        update workflow w
+        set event_seq = e.seq
+        from (select workflow_id, max(seq) as seq from workflow_events group by workflow_id) e
+        where w.workflow_id = e.workflow_id;
+        drop sequence if exists workflow_events_seq_seq;
+    end if;
+end
+$$ language plpgsql;
+
+-- 상태 컬럼이 바뀔 때마다 workflow_events에 한 행을 추가하는 트리거 함수 (인자: agent 테이블명, workflow는 빈 문자열)
+-- 순번은 workflow 행의 event_seq를 올려서 받음: 행 잠금이 커밋까지 유지되므로 같은 워크플로우의
+-- 동시 트랜잭션(예: budget_manager와 itinerary_builder 동시 완료)은 순번 순서대로만 커밋되고,
+-- 조회하는 쪽에서 더 큰 순번이 보이면 그보다 작은 순번도 항상 보임
+create or replace function record_workflow_event()
+returns trigger as $$
+declare
+    v_seq bigint;
+begin
+    if tg_op = 'INSERT' or new.status is distinct from old.status then
+        update workflow
+        set event_seq = event_seq + 1
+        where workflow_id = new.workflow_id and created_at = new.created_at
+        returning event_seq into v_seq;
+        insert into workflow_events (workflow_id, seq, agent, status)
+        values (new.workflow_id, v_seq, nullif(tg_argv[0], ''), new.status);
+    end if;
+    return null;
+end
+$$ language plpgsql;
+
+drop trigger if exists workflow_events_trg on workflow;
+create trigger workflow_events_trg
+    after insert or update of status on workflow
+    for each row execute function record_workflow_event('');
+
+do $$
+declare
+    v_table text;
+begin
+    foreach v_table in array array['data_collector', 'itinerary_builder', 'budget_manager', 'report_generator'] loop
+        execute format('drop trigger if exists %I on %I', v_table || '_events_trg', v_table);
+        execute format(
+            'create trigger %I after update of status on %I for each row execute function record_workflow_event(%L)',
+            v_table || '_events_trg', v_table, v_table
+        );
+    end loop;
+end
+$$ language plpgsql;
+
+-- 월 단위 파티션 생성 함수 (UTC 기준 월 경계, 이미 있으면 건너뜀)
+create or replace function ensure_monthly_partitions(p_table text, p_start date, p_months integer)
+returns void as $$
+declare
+    v_from date := date_trunc('month', p_start)::date;
+    v_to date;
+begin
+    for i in 1..p_months loop
+        v_to := (v_from + interval '1 month')::date;
+        execute format(
+            'create table if not exists %I partition of %I for values from (%L) to (%L)',
+            format('%s_p%s', p_table, to_char(v_from, 'YYYY_MM')),
+            p_table,
+            v_from::timestamp at time zone 'UTC',
+            v_to::timestamp at time zone 'UTC'
+        );
+        v_from := v_to;
+    end loop;
+end
+$$ language plpgsql;
+
+-- 이번 달부터 3개월치 파티션과, 범위를 벗어난 데이터를 받는 default 파티션 생성
+do $$
+declare
+    v_table text;
+begin
+    foreach v_table in array array['workflow', 'data_collector', 'itinerary_builder', 'budget_manager', 'report_generator', 'workflow_events'] loop
+        perform ensure_monthly_partitions(v_table, current_date, 3);
+        execute format('create table if not exists %I partition of %I default', v_table || '_default', v_table);
+    end loop;
+end
+$$ language plpgsql;
+
+-- 기존 DB 마이그레이션 (2/2): 이름을 바꿔 둔 일반 테이블의 데이터를 파티션 테이블로 옮긴 뒤 삭제
+-- 두 테이블에 모두 있는 컬럼만 복사하며, agent 행의 created_at은 파티션 키이자 외래키이므로 워크플로우의 created_at으로 맞춤
+-- (복사한 워크플로우에 대해 상태 전이 이벤트가 새로 기록되지 않도록 복사하는 동안 이벤트 트리거를 끔)
+do $$
+declare
+    v_table text;
+    v_columns text;
+    v_select text;
+    v_oldest date;
+    v_months integer;
+begin
+    if to_regclass('workflow_unpartitioned') is null then
+        return;
+    end if;
+    -- 기존 기록이 default 파티션에 쌓이지 않도록 가장 오래된 워크플로우의 달부터 월 파티션 생성
+    -- (보관 기간 정리가 월 단위로 분리할 수 있도록)
+    select date_trunc('month', min(created_at))::date into v_oldest from workflow_unpartitioned;
+    if v_oldest is not null then
+        v_months := (extract(year from age(date_trunc('month', current_date), v_oldest)) * 12
+                     + extract(month from age(date_trunc('month', current_date), v_oldest)))::integer;
+        if v_months > 0 then
+            foreach v_table in array array['workflow', 'data_collector', 'itinerary_builder', 'budget_manager', 'report_generator', 'workflow_events'] loop
+                perform ensure_monthly_partitions(v_table, v_oldest, v_months);
+            end loop;
+        end if;
+    end if;
+    alter table workflow disable trigger workflow_events_trg;
+
+    select string_agg(quote_ident(n.column_name), ', ') into v_columns
+    from information_schema.columns n
+    join information_schema.columns o
+        on o.table_schema = n.table_schema and o.table_name = 'workflow_unpartitioned' and o.column_name = n.column_name
+    where n.table_schema = current_schema() and n.table_name = 'workflow';
+    execute format('insert into workflow (%s) select %s from workflow_unpartitioned', v_columns, v_columns);
+
+    foreach v_table in array array['data_collector', 'itinerary_builder', 'budget_manager', 'report_generator'] loop
+        continue when to_regclass(v_table || '_unpartitioned') is null;
+        select string_agg(quote_ident(n.column_name), ', '), string_agg('a.' || quote_ident(n.column_name), ', ')
+        into v_columns, v_select
+        from information_schema.columns n
+        join information_schema.columns o
+            on o.table_schema = n.table_schema and o.table_name = v_table || '_unpartitioned' and o.column_name = n.column_name
+        where n.table_schema = current_schema() and n.table_name = v_table and n.column_name <> 'created_at';
+        execute format(
+            'insert into %I (%s, created_at) select %s, w.created_at from %I a join workflow w on w.workflow_id = a.workflow_id',
+            v_table, v_columns, v_select, v_table || '_unpartitioned'
+        );
+        execute format(
+            'select setval(pg_get_serial_sequence(%L, %L), coalesce(max(%I), 0) + 1, false) from %I',
+            v_table, v_table || '_id', v_table || '_id', v_table
+        );
+        execute format('drop table %I', v_table || '_unpartitioned');
+    end loop;
+
+    drop table workflow_unpartitioned;
+    alter table workflow enable trigger workflow_events_trg;
+end
+$$ language plpgsql;
 
+-- 기본 사용자 (기존 DB에 다시 적용해도 중복 추가하지 않음)
 insert into users (name, auth_token)
 values
     ('user01', 'token01'),
     ('user02', 'token02'),
     ('user03', 'token03'),
     ('user04', 'token04'),
-    ('user05', 'token05');
\ No newline at end of file
+    ('user05', 'token05')
+on conflict (name) do nothing;
\ No newline at end of file
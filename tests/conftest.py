@@ -0,0 +1,15 @@
+# 테스트 공통 fixture
+import os
+
+import pytest
+
+
+@pytest.fixture
+def database_url() -> str:
+    """
+    init.sql이 적용된 Postgres 접속 주소. DATABASE_URL이 없으면 DB가 필요한 테스트는 건너뜀.
+    """
+    url = os.getenv("DATABASE_URL")
+    if not url:
+        pytest.skip("DATABASE_URL is not set")
+    return url
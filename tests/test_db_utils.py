@@ -0,0 +1,68 @@
+# agent 결과 저장 쿼리 파라미터 번호 테스트
+import asyncio
+import itertools
+import re
+from datetime import datetime, timezone
+
+import pytest
+
+from app.agents.usage import TokenUsage
+from app.db import utils
+from app.db.utils import _save_response_sql, save_agent_response
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.calls = []
+
+    async def execute(self, sql: str, *args):
+        self.calls.append((sql, args))
+
+
+def _placeholders(sql: str) -> set[int]:
+    return {int(number) for number in re.findall(r"\$(\d+)", sql)}
+
+
+@pytest.mark.parametrize(
+    "external, update_workflow, with_usage",
+    list(itertools.product((False, True), repeat=3)),
+)
+def test_save_response_params_match_sql(external, update_workflow, with_usage):
+    conn = RecordingConnection()
+    response = {"text": "x" * (utils.RESPONSE_INLINE_MAX_BYTES + 1 if external else 10)}
+    usage = TokenUsage(prompt_tokens=10, completion_tokens=5, cached_tokens=2, cost_usd=0.01)
+
+    asyncio.run(
+        save_agent_response(
+            conn,
+            "budget_manager",
+            "00000000-0000-0000-0000-000000000001",
+            datetime(2026, 10, 1, tzinfo=timezone.utc),
+            "completed",
+            response,
+            model="mock",
+            workflow_status="completed" if update_workflow else None,
+            usage=usage if with_usage else None,
+        )
+    )
+
+    (sql, args), = conn.calls
+    assert _placeholders(sql) == set(range(1, len(args) + 1))
+    if update_workflow:
+        assert f"${len(args)}::status_enum" in sql
+        assert args[-1] == "completed"
+    if with_usage:
+        first = 9 + (3 if external else 0)
+        assert f"prompt_tokens = ${first}" in sql
+        assert f"cost_usd = ${first + 3}" in sql
+        assert args[first - 1 : first + 3] == (10, 5, 2, 0.01)
+    if external:
+        assert args[1] is None and args[8] == utils.RESPONSE_CODEC
+    else:
+        assert args[2] is None and "agent_response_content" not in sql
+
+
+def test_save_response_sql_is_cached_per_shape():
+    assert _save_response_sql("data_collector", True, False) is _save_response_sql(
+        "data_collector", True, False
+    )
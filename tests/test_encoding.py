@@ -0,0 +1,52 @@
+# 응답 압축 방식 선택과 압축 응답 테스트
+import zlib
+
+import brotli
+import pytest
+
+from app.api import encoding
+from app.api.encoding import choose_encoding, encoded_response
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, "identity"),
+        ("", "identity"),
+        ("gzip", "gzip"),
+        ("gzip, br", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("BR;q=0.9, gzip;q=0.9", "br"),
+        ("gzip;q=0, br;q=0", "identity"),
+        ("*", "br"),
+        ("*;q=0.5, br;q=0", "gzip"),
+        ("gzip;q=bogus, br;q=0.1", "br"),
+        ("deflate, identity", "identity"),
+    ],
+)
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header) == expected
+
+
+def test_small_body_is_not_compressed():
+    response = encoded_response(b"{}", "application/json", "br")
+
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.body == b"{}"
+
+
+@pytest.mark.parametrize(
+    "accept, decompress",
+    [
+        ("br", brotli.decompress),
+        ("gzip", lambda data: zlib.decompress(data, 31)),
+    ],
+)
+def test_compressed_body_round_trips(accept, decompress, monkeypatch):
+    monkeypatch.setattr(encoding, "STREAM_CHUNK_BYTES", 1000)
+    body = b'{"item": "value"}' * 500
+    response = encoded_response(body, "application/json", accept)
+
+    assert response.headers["Content-Encoding"] == accept
+    assert decompress(response.body) == body
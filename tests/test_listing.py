@@ -0,0 +1,78 @@
+# 워크플로우 목록 커서와 사용자 필터 테스트
+import asyncio
+import base64
+import json
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import listing
+
+
+class CountingConnection:
+    def __init__(self, user_ids: dict[str, int]):
+        self.user_ids = user_ids
+        self.queries = []
+
+    async def fetchval(self, sql: str, *args):
+        self.queries.append(args)
+        return self.user_ids.get(args[0])
+
+
+def _raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 1, 12, 30, tzinfo=timezone.utc)
+    workflow_id = str(uuid.uuid4())
+
+    assert listing.decode_cursor(listing.encode_cursor(created_at, workflow_id)) == (
+        created_at,
+        workflow_id,
+    )
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-base64!",
+        _raw_cursor(["2026-10-01T00:00:00+00:00", "not-a-uuid"]),
+        _raw_cursor(["2026-10-01T00:00:00+00:00", 42]),
+        _raw_cursor([None, str(uuid.uuid4())]),
+        _raw_cursor({"created_at": "2026-10-01"}),
+    ],
+)
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        listing.decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_user_filter_checks_token_before_looking_up_user(monkeypatch):
+    async def reject(token):
+        return None
+
+    monkeypatch.setattr(listing, "verify_auth_token", reject)
+    conn = CountingConnection({"user01": 1})
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(listing._resolve_user_filter(conn, "bad-token", "user01"))
+    assert exc.value.status_code == 401
+    assert conn.queries == []
+
+
+def test_user_filter_hides_whether_other_user_exists(monkeypatch):
+    async def accept(token):
+        return 1
+
+    monkeypatch.setattr(listing, "verify_auth_token", accept)
+    conn = CountingConnection({"user01": 1, "user02": 2})
+
+    assert asyncio.run(listing._resolve_user_filter(conn, "token01", "user01")) == 1
+    for user in ("user02", "nobody"):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(listing._resolve_user_filter(conn, "token01", user))
+        assert exc.value.status_code == 403
@@ -0,0 +1,80 @@
+# LLM 모델 라우터 순서, 쿨다운, 후보 모델 전환 테스트
+import asyncio
+
+import pytest
+
+from app.agents import llm
+from app.agents.llm import ModelRouter
+
+
+@pytest.fixture
+def router(monkeypatch) -> ModelRouter:
+    # 탐색(explore)으로 순서가 무작위로 바뀌지 않도록 고정
+    monkeypatch.setattr(llm, "LLM_ROUTER_EXPLORE_RATE", 0.0)
+    router = ModelRouter()
+    monkeypatch.setattr(llm, "model_router", router)
+    return router
+
+
+def test_untried_models_first_then_fastest(router):
+    router.record_success("slow", ttft=2.0, tokens_per_sec=50)
+    router.record_success("fast", ttft=0.2, tokens_per_sec=100)
+
+    assert router.rank(["slow", "fast", "new"]) == ["new", "fast", "slow"]
+
+
+def test_cooldown_after_consecutive_errors_and_recovery(router, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm.time, "monotonic", lambda: now[0])
+    router.record_success("primary", ttft=0.1, tokens_per_sec=100)
+    router.record_success("backup", ttft=1.0, tokens_per_sec=100)
+
+    for _ in range(llm.LLM_ROUTER_COOLDOWN_AFTER_ERRORS - 1):
+        router.record_error("primary")
+    assert router.rank(["primary", "backup"]) == ["primary", "backup"]
+
+    router.record_error("primary")
+    assert router.rank(["primary", "backup"]) == ["backup", "primary"]
+
+    now[0] += llm.LLM_ROUTER_COOLDOWN_SECONDS + 1
+    assert router.rank(["primary", "backup"]) == ["primary", "backup"]
+
+
+def test_high_error_rate_is_degraded_without_consecutive_errors(router):
+    for _ in range(llm.LLM_ROUTER_MIN_SAMPLES):
+        router.record_error("flaky")
+        router.record_success("flaky", ttft=0.1, tokens_per_sec=100)
+    router.record_success("steady", ttft=1.0, tokens_per_sec=100)
+
+    assert router.stats("flaky").consecutive_errors == 0
+    assert router.rank(["flaky", "steady"]) == ["steady", "flaky"]
+
+
+def test_stream_chat_completion_falls_back_to_next_model(router, monkeypatch):
+    monkeypatch.setenv("LLM_MODELS_TEST_AGENT", "broken, working")
+    attempts = []
+
+    async def stream_once(messages, model, options):
+        attempts.append(model)
+        if model == "broken":
+            raise ConnectionError("upstream down")
+        return "ok", 0.1, 100.0, None
+
+    monkeypatch.setattr(llm, "_stream_once", stream_once)
+    result = asyncio.run(llm.stream_chat_completion([], "test_agent"))
+
+    assert (result.text, result.model) == ("ok", "working")
+    assert attempts == ["broken", "working"]
+    assert router.stats("broken").error_rate() == 1.0
+    assert router.stats("working").error_rate() == 0.0
+
+
+def test_stream_chat_completion_raises_last_error_when_all_fail(router, monkeypatch):
+    monkeypatch.setenv("LLM_MODELS_TEST_AGENT", "a,b")
+
+    async def stream_once(messages, model, options):
+        raise TimeoutError(model)
+
+    monkeypatch.setattr(llm, "_stream_once", stream_once)
+    with pytest.raises(TimeoutError, match="b"):
+        asyncio.run(llm.stream_chat_completion([], "test_agent"))
@@ -0,0 +1,55 @@
+# 리포트 PDF 렌더링이 외부/로컬 리소스를 읽지 않는지 확인하는 테스트 (weasyprint와 Pango 필요)
+import base64
+import io
+import random
+
+import pytest
+from PIL import Image
+
+try:
+    import weasyprint  # noqa: F401
+except (ImportError, OSError) as e:
+    pytest.skip(f"weasyprint is not usable: {e}", allow_module_level=True)
+
+from app.api.render import _render_to_file, pdf_url_fetcher
+
+
+def _png(path=None) -> bytes:
+    # 압축되지 않는 노이즈 이미지 (포함 여부가 PDF 크기로 분명하게 드러나도록)
+    pixels = random.Random(0).randbytes(100 * 100 * 3)
+    buffer = io.BytesIO()
+    Image.frombytes("RGB", (100, 100), pixels).save(buffer, format="PNG")
+    data = buffer.getvalue()
+    if path is not None:
+        path.write_bytes(data)
+    return data
+
+
+def _pdf_size(markdown: str, tmp_path, name: str) -> int:
+    return _render_to_file(markdown, "pdf", str(tmp_path / f"{name}.pdf"))
+
+
+def test_url_fetcher_refuses_file_and_http_urls():
+    fetcher = pdf_url_fetcher()
+
+    for url in ("file:///etc/passwd", "http://169.254.169.254/latest/meta-data/"):
+        with pytest.raises(ValueError):
+            fetcher(url)
+
+
+def test_markdown_file_image_is_not_embedded(tmp_path):
+    image_path = tmp_path / "secret.png"
+    _png(image_path)
+    data_url = "data:image/png;base64," + base64.b64encode(_png()).decode()
+
+    without_image = _pdf_size("# Report\n\ntext", tmp_path, "plain")
+    local_image = _pdf_size(
+        f"# Report\n\ntext\n\n![secret](file://{image_path})\n\n![passwd](file:///etc/passwd)",
+        tmp_path,
+        "local",
+    )
+    inline_image = _pdf_size(f"# Report\n\ntext\n\n![inline]({data_url})", tmp_path, "inline")
+
+    # data: 이미지는 포함되어 크기가 늘지만, file:// 이미지는 포함되지 않음
+    assert inline_image > without_image + 10000
+    assert local_image < without_image + 10000
@@ -0,0 +1,34 @@
+# agent 결과 필드 선택(projection) 테스트
+from app.api.results import parse_fields, project_fields
+
+BUDGET = {
+    "remaining": 120,
+    "spent": {"flights": 800, "hotels": 400},
+    "items": [{"name": "flight", "cost": 800}, {"name": "hotel", "cost": 400}],
+}
+
+
+def test_project_fields_keeps_nested_structure():
+    assert project_fields(BUDGET, ["remaining", "spent.flights"]) == {
+        "remaining": 120,
+        "spent": {"flights": 800},
+    }
+
+
+def test_project_fields_indexes_lists():
+    assert project_fields(BUDGET, ["items.1.name"]) == {"items": {"1": {"name": "hotel"}}}
+
+
+def test_project_fields_skips_missing_paths():
+    assert project_fields(BUDGET, ["missing", "spent.trains", "items.5", "remaining.x"]) == {}
+
+
+def test_project_fields_merges_sibling_paths():
+    assert project_fields(BUDGET, ["spent.flights", "spent.hotels"]) == {
+        "spent": {"flights": 800, "hotels": 400}
+    }
+
+
+def test_parse_fields():
+    assert parse_fields(None) == []
+    assert parse_fields(" remaining, ,spent.flights ") == ["remaining", "spent.flights"]
@@ -0,0 +1,82 @@
+# 사용자별 가중 공정 큐 스케줄러 실행 순서 테스트
+import asyncio
+
+from app.agents.scheduler import WorkflowScheduler, parse_priority_weights
+
+
+async def _admission_order(scheduler: WorkflowScheduler, requests: list[tuple[int, str]]):
+    order = []
+    release = asyncio.Event()
+
+    async def blocker():
+        await release.wait()
+
+    # 슬롯을 모두 채워 두고 요청을 쌓은 뒤 한 번에 풀어 배정 순서를 기록
+    held = [
+        asyncio.create_task(scheduler.run(0, "standard", blocker))
+        for _ in range(scheduler.max_concurrent)
+    ]
+    await asyncio.sleep(0)
+
+    def job(label):
+        async def run():
+            order.append(label)
+
+        return run
+
+    tasks = [
+        asyncio.create_task(scheduler.run(user_id, priority, job((user_id, priority))))
+        for user_id, priority in requests
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*held, *tasks)
+    return order
+
+
+def _scheduler(**kwargs) -> WorkflowScheduler:
+    return WorkflowScheduler(
+        max_concurrent=kwargs.get("max_concurrent", 1),
+        user_max_concurrent=kwargs.get("user_max_concurrent", 4),
+        burst_headroom=0,
+        weights=parse_priority_weights("interactive=4,standard=2,batch=1"),
+    )
+
+
+def test_parse_priority_weights_defaults_missing_classes():
+    assert parse_priority_weights("interactive=8, batch=0") == {
+        "interactive": 8.0,
+        "standard": 1.0,
+        "batch": 0.001,
+    }
+
+
+def test_users_are_interleaved_regardless_of_submission_order():
+    requests = [(1, "standard")] * 3 + [(2, "standard")] * 3
+    order = asyncio.run(_admission_order(_scheduler(), requests))
+
+    assert [user_id for user_id, _ in order] == [1, 2, 1, 2, 1, 2]
+
+
+def test_interactive_overtakes_same_users_batch_backlog():
+    requests = [(1, "batch")] * 3 + [(1, "interactive")]
+    order = asyncio.run(_admission_order(_scheduler(), requests))
+
+    assert order[0] == (1, "interactive")
+    assert order[1:] == [(1, "batch")] * 3
+
+
+def test_priority_weight_sets_share_between_users():
+    requests = [(1, "batch")] * 4 + [(2, "interactive")] * 8
+    order = asyncio.run(_admission_order(_scheduler(), requests))
+
+    # interactive(가중치 4) 사용자가 batch(가중치 1) 사용자보다 4배 자주 선택됨
+    assert [user_id for user_id, _ in order[:10]] == [2, 2, 2, 1, 2, 2, 2, 2, 1, 2]
+
+
+def test_user_cap_defers_to_other_users():
+    scheduler = _scheduler(max_concurrent=2, user_max_concurrent=1)
+    requests = [(1, "interactive")] * 2 + [(2, "batch")]
+    order = asyncio.run(_admission_order(scheduler, requests))
+
+    assert order.index((2, "batch")) < order.index((1, "interactive"), 1)
@@ -0,0 +1,44 @@
+# WebSocket 연결 수 제한(자리 예약) 테스트
+import pytest
+
+from app.api import websocket
+from app.api.websocket import ConnectionManager
+
+
+@pytest.fixture
+def manager(monkeypatch) -> ConnectionManager:
+    monkeypatch.setattr(websocket, "WS_MAX_CONNECTIONS", 3)
+    monkeypatch.setattr(websocket, "WS_MAX_CONNECTIONS_PER_USER", 2)
+    return ConnectionManager()
+
+
+def test_reserve_slot_enforces_per_user_cap(manager):
+    assert manager.reserve_slot(1) is None
+    assert manager.reserve_slot(1) is None
+    assert manager.reserve_slot(1) == "user"
+
+    assert manager.user_connections == {1: 2}
+    assert manager.connection_count == 2
+
+
+def test_reserve_slot_enforces_global_cap(manager):
+    for user_id in (1, 2, None):
+        assert manager.reserve_slot(user_id) is None
+
+    assert manager.reserve_slot(3) == "global"
+    assert manager.reserve_slot(None) == "global"
+    assert 3 not in manager.user_connections
+
+
+def test_released_slot_can_be_reserved_again(manager):
+    assert manager.reserve_slot(1) is None
+    assert manager.reserve_slot(1) is None
+
+    manager.release_slot(1)
+    assert manager.user_connections == {1: 1}
+    assert manager.reserve_slot(1) is None
+
+    manager.release_slot(1)
+    manager.release_slot(1)
+    assert manager.user_connections == {}
+    assert manager.connection_count == 0
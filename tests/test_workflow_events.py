@@ -0,0 +1,154 @@
+# 상태 전이 이벤트 순번(seq)과 이벤트 구독 연결 전송 테스트
+import asyncio
+import json
+import uuid
+
+import asyncpg
+
+from app.api.status import status_etag
+from app.api.websocket import ConnectionManager, contiguous_events
+from app.db.database import LATEST_EVENT_SEQ_SQL
+
+
+def _event(seq: int, agent: str | None = "budget_manager", status: str = "completed") -> dict:
+    return {"seq": seq, "agent": agent, "status": status, "at": None}
+
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.messages = []
+
+    async def send_text(self, data: str):
+        self.messages.append(json.loads(data))
+
+    async def send_bytes(self, data: bytes):
+        raise AssertionError("json connection received a binary frame")
+
+
+def test_contiguous_events_stops_at_gap():
+    events = [_event(3), _event(4), _event(6), _event(7)]
+
+    assert [e["seq"] for e in contiguous_events(events, 2)] == [3, 4]
+    assert [e["seq"] for e in contiguous_events(events, 3)] == [4]
+    assert contiguous_events(events, 4) == []
+    assert [e["seq"] for e in contiguous_events(events, 5)] == [6, 7]
+    assert contiguous_events(events, 7) == []
+
+
+def test_broadcast_events_holds_cursor_until_gap_fills():
+    manager = ConnectionManager()
+    websocket = RecordingWebSocket()
+    manager.active_connections["wf"] = [websocket]
+    manager.event_cursors[websocket] = 1
+
+    # seq 3이 먼저 보이고 seq 2는 아직 보이지 않는 경우
+    asyncio.run(manager.broadcast_events("wf", [_event(3)]))
+    assert websocket.messages == []
+    assert manager.event_cursors[websocket] == 1
+
+    asyncio.run(manager.broadcast_events("wf", [_event(2), _event(3)]))
+    assert [e["seq"] for e in websocket.messages[0]["events"]] == [2, 3]
+    assert websocket.messages[0]["seq"] == 3
+    assert manager.event_cursors[websocket] == 3
+
+
+async def _concurrent_agent_completions(database_url: str):
+    setup = await asyncpg.connect(database_url)
+    first = await asyncpg.connect(database_url)
+    second = await asyncpg.connect(database_url)
+    workflow_id = uuid.uuid4()
+    try:
+        user_id = await setup.fetchval("SELECT user_id FROM users ORDER BY user_id LIMIT 1")
+        created_at = await setup.fetchval(
+            "INSERT INTO workflow (workflow_id, user_id) VALUES ($1, $2) RETURNING created_at",
+            workflow_id,
+            user_id,
+        )
+        for agent in ("itinerary_builder", "budget_manager"):
+            await setup.execute(
+                f"INSERT INTO {agent} (workflow_id, created_at) VALUES ($1, $2)",
+                workflow_id,
+                created_at,
+            )
+
+        complete_sql = (
+            "UPDATE {} SET status = 'completed' WHERE workflow_id = $1 AND created_at = $2"
+        )
+        first_tx = first.transaction()
+        await first_tx.start()
+        await first.execute(complete_sql.format("budget_manager"), workflow_id, created_at)
+
+        async def complete_second():
+            async with second.transaction():
+                await second.execute(
+                    complete_sql.format("itinerary_builder"), workflow_id, created_at
+                )
+
+        # 두 번째 agent는 첫 번째 트랜잭션이 커밋될 때까지 순번을 받지 못하고 대기
+        second_done = asyncio.create_task(complete_second())
+        await asyncio.sleep(0.3)
+        assert not second_done.done()
+
+        await first_tx.commit()
+        await asyncio.wait_for(second_done, 5)
+
+        rows = await setup.fetch(
+            "SELECT seq, agent FROM workflow_events WHERE workflow_id = $1 ORDER BY seq",
+            workflow_id,
+        )
+        latest = await setup.fetchval(
+            "SELECT event_seq FROM workflow WHERE workflow_id = $1", workflow_id
+        )
+        return [(row["seq"], row["agent"]) for row in rows], latest
+    finally:
+        await setup.execute("DELETE FROM workflow WHERE workflow_id = $1", workflow_id)
+        await setup.execute("DELETE FROM workflow_events WHERE workflow_id = $1", workflow_id)
+        for conn in (setup, first, second):
+            await conn.close()
+
+
+def test_concurrent_agent_completions_get_seq_in_commit_order(database_url):
+    events, latest = asyncio.run(_concurrent_agent_completions(database_url))
+
+    assert events == [(1, None), (2, "budget_manager"), (3, "itinerary_builder")]
+    assert latest == 3
+
+
+async def _latest_seq_during_uncommitted_transition(database_url: str):
+    setup = await asyncpg.connect(database_url)
+    writer = await asyncpg.connect(database_url)
+    workflow_id = uuid.uuid4()
+    try:
+        user_id = await setup.fetchval("SELECT user_id FROM users ORDER BY user_id LIMIT 1")
+        created_at = await setup.fetchval(
+            "INSERT INTO workflow (workflow_id, user_id) VALUES ($1, $2) RETURNING created_at",
+            workflow_id,
+            user_id,
+        )
+        await setup.execute(
+            "INSERT INTO budget_manager (workflow_id, created_at) VALUES ($1, $2)",
+            workflow_id,
+            created_at,
+        )
+        seen = [await setup.fetchval(LATEST_EVENT_SEQ_SQL, workflow_id)]
+        async with writer.transaction():
+            await writer.execute(
+                "UPDATE budget_manager SET status = 'running' WHERE workflow_id = $1 AND created_at = $2",
+                workflow_id,
+                created_at,
+            )
+            seen.append(await setup.fetchval(LATEST_EVENT_SEQ_SQL, workflow_id))
+        seen.append(await setup.fetchval(LATEST_EVENT_SEQ_SQL, workflow_id))
+        return seen
+    finally:
+        await setup.execute("DELETE FROM workflow WHERE workflow_id = $1", workflow_id)
+        await setup.execute("DELETE FROM workflow_events WHERE workflow_id = $1", workflow_id)
+        await setup.close()
+        await writer.close()
+
+
+def test_latest_event_seq_only_counts_committed_transitions(database_url):
+    seen = asyncio.run(_latest_seq_during_uncommitted_transition(database_url))
+
+    assert seen == [1, 1, 2]
+    assert status_etag(seen[-1]) == '"s2"'